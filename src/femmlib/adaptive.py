@@ -0,0 +1,342 @@
+import math
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+from numpy.typing import NDArray
+
+from femmlib.circuit import CircuitPropsExtended
+
+
+@dataclass
+class AdaptiveAxis:
+    """
+    Parâmetro varrido de forma adaptativa, como o comprimento de um
+    `AirGap`, a corrente de um `Circuit` ou `FEMM.freq`.
+
+    - `name`: Nome do parâmetro;
+    - `lower` e `upper`: Limites da varredura;
+    - `initial`: Quantidade de pontos da grade inicial;
+    - `log`: Se verdadeiro, os pontos são distribuídos em escala
+    logarítmica, como é comum para a frequência.
+    """
+
+    name: str
+    lower: float
+    upper: float
+    initial: int = 5
+    log: bool = False
+
+    def __post_init__(self) -> None:
+        assert self.initial >= 2, 'At least two initial points are needed.'
+        assert not self.log or self.lower > 0, (
+            'Logarithmic axes must be positive.'
+        )
+
+    def to_scale(self, values: NDArray[np.float64]) -> NDArray[np.float64]:
+        return np.log(values) if self.log else values
+
+    def from_scale(self, value: float) -> float:
+        return math.exp(value) if self.log else value
+
+    def grid(self) -> list[float]:
+        lower, upper = self.to_scale(np.array([self.lower, self.upper]))
+        return [
+            self.from_scale(float(value))
+            for value in np.linspace(float(lower), float(upper), self.initial)
+        ]
+
+
+def normalize(values: NDArray[np.float64]) -> NDArray[np.float64]:
+    """Leva cada coluna de `values` para o intervalo [0, 1]."""
+    lower = values.min(axis=0)
+    spread = values.max(axis=0) - lower
+    return (values - lower) / np.where(spread > 0, spread, 1)
+
+
+def interval_errors(
+    t: NDArray[np.float64], values: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    """
+    Estima o erro da interpolação linear no ponto médio de cada intervalo
+    de `t`, ordenado, como a diferença para as parábolas que passam pelos
+    pontos vizinhos. `values` tem formato (pontos, grandezas) e o erro é o
+    maior entre as grandezas. Retorna um vetor com um valor por intervalo.
+    """
+    n = len(t)
+    errors = np.zeros(n - 1)
+    if n < 3:
+        errors[:] = np.inf
+        return errors
+
+    middle = (t[:-1] + t[1:]) / 2
+    linear = (values[:-1] + values[1:]) / 2
+
+    # Parábola pelos pontos k, k + 1 e k + 2, avaliada no ponto médio de
+    # cada intervalo que ela cobre.
+    t0, t1, t2 = t[:-2], t[1:-1], t[2:]
+    v0, v1, v2 = values[:-2], values[1:-1], values[2:]
+
+    def parabola(x: NDArray[np.float64]) -> NDArray[np.float64]:
+        l0 = (x - t1) * (x - t2) / ((t0 - t1) * (t0 - t2))
+        l1 = (x - t0) * (x - t2) / ((t1 - t0) * (t1 - t2))
+        l2 = (x - t0) * (x - t1) / ((t2 - t0) * (t2 - t1))
+        return l0[:, None] * v0 + l1[:, None] * v1 + l2[:, None] * v2
+
+    # Intervalo à esquerda e à direita do ponto central de cada parábola.
+    left = np.abs(parabola(middle[:-1]) - linear[:-1]).max(axis=1)
+    right = np.abs(parabola(middle[1:]) - linear[1:]).max(axis=1)
+    np.maximum.at(errors, np.arange(n - 2), left)
+    np.maximum.at(errors, np.arange(1, n - 1), right)
+
+    return errors
+
+
+def quantities_of(
+    props: CircuitPropsExtended, quantities: Sequence[str]
+) -> list[float]:
+    return [float(np.abs(getattr(props, name))) for name in quantities]
+
+
+@dataclass
+class AdaptiveSweep:
+    """
+    Planeja uma varredura de um parâmetro: começa pela grade inicial de
+    `axis` e adiciona pontos nos intervalos em que as grandezas de
+    `CircuitPropsExtended` mais se afastam da interpolação linear, até que o
+    erro estimado fique abaixo de `tolerance`.
+
+    O uso é por pedidos e respostas, o que permite resolver os pontos de
+    cada lote em paralelo. Os pedidos dependem das respostas anteriores,
+    então um pedido feito antes de todas as respostas chegarem pode vir
+    vazio. A varredura só termina quando `done()` for verdadeiro:
+
+    ```python
+    while not sweep.done():
+        for value in sweep.ask():
+            sweep.tell(value, solve(value))
+    ```
+
+    - `quantities`: Campos de `CircuitPropsExtended` observados. Em
+    problemas harmônicos, é usada a magnitude;
+    - `tolerance`: Erro máximo, relativo à faixa de cada grandeza;
+    - `max_points`: Quantidade máxima de soluções;
+    - `batch`: Quantidade máxima de pontos de cada pedido.
+    """
+
+    axis: AdaptiveAxis
+    quantities: Sequence[str] = ('inductance',)
+    tolerance: float = 1e-3
+    max_points: int = 100
+    batch: int = 1
+    values: dict[float, list[float]] = field(
+        default_factory=dict[float, list[float]], init=False
+    )
+    pending: set[float] = field(default_factory=set[float], init=False)
+
+    def tell(self, value: float, props: CircuitPropsExtended) -> None:
+        """Registra a solução do ponto `value`."""
+        self.pending.discard(value)
+        self.values[value] = quantities_of(props, self.quantities)
+
+    def points(self) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """
+        Pontos resolvidos, em ordem, e as grandezas observadas, no formato
+        (pontos, grandezas).
+        """
+        x = np.array(sorted(self.values))
+        return x, np.array([self.values[value] for value in x]).reshape(
+            len(x), len(self.quantities)
+        )
+
+    def errors(self) -> NDArray[np.float64]:
+        """Erro estimado em cada intervalo entre os pontos resolvidos."""
+        x, values = self.points()
+        return interval_errors(self.axis.to_scale(x), normalize(values))
+
+    def candidates(self) -> list[float]:
+        """Pontos que seriam pedidos agora, sem marcá-los como pendentes."""
+        if not self.values and not self.pending:
+            return self.axis.grid()
+
+        budget = self.max_points - len(self.values) - len(self.pending)
+        if budget <= 0 or len(self.values) < 2:
+            return []
+
+        x, _ = self.points()
+        t = self.axis.to_scale(x)
+        errors = self.errors()
+
+        points: list[float] = []
+        for i in np.argsort(errors)[::-1]:
+            if errors[i] <= self.tolerance or len(points) == self.batch:
+                break
+            if len(points) == budget:
+                break
+
+            value = self.axis.from_scale(float(t[i] + t[i + 1]) / 2)
+            if value not in self.pending:
+                points.append(value)
+
+        return points
+
+    def ask(self) -> list[float]:
+        """
+        Retorna os próximos pontos a resolver. A lista vem vazia quando não
+        há pontos novos até que os pendentes sejam respondidos ou quando a
+        varredura terminou, o que é indicado por `done()`.
+        """
+        points = self.candidates()
+        self.pending.update(points)
+        return points
+
+    def done(self) -> bool:
+        """Verdadeiro se não há pontos pendentes nem pontos novos a pedir."""
+        return not self.pending and not self.candidates()
+
+    def run(
+        self, solve: Callable[[float], CircuitPropsExtended]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64]]:
+        """Resolve a varredura em série e retorna `points()`."""
+        while points := self.ask():
+            for value in points:
+                self.tell(value, solve(value))
+
+        return self.points()
+
+
+@dataclass
+class AdaptiveGrid:
+    """
+    Planeja uma varredura de dois parâmetros sobre uma grade retangular. A
+    cada pedido, uma nova linha ou coluna é inserida no intervalo com o
+    maior erro estimado ao longo de qualquer um dos eixos, considerando
+    todas as linhas ou colunas da grade. Os resultados continuam formando
+    uma grade, como em `FEMM.sample_grid()`.
+
+    Os parâmetros são os mesmos de `AdaptiveSweep`, com `batch` em linhas ou
+    colunas por pedido.
+    """
+
+    x_axis: AdaptiveAxis
+    y_axis: AdaptiveAxis
+    quantities: Sequence[str] = ('inductance',)
+    tolerance: float = 1e-3
+    max_points: int = 400
+    batch: int = 1
+    x: list[float] = field(default_factory=list[float], init=False)
+    y: list[float] = field(default_factory=list[float], init=False)
+    values: dict[tuple[float, float], list[float]] = field(
+        default_factory=dict[tuple[float, float], list[float]], init=False
+    )
+    pending: set[tuple[float, float]] = field(
+        default_factory=set[tuple[float, float]], init=False
+    )
+
+    def tell(
+        self, point: tuple[float, float], props: CircuitPropsExtended
+    ) -> None:
+        self.pending.discard(point)
+        self.values[point] = quantities_of(props, self.quantities)
+
+    def points(
+        self,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+        """
+        Eixos da grade, em ordem, e as grandezas observadas no formato
+        (y, x, grandezas).
+        """
+        x = np.array(sorted(self.x))
+        y = np.array(sorted(self.y))
+        values = np.array(
+            [[self.values[(i, j)] for i in x] for j in y]
+        ).reshape(len(y), len(x), len(self.quantities))
+
+        return x, y, values
+
+    def refinement(self) -> tuple[list[float], list[float]]:
+        """
+        Novas posições de x e de y da grade resolvida, ou listas vazias se a
+        grade terminou.
+        """
+        x, y, values = self.points()
+        flat = normalize(values.reshape(-1, len(self.quantities))).reshape(
+            values.shape
+        )
+
+        # Maior erro de cada intervalo entre todas as linhas ou colunas.
+        tx = self.x_axis.to_scale(x)
+        ty = self.y_axis.to_scale(y)
+        x_errors = np.max([interval_errors(tx, row) for row in flat], axis=0)
+        y_errors = np.max(
+            [interval_errors(ty, column) for column in flat.swapaxes(0, 1)],
+            axis=0,
+        )
+        candidates = sorted(
+            [(float(e), 'x', i) for i, e in enumerate(x_errors)]
+            + [(float(e), 'y', i) for i, e in enumerate(y_errors)],
+            reverse=True,
+        )
+
+        new_x: list[float] = []
+        new_y: list[float] = []
+        for error, axis, i in candidates[: self.batch]:
+            if error <= self.tolerance:
+                break
+
+            if axis == 'x':
+                new_x.append(
+                    self.x_axis.from_scale(float(tx[i] + tx[i + 1]) / 2)
+                )
+            else:
+                new_y.append(
+                    self.y_axis.from_scale(float(ty[i] + ty[i + 1]) / 2)
+                )
+
+        size = (len(self.x) + len(new_x)) * (len(self.y) + len(new_y))
+        if size == len(self.values) or size > self.max_points:
+            return [], []
+
+        return new_x, new_y
+
+    def ask(self) -> list[tuple[float, float]]:
+        """
+        Retorna os próximos pontos a resolver. Como em `AdaptiveSweep`, a
+        lista vem vazia enquanto houver pontos pendentes ou quando a grade
+        terminou, o que é indicado por `done()`.
+        """
+        if not self.x:
+            self.x = self.x_axis.grid()
+            self.y = self.y_axis.grid()
+            points = [(i, j) for j in self.y for i in self.x]
+            self.pending.update(points)
+            return points
+
+        if self.pending:
+            return []
+
+        new_x, new_y = self.refinement()
+        self.x = [*self.x, *new_x]
+        self.y = [*self.y, *new_y]
+        points = [
+            (i, j) for j in self.y for i in self.x if (i, j) not in self.values
+        ]
+        self.pending.update(points)
+        return points
+
+    def done(self) -> bool:
+        """Verdadeiro se não há pontos pendentes nem pontos novos a pedir."""
+        if not self.x or self.pending:
+            return False
+
+        return self.refinement() == ([], [])
+
+    def run(
+        self, solve: Callable[[float, float], CircuitPropsExtended]
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+        """Resolve a varredura em série e retorna `points()`."""
+        while points := self.ask():
+            for point in points:
+                self.tell(point, solve(*point))
+
+        return self.points()
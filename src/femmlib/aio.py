@@ -0,0 +1,175 @@
+import asyncio
+import multiprocessing
+import os
+import traceback
+import weakref
+from collections.abc import (
+    AsyncGenerator,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Iterable,
+)
+from contextlib import AbstractContextManager, asynccontextmanager
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Any
+
+# Intervalo, em s, entre verificações dos processos trabalhadores.
+POLL_INTERVAL = 0.01
+
+context = multiprocessing.get_context('spawn')
+concurrency = os.cpu_count() or 1
+semaphores: weakref.WeakKeyDictionary[
+    asyncio.AbstractEventLoop, asyncio.Semaphore
+] = weakref.WeakKeyDictionary()
+
+
+def set_concurrency(value: int) -> None:
+    """Define quantos processos do FEMM podem executar ao mesmo tempo."""
+    global concurrency
+
+    concurrency = value
+    semaphores.clear()
+
+
+def limit() -> asyncio.Semaphore:
+    """Semáforo que limita os processos do laço de eventos atual."""
+    loop = asyncio.get_running_loop()
+    if loop not in semaphores:
+        semaphores[loop] = asyncio.Semaphore(concurrency)
+
+    return semaphores[loop]
+
+
+def call(connection: Connection, fn: Callable[..., Any], args: Any) -> None:
+    try:
+        connection.send((True, fn(*args)))
+    except Exception:
+        connection.send((False, traceback.format_exc()))
+
+
+def serve(
+    connection: Connection,
+    factory: Callable[[], AbstractContextManager[Any]],
+) -> None:
+    """
+    Mantém o contexto de `factory` aberto, como `FEMM.new()`, e executa as
+    funções recebidas até receber `None`.
+    """
+    with factory():
+        while (message := connection.recv()) is not None:
+            fn, args = message
+            call(connection, fn, args)
+
+    connection.send((True, None))
+
+
+def spawn(
+    target: Callable[..., None], *args: Any
+) -> tuple[BaseProcess, Connection]:
+    connection, child = context.Pipe()
+    process = context.Process(target=target, args=(child, *args), daemon=True)
+    process.start()
+    child.close()
+
+    return process, connection
+
+
+async def receive(process: BaseProcess, connection: Connection) -> Any:
+    """
+    Espera a resposta do processo sem bloquear o laço de eventos. Lança
+    `RuntimeError` com o traceback do processo se a função falhar.
+    """
+    while not connection.poll():
+        if not process.is_alive() and not connection.poll():
+            raise RuntimeError(f'Worker exited with code {process.exitcode}.')
+        await asyncio.sleep(POLL_INTERVAL)
+
+    ok, payload = connection.recv()
+    if not ok:
+        raise RuntimeError(f'Worker failed:\n{payload}')
+
+    return payload
+
+
+def stop(process: BaseProcess, connection: Connection) -> None:
+    if process.is_alive():
+        process.kill()
+    process.join()
+    connection.close()
+
+
+async def run[T](fn: Callable[..., T], *args: Any) -> T:
+    """
+    Executa `fn(*args)` em um novo processo, respeitando o limite de
+    processos simultâneos. Se a tarefa for cancelada, o processo é
+    encerrado. `fn` e os argumentos devem poder ser serializados pelo
+    `pickle`.
+    """
+    async with limit():
+        process, connection = spawn(call, fn, args)
+        try:
+            return await receive(process, connection)
+        finally:
+            stop(process, connection)
+
+
+class AsyncSession:
+    """Documento aberto em um processo trabalhador."""
+
+    def __init__(self, process: BaseProcess, connection: Connection) -> None:
+        self.process = process
+        self.connection = connection
+        self.lock = asyncio.Lock()
+
+    async def call[T](self, fn: Callable[..., T], *args: Any) -> T:
+        """
+        Executa `fn(*args)` no processo do documento. As chamadas de uma
+        mesma sessão são executadas uma de cada vez.
+        """
+        async with self.lock:
+            self.connection.send((fn, args))
+            return await receive(self.process, self.connection)
+
+    async def close(self) -> None:
+        """Fecha o contexto do documento e espera o processo terminar."""
+        async with self.lock:
+            self.connection.send(None)
+            await receive(self.process, self.connection)
+
+
+@asynccontextmanager
+async def session(
+    factory: Callable[[], AbstractContextManager[Any]],
+) -> AsyncGenerator[AsyncSession]:
+    """
+    Abre o contexto de `factory` em um processo trabalhador durante o bloco.
+    Se o bloco falhar ou for cancelado, o processo é encerrado sem fechar o
+    contexto.
+    """
+    async with limit():
+        process, connection = spawn(serve, factory)
+        active = AsyncSession(process, connection)
+        try:
+            yield active
+            await active.close()
+        finally:
+            stop(process, connection)
+
+
+async def as_completed[T](
+    awaitables: Iterable[Awaitable[T]],
+) -> AsyncIterator[T]:
+    """
+    Retorna os resultados conforme terminam. As tarefas restantes são
+    canceladas se a iteração for interrompida.
+    """
+    tasks = [asyncio.ensure_future(awaitable) for awaitable in awaitables]
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            yield await next_result
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -4,9 +4,18 @@ from dataclasses import dataclass
 from typing import Literal, Self
 
 import femm
-import vec
-from vec import Vec2, Vec2Like, to_vec2
-from problem import Unit
+
+from femmlib.unit import Unit
+from mathlib.vector2 import (
+    DOWN,
+    LEFT,
+    RIGHT,
+    UP,
+    Vector2,
+    Vector2Array,
+    Vector2ArrayLike,
+    Vector2Like,
+)
 
 type Direction = Literal["horizontal", "vertical"]
 
@@ -14,17 +23,30 @@ type Direction = Literal["horizontal", "vertical"]
 class AirGapBuilder:
     def __init__(
         self,
-        upper_left: Vec2Like,
-        upper_right: Vec2Like,
-        lower_left: Vec2Like,
-        lower_right: Vec2Like,
+        upper_left: Vector2Like,
+        upper_right: Vector2Like,
+        lower_left: Vector2Like,
+        lower_right: Vector2Like,
     ) -> None:
-        self.upper_right = to_vec2(upper_right)
-        self.upper_left = to_vec2(upper_left)
-        self.lower_right = to_vec2(lower_right)
-        self.lower_left = to_vec2(lower_left)
+        # Cópias, para que alterar os vetores recebidos não mova o entreferro.
+        self.upper_right = Vector2.parse(upper_right, copy=True)
+        self.upper_left = Vector2.parse(upper_left, copy=True)
+        self.lower_right = Vector2.parse(lower_right, copy=True)
+        self.lower_left = Vector2.parse(lower_left, copy=True)
         self.direction: Direction = "vertical"
 
+    @classmethod
+    def from_array(cls, corners: Vector2ArrayLike) -> Self:
+        """
+        Cria o construtor a partir dos 4 cantos, no formato (4, 2), na ordem
+        superior esquerdo, superior direito, inferior esquerdo e inferior
+        direito.
+        """
+        corners = Vector2Array.parse(corners)
+        assert len(corners) == 4, "The air gap must have 4 corners."
+
+        return cls(*corners)
+
     def with_direction(self, direction: Direction) -> Self:
         self.direction = direction
         return self
@@ -61,22 +83,33 @@ class AirGap:
     e "vertical" para vertical.
     """
 
-    upper_left: Vec2
-    upper_right: Vec2
-    lower_left: Vec2
-    lower_right: Vec2
+    upper_left: Vector2
+    upper_right: Vector2
+    lower_left: Vector2
+    lower_right: Vector2
     direction: Direction
 
     @staticmethod
     def builder(
         *,
-        upper_left: Vec2Like,
-        upper_right: Vec2Like,
-        lower_left: Vec2Like,
-        lower_right: Vec2Like,
+        upper_left: Vector2Like,
+        upper_right: Vector2Like,
+        lower_left: Vector2Like,
+        lower_right: Vector2Like,
     ) -> AirGapBuilder:
         return AirGapBuilder(upper_left, upper_right, lower_left, lower_right)
 
+    def nodes(self) -> Vector2Array:
+        """Cantos do entreferro na ordem de `AirGapBuilder.from_array()`."""
+        return Vector2Array.parse(
+            [
+                self.upper_left,
+                self.upper_right,
+                self.lower_left,
+                self.lower_right,
+            ]
+        )
+
     def length(self) -> float:
         """Computa e retorna o tamanho do entreferro."""
         # Se o entreferro for horizontal, calcule a distância entre os pontos
@@ -84,27 +117,27 @@ class AirGap:
         # e inferior esquerdo. Naturalmente, os pontos simétricos também
         # poderiam ter sido utilizados.
         if self.direction == "horizontal":
-            return vec.distance(self.upper_right, self.upper_left)
+            return Vector2.distance(self.upper_right, self.upper_left)
 
-        return vec.distance(self.upper_left, self.lower_left)
+        return Vector2.distance(self.upper_left, self.lower_left)
 
     def thickness(self) -> float:
         """Computa e retorna a grossura do entreferro."""
         if self.direction == "horizontal":
-            return vec.distance(self.upper_left, self.lower_left)
+            return Vector2.distance(self.upper_left, self.lower_left)
 
-        return vec.distance(self.upper_right, self.upper_left)
+        return Vector2.distance(self.upper_right, self.upper_left)
 
-    def center(self) -> Vec2:
+    def center(self) -> Vector2:
         """
         Computa e retorna um vetor contendo as coordenadas do cenro do
         entreferro.
         """
         # Coordenada x do ponto médio entre canto superior esquerdo e direito e
         # y do canto superior esquerdo e inferior esquerdo.
-        return Vec2(
-            vec.midpoint(self.upper_left, self.upper_right).x,
-            vec.midpoint(self.upper_left, self.lower_left).y,
+        return Vector2(
+            Vector2.midpoint(self.upper_left, self.upper_right).x,
+            Vector2.midpoint(self.upper_left, self.lower_left).y,
         )
 
     def cross_sectional_area(self, depth: float, units: Unit) -> float:
@@ -113,9 +146,13 @@ class AirGap:
         """
         # Calcula a grossura em metros dependendo da direção do entreferro.
         if self.direction == "horizontal":
-            thickness = units.to_meters(vec.distance(self.upper_left, self.lower_left))
+            thickness = units.to_meters(
+                Vector2.distance(self.upper_left, self.lower_left)
+            )
         else:
-            thickness = units.to_meters(vec.distance(self.upper_left, self.upper_right))
+            thickness = units.to_meters(
+                Vector2.distance(self.upper_left, self.upper_right)
+            )
 
         # Profundidade em metros
         depth = units.to_meters(depth)
@@ -131,21 +168,21 @@ class AirGap:
         if self.direction == "horizontal":
             for x, y in (self.upper_right, self.lower_right):
                 femm.mi_selectnode(x, y)
-            amount_vec = vec.RIGHT * amount / 2
+            amount_vec = RIGHT * amount / 2
             femm.mi_movetranslate(*amount_vec)
             femm.mi_clearselected()
 
             for x, y in (self.upper_left, self.lower_left):
                 femm.mi_selectnode(x, y)
-            femm.mi_movetranslate(*(vec.LEFT * amount / 2))
+            femm.mi_movetranslate(*(LEFT * amount / 2))
             femm.mi_clearselected()
         else:
             for x, y in (self.upper_right, self.upper_left):
                 femm.mi_selectnode(x, y)
-            femm.mi_movetranslate(*(vec.UP * amount / 2))
+            femm.mi_movetranslate(*(UP * amount / 2))
             femm.mi_clearselected()
 
             for x, y in (self.lower_right, self.lower_left):
                 femm.mi_selectnode(x, y)
-            femm.mi_movetranslate(*(vec.DOWN * amount / 2))
+            femm.mi_movetranslate(*(DOWN * amount / 2))
             femm.mi_clearselected()
@@ -1,13 +1,15 @@
-from dataclasses import dataclass
-from typing import Literal, Self
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, replace
+from typing import Self
 
 import femm
+import numpy as np
 
-from mathlib.vector2 import Vector2, Vector2Like
-
-type MaterialName = Literal[
-    'Air', 'Pure Iron', '18 AWG', '1010 Steel', 'M-45 Steel'
-]
+from femmlib import lua, material
+from femmlib.material import MaterialName
+from femmlib.structure import Structure
+from mathlib.polylabel import polylabel
+from mathlib.vector2 import Vector2, Vector2Array, Vector2Like
 
 
 @dataclass
@@ -45,11 +47,29 @@ class Block:
         )
         femm.mi_clearselected()
 
+    def lua(self) -> list[str]:
+        """Comandos Lua equivalentes a `Block.update()`."""
+        x, y = lua.number(self.position.x), lua.number(self.position.y)
+        return [
+            f'mi_selectlabel({x}, {y})',
+            f'mi_setblockprop({lua.string(self.name)}, '
+            f'{int(self.auto_mesh)}, {lua.number(self.mesh_size)}, '
+            f'{lua.string(self.circuit_name)}, '
+            f'{lua.number(self.magnetization_direction)}, '
+            f'{self.group}, {self.turns})',
+            'mi_clearselected()',
+        ]
+
 
 class BlockBuilder:
-    def __init__(self, name: MaterialName, position: Vector2Like):
+    def __init__(self, name: MaterialName, position: Vector2Like = (0, 0)):
+        """
+        - `name`: Material do bloco;
+        - `position`: Posição do rótulo. Ignorada por `place_blocks()`, que
+        calcula a posição a partir da estrutura.
+        """
         self.name: MaterialName = name
-        self.position = Vector2.parse(position)
+        self.position = Vector2.parse(position, copy=True)
         self.auto_mesh: bool = True
         self.mesh_size: float = 0
         self.circuit_name: str = ''
@@ -91,7 +111,7 @@ class BlockBuilder:
         return self
 
     def build(self) -> Block:
-        femm.mi_getmaterial(self.name)
+        material.registry.ensure(self.name)
         femm.mi_addblocklabel(*self.position)
 
         block = Block(
@@ -107,3 +127,145 @@ class BlockBuilder:
         block.update()
 
         return block
+
+
+def interior_point(structure: Structure, precision: float = 1e-6) -> Vector2:
+    """
+    Ponto interno de uma estrutura fechada, o mais distante possível do
+    contorno, calculado pelo `polylabel`.
+    """
+    match structure.connect_method:
+        case 'circle':
+            return Vector2.midpoint(*structure.nodes)
+        case 'closed loop':
+            point, _ = polylabel(
+                Vector2Array.parse(structure.nodes).data, precision=precision
+            )
+            return Vector2(float(point[0]), float(point[1]))
+        case 'open loop':
+            raise ValueError('Open loop structures have no interior.')
+
+
+def place_blocks(
+    regions: Sequence[tuple[Structure, BlockBuilder]],
+    precision: float = 1e-6,
+) -> list[Block]:
+    """
+    Posiciona e configura os rótulos de várias regiões com um único
+    programa Lua. Cada região é uma estrutura fechada e o construtor com as
+    propriedades do seu bloco. O rótulo fica no ponto interno mais distante
+    do contorno da estrutura.
+
+    Furos não são considerados: uma estrutura dentro de outra deve ter o
+    seu próprio rótulo.
+    """
+    blocks: list[Block] = []
+    for structure, builder in regions:
+        builder.position = interior_point(structure, precision)
+        blocks.append(
+            Block(
+                builder.name,
+                builder.position,
+                builder.auto_mesh,
+                builder.mesh_size,
+                builder.circuit_name,
+                builder.magnetization_direction,
+                builder.group,
+                builder.turns,
+            )
+        )
+
+    material.registry.ensure(*(block.name for block in blocks))
+
+    positions = np.array([tuple(block.position) for block in blocks])
+    lines = [
+        f'x = {lua.table(positions[:, 0].tolist())}',
+        f'y = {lua.table(positions[:, 1].tolist())}',
+        f'for i = 1, {len(blocks)} do',
+        'mi_addblocklabel(x[i], y[i])',
+        'end',
+    ]
+    for block in blocks:
+        lines.extend(block.lua())
+
+    lua.run('\n'.join(lines) + '\n', 'blocks')
+
+    return blocks
+
+
+def update_blocks(
+    blocks: Iterable[Block],
+    predicate: Callable[[Block], bool] | None = None,
+    *,
+    group: int | None = None,
+    turns: int | None = None,
+    circuit_name: str | None = None,
+    new_group: int | None = None,
+    mesh_size: float | None = None,
+    magnetization_direction: float | None = None,
+) -> list[Block]:
+    """
+    Altera as propriedades de vários blocos com um único programa Lua.
+
+    Os blocos são filtrados pelo grupo `group` e por `predicate`. Os blocos
+    que ficam com as mesmas propriedades são selecionados juntos e
+    atualizados por uma única chamada de `mi_setblockprop()`. As
+    propriedades não definidas são mantidas e `mesh_size` desativa a malha
+    automática, como em `BlockBuilder.with_mesh_size()`.
+
+    - `group`: Grupo dos blocos alterados;
+    - `new_group`: Novo grupo dos blocos.
+
+    Retorna os blocos alterados, cujo estado local também é atualizado.
+    """
+    changes = {
+        'turns': turns,
+        'circuit_name': circuit_name,
+        'group': new_group,
+        'mesh_size': mesh_size,
+        'magnetization_direction': magnetization_direction,
+    }
+    changes = {
+        key: value for key, value in changes.items() if value is not None
+    }
+    if mesh_size is not None:
+        changes['auto_mesh'] = False
+
+    selected = [
+        block
+        for block in blocks
+        if (group is None or block.group == group)
+        and (predicate is None or predicate(block))
+    ]
+    if not selected or not changes:
+        return selected
+
+    # Blocos agrupados pela chamada de `mi_setblockprop()` resultante.
+    batches: dict[str, tuple[Block, list[Block]]] = {}
+    for block in selected:
+        target = replace(block, **changes)
+        key = target.lua()[1]
+        batches.setdefault(key, (target, []))[1].append(block)
+
+    lines: list[str] = []
+    for target, members in batches.values():
+        x = [block.position.x for block in members]
+        y = [block.position.y for block in members]
+        lines.extend(
+            [
+                f'x = {lua.table(x)}',
+                f'y = {lua.table(y)}',
+                f'for i = 1, {len(members)} do',
+                'mi_selectlabel(x[i], y[i])',
+                'end',
+                *target.lua()[1:],
+            ]
+        )
+
+    lua.run('\n'.join(lines) + '\n', 'blocks')
+
+    for block in selected:
+        for key, value in changes.items():
+            setattr(block, key, value)
+
+    return selected
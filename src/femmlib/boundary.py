@@ -4,8 +4,8 @@ from dataclasses import dataclass
 from typing import Literal, Self
 
 import femm
-from vec import Vec2Like
-from structure import Structure
+
+from femmlib.structure import Structure
 
 type BoundaryFormat = Literal[0, 1, 2, 3, 4, 5, 6, 7]
 
@@ -127,6 +127,7 @@ class BoundaryBuilder:
             self.conductivity,
             self.normal_component,
             self.tangential_component,
+            self.boundary_format,
             self.inner_angle,
             self.outer_angle,
         )
@@ -193,3 +194,21 @@ class Boundary:
     @staticmethod
     def builder(name: str, structure: Structure) -> BoundaryBuilder:
         return BoundaryBuilder(name, structure)
+
+    def set_angles(self, inner_angle: float, outer_angle: float) -> None:
+        """
+        Altera os ângulos de uma fronteira de entreferro sem redesenhar a
+        geometria. Girar o rotor equivale a alterar `inner_angle`.
+
+        - `inner_angle`: Ângulo interno da borda em graus;
+        - `outer_angle`: Ângulo externo da borda em graus.
+        """
+        assert self.props.boundary_format in (6, 7), (
+            'Only air gap boundaries have angles.'
+        )
+
+        femm.mi_modifyboundprop(self.name, 10, inner_angle)
+        femm.mi_modifyboundprop(self.name, 11, outer_angle)
+
+        self.props.inner_angle = inner_angle
+        self.props.outer_angle = outer_angle
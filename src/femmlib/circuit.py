@@ -1,9 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Literal, Iterator, Self
+from dataclasses import dataclass, fields
+from typing import TYPE_CHECKING, Any, Literal, Self
 
 import femm
+import numpy as np
+
+from femmlib import lua
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from numpy.typing import ArrayLike, NDArray
 
 type CircuitType = Literal[0, 1]
 
@@ -19,13 +27,15 @@ class CircuitProps:
     - `current`: Corrente;
     - `voltage`: Tensão;
     - `flux_linkage`: Fluxo concatenado.
+
+    Os valores são complexos em problemas harmônicos e reais nos demais.
     """
 
-    current: float
-    voltage: float
-    flux_linkage: float
+    current: complex
+    voltage: complex
+    flux_linkage: complex
 
-    def __iter__(self) -> Iterator[float]:
+    def __iter__(self) -> Iterator[complex]:
         """
         Permite utilizar um objeto da classe `CircuitProps` como um iterador.
         """
@@ -52,16 +62,16 @@ class CircuitProps:
 
 @dataclass
 class CircuitPropsExtended:
-    current: float
-    voltage: float
-    flux_linkage: float
-    flux: float
-    mmf: float
-    reluctance: float
-    flux_density: float
-    inductance: float
-
-    def __iter__(self) -> Iterator[float]:
+    current: complex
+    voltage: complex
+    flux_linkage: complex
+    flux: complex
+    mmf: complex
+    reluctance: complex
+    flux_density: complex
+    inductance: complex
+
+    def __iter__(self) -> Iterator[complex]:
         yield self.current
         yield self.voltage
         yield self.flux_linkage
@@ -75,6 +85,161 @@ class CircuitPropsExtended:
         return 8
 
 
+def batch_dtype(
+    names: list[str], columns: list[NDArray[np.generic]]
+) -> np.dtype:
+    """
+    Tipo do vetor estruturado com os campos `names`. Se algum valor for
+    complexo, todos os campos são complexos.
+    """
+    value_type = np.result_type(np.float64, *columns)
+    return np.dtype([(name, value_type) for name in names])
+
+
+@dataclass
+class CircuitPropsBatch:
+    """
+    Várias `CircuitProps` guardadas em um vetor estruturado do NumPy com os
+    mesmos nomes de campo, uma linha por ponto. Evita criar um objeto por
+    ponto ao analisar varreduras grandes.
+    """
+
+    data: NDArray[np.void]
+
+    @classmethod
+    def from_columns(
+        cls, current: ArrayLike, voltage: ArrayLike, flux_linkage: ArrayLike
+    ) -> Self:
+        columns = [
+            np.asarray(current),
+            np.asarray(voltage),
+            np.asarray(flux_linkage),
+        ]
+        names = [field.name for field in fields(CircuitProps)]
+        data = np.empty(len(columns[0]), dtype=batch_dtype(names, columns))
+        for name, column in zip(names, columns, strict=True):
+            data[name] = column
+
+        return cls(data)
+
+    @classmethod
+    def from_props(cls, props: Iterable[CircuitProps]) -> Self:
+        """Converte uma sequência de `CircuitProps`."""
+        rows = [tuple(prop) for prop in props]
+        columns = np.array(rows).reshape(-1, 3).T
+
+        return cls.from_columns(*columns)
+
+    @property
+    def current(self) -> NDArray[np.inexact[Any]]:
+        return self.data['current']
+
+    @property
+    def voltage(self) -> NDArray[np.inexact[Any]]:
+        return self.data['voltage']
+
+    @property
+    def flux_linkage(self) -> NDArray[np.inexact[Any]]:
+        return self.data['flux_linkage']
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index: int) -> CircuitProps:
+        return CircuitProps(*self.data[index].tolist())
+
+    def with_extension(
+        self, turns: ArrayLike, area: ArrayLike
+    ) -> CircuitPropsExtendedBatch:
+        """
+        Equivalente vetorizado de `CircuitProps.with_extension()`. `turns` e
+        `area` podem ser escalares ou um valor por linha.
+        """
+        turns = np.asarray(turns)
+        area = np.asarray(area)
+        flux = self.flux_linkage / turns
+        mmf = turns * self.current
+
+        return CircuitPropsExtendedBatch.from_columns(
+            self.current,
+            self.voltage,
+            self.flux_linkage,
+            flux=flux,
+            mmf=mmf,
+            reluctance=mmf / flux,
+            flux_density=flux / area,  # Valor aproximado devido à área.
+            inductance=self.flux_linkage / self.current,
+        )
+
+
+@dataclass
+class CircuitPropsExtendedBatch:
+    """
+    Várias `CircuitPropsExtended` guardadas em um vetor estruturado do NumPy
+    com os mesmos nomes de campo, uma linha por ponto.
+    """
+
+    data: NDArray[np.void]
+
+    @classmethod
+    def from_columns(cls, *args: ArrayLike, **kwargs: ArrayLike) -> Self:
+        """Recebe as colunas na ordem ou pelo nome dos campos."""
+        names = [field.name for field in fields(CircuitPropsExtended)]
+        values = dict(zip(names, args, strict=False)) | kwargs
+        columns = [np.asarray(values[name]) for name in names]
+        data = np.empty(len(columns[0]), dtype=batch_dtype(names, columns))
+        for name, column in zip(names, columns, strict=True):
+            data[name] = column
+
+        return cls(data)
+
+    @classmethod
+    def from_props(cls, props: Iterable[CircuitPropsExtended]) -> Self:
+        """Converte uma sequência de `CircuitPropsExtended`."""
+        rows = [tuple(prop) for prop in props]
+        columns = np.array(rows).reshape(-1, 8).T
+
+        return cls.from_columns(*columns)
+
+    @property
+    def current(self) -> NDArray[np.inexact[Any]]:
+        return self.data['current']
+
+    @property
+    def voltage(self) -> NDArray[np.inexact[Any]]:
+        return self.data['voltage']
+
+    @property
+    def flux_linkage(self) -> NDArray[np.inexact[Any]]:
+        return self.data['flux_linkage']
+
+    @property
+    def flux(self) -> NDArray[np.inexact[Any]]:
+        return self.data['flux']
+
+    @property
+    def mmf(self) -> NDArray[np.inexact[Any]]:
+        return self.data['mmf']
+
+    @property
+    def reluctance(self) -> NDArray[np.inexact[Any]]:
+        return self.data['reluctance']
+
+    @property
+    def flux_density(self) -> NDArray[np.inexact[Any]]:
+        return self.data['flux_density']
+
+    @property
+    def inductance(self) -> NDArray[np.inexact[Any]]:
+        return self.data['inductance']
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index: int) -> CircuitPropsExtended:
+        return CircuitPropsExtended(*self.data[index].tolist())
+
+
 class CircuitBuilder:
     def __init__(self, name: str, current: float) -> None:
         self.name = name
@@ -128,3 +293,45 @@ class Circuit:
         """
         props: tuple[float, ...] = femm.mo_getcircuitproperties(self.name)  # type: ignore
         return CircuitProps(*props)
+
+
+def update_circuits(
+    circuits: Iterable[Circuit],
+    predicate: Callable[[Circuit], bool] | None = None,
+    *,
+    current: float | None = None,
+    type: CircuitType | None = None,
+) -> list[Circuit]:
+    """
+    Altera a corrente e o tipo de vários circuitos com um único programa
+    Lua, chamando `mi_modifycircprop()` para cada circuito filtrado por
+    `predicate`. Retorna os circuitos alterados, cujo estado local também é
+    atualizado.
+    """
+    selected = [
+        circuit
+        for circuit in circuits
+        if predicate is None or predicate(circuit)
+    ]
+    lines: list[str] = []
+    for circuit in selected:
+        name = lua.string(circuit.name)
+        if current is not None:
+            lines.append(
+                f'mi_modifycircprop({name}, 1, {lua.number(current)})'
+            )
+        if type is not None:
+            lines.append(f'mi_modifycircprop({name}, 2, {type})')
+
+    if not lines:
+        return selected
+
+    lua.run('\n'.join(lines) + '\n', 'circuits')
+
+    for circuit in selected:
+        if current is not None:
+            circuit.current = current
+        if type is not None:
+            circuit.type = type
+
+    return selected
@@ -1,15 +1,21 @@
+import functools
 import time
-from collections.abc import Iterator
-from contextlib import contextmanager
+from collections.abc import Iterator, Sequence
+from contextlib import AbstractAsyncContextManager, contextmanager
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Self
 
 import femm
+import numpy as np
+from numpy.typing import NDArray
 
+from femmlib import aio, lua, material
+from femmlib.circuit import CircuitProps
 from femmlib.shape import Circle
 from femmlib.state import State
 from femmlib.types import ArcSolver, DocType, Group, ProbType, Unit
+from mathlib.sampling import BoundingBox
 from mathlib.vector2 import LEFT, RIGHT, Vector2, Vector2Like
 
 CONV_RATE: dict[Unit, float] = {
@@ -96,6 +102,7 @@ class FEMM:
                 case 'current flow':
                     femm.newdocument(3)
 
+            material.registry.reset()
             self.define_problem()
             yield
             if delay > 0:
@@ -115,6 +122,7 @@ class FEMM:
         try:
             femm.openfemm()
             femm.opendocument(str(file))
+            material.registry.reset(file)
             yield
             if delay > 0:
                 time.sleep(delay)
@@ -134,6 +142,57 @@ class FEMM:
 
         return self
 
+    def solve_file(
+        self, file_name: str, circuits: Sequence[str]
+    ) -> dict[str, CircuitProps]:
+        """
+        Abre `file_name`, resolve e retorna as propriedades dos circuitos
+        `circuits`.
+        """
+        with self.open(file_name):
+            self.solve()
+
+            match self.doc_type:
+                case 'magnetics':
+                    return {
+                        name: CircuitProps(
+                            *femm.mo_getcircuitproperties(name)  # type: ignore
+                        )
+                        for name in circuits
+                    }
+                case _:
+                    raise NotImplementedError(
+                        f'Missing implementation for {self.doc_type}.'
+                    )
+
+    async def asolve(
+        self, file_name: str, circuits: Sequence[str]
+    ) -> dict[str, CircuitProps]:
+        """
+        Versão assíncrona de `solve_file()`, executada em um processo
+        trabalhador sem bloquear o laço de eventos. Cancelar a tarefa encerra
+        o processo.
+        """
+        return await aio.run(self.solve_file, file_name, list(circuits))
+
+    def anew(
+        self, file_name: str, *, delay: float = 0
+    ) -> AbstractAsyncContextManager[aio.AsyncSession]:
+        """
+        Versão assíncrona de `new()`. O documento fica aberto em um processo
+        trabalhador e as funções que o constroem são executadas com
+        `await session.call(fn, *args)`.
+        """
+        return aio.session(functools.partial(self.new, file_name, delay=delay))
+
+    def aopen(
+        self, file_name: str, *, delay: float = 0
+    ) -> AbstractAsyncContextManager[aio.AsyncSession]:
+        """Versão assíncrona de `open()`, assim como `anew()`."""
+        return aio.session(
+            functools.partial(self.open, file_name, delay=delay)
+        )
+
     def update_freq(self, freq: float) -> Self:
         self.freq = freq
         self.state.freq = freq
@@ -183,3 +242,74 @@ class FEMM:
             node_group=node_group,
             state=self.state,
         )
+
+    def sample_line(
+        self, a: Vector2Like, b: Vector2Like, n: int
+    ) -> NDArray[np.float64] | NDArray[np.complex128]:
+        """
+        Amostra a densidade de fluxo em `n` pontos igualmente espaçados de `a`
+        até `b` na solução carregada, com uma única chamada ao FEMM. Retorna
+        um vetor de formato (n, 2) com as componentes x e y.
+        """
+        a = Vector2.parse(a)
+        step = (Vector2.parse(b) - a) / max(n - 1, 1)
+
+        return self.sample_loop(
+            [f'for i = 0, {n - 1} do'],
+            f'{lua.number(a.x)} + {lua.number(step.x)} * i',
+            f'{lua.number(a.y)} + {lua.number(step.y)} * i',
+            ['end'],
+        ).reshape(n, 2)
+
+    def sample_grid(
+        self, bbox: BoundingBox, nx: int, ny: int
+    ) -> NDArray[np.float64] | NDArray[np.complex128]:
+        """
+        Amostra a densidade de fluxo em uma grade de `nx` por `ny` pontos que
+        cobre a caixa `bbox` na solução carregada, com uma única chamada ao
+        FEMM. Retorna um vetor de formato (ny, nx, 2).
+        """
+        lower = Vector2.parse(bbox[0])
+        upper = Vector2.parse(bbox[1])
+        dx = (upper.x - lower.x) / max(nx - 1, 1)
+        dy = (upper.y - lower.y) / max(ny - 1, 1)
+
+        return self.sample_loop(
+            [f'for j = 0, {ny - 1} do', f'for i = 0, {nx - 1} do'],
+            f'{lua.number(lower.x)} + {lua.number(dx)} * i',
+            f'{lua.number(lower.y)} + {lua.number(dy)} * j',
+            ['end', 'end'],
+        ).reshape(ny, nx, 2)
+
+    def sample_loop(
+        self, loops: list[str], x: str, y: str, ends: list[str]
+    ) -> NDArray[np.float64] | NDArray[np.complex128]:
+        """
+        Executa `mo_getb()` em um laço Lua que escreve todos os pontos em um
+        arquivo e o lê de uma só vez.
+        """
+        results = FEMM_FOLDER / 'samples.csv'
+
+        match self.doc_type:
+            case 'magnetics':
+                code = '\n'.join(
+                    [
+                        f'results = openfile({lua.path(results)}, "w")',
+                        *loops,
+                        f'b1, b2 = mo_getb({x}, {y})',
+                        'write(results, format("%.17g,%.17g,%.17g,%.17g\\n", '
+                        're(b1), im(b1), re(b2), im(b2)))',
+                        *ends,
+                        'closefile(results)',
+                    ]
+                )
+                lua.run(code + '\n', 'samples')
+            case _:
+                raise NotImplementedError(
+                    f'Missing implementation for {self.doc_type}.'
+                )
+
+        values = np.loadtxt(results, delimiter=',', ndmin=2)
+        b = values[:, 0::2] + 1j * values[:, 1::2]
+
+        return b if self.freq != 0 else b.real
@@ -0,0 +1,274 @@
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+
+import femm
+
+from femmlib.structure import Structure, StructureBuilder
+from femmlib.types import Group
+from mathlib.vector2 import Vector2, Vector2Array
+
+type Model = Mapping[str, Structure]
+"""Geometria de um documento: estruturas indexadas por um nome estável."""
+type Position = tuple[float, float]
+
+# Casas decimais usadas para comparar posições e deslocamentos.
+DECIMALS = 9
+# Primeiro grupo temporário dos nós deslocados. Fica longe dos grupos
+# usados pelo modelo para que `mi_selectgroup()` não pegue outra geometria.
+MOVE_GROUP = 1 << 20
+
+
+def position(vec: Vector2) -> Position:
+    return (round(vec.x, DECIMALS), round(vec.y, DECIMALS))
+
+
+def segments(structure: Structure) -> list[tuple[Vector2, Vector2, Vector2]]:
+    """
+    Segmentos da estrutura como `(ponto, início, fim)`, em que o ponto
+    seleciona o segmento: o ponto médio de um segmento reto ou um ponto de
+    cada arco.
+    """
+    nodes = Vector2Array.parse(structure.nodes).tolist()
+
+    match structure.connect_method:
+        case 'open loop' | 'closed loop':
+            ends = nodes[1:]
+            if structure.connect_method == 'closed loop':
+                ends.append(nodes[0])
+            return [
+                (Vector2.midpoint(start, end), start, end)
+                for start, end in zip(nodes, ends, strict=False)
+            ]
+        case 'circle':
+            first, last = nodes
+            center = Vector2.midpoint(first, last)
+            arm = (first - center).perpendicular()
+            return [(arm + center, first, last), (-arm + center, last, first)]
+
+
+@dataclass
+class Move:
+    """
+    Desloca um conjunto de nós já desenhados por `offset`. Os segmentos
+    ligados aos nós os acompanham.
+
+    Os nós passam antes pelo grupo temporário `group`, de forma que o
+    deslocamento não dependa de selecionar nós pela posição depois que
+    outros deslocamentos já alteraram o documento.
+
+    - `groups`: Grupo original de cada nó, restaurado ao final.
+    """
+
+    nodes: list[Vector2]
+    offset: Vector2
+    groups: list[Group] = field(default_factory=list[Group])
+    group: Group = MOVE_GROUP
+
+    def select(self) -> None:
+        """Move os nós para o grupo temporário."""
+        for node in self.nodes:
+            femm.mi_selectnode(*node)
+        femm.mi_setgroup(self.group)
+        femm.mi_clearselected()
+
+    def translate(self) -> None:
+        femm.mi_selectgroup(self.group)
+        femm.mi_movetranslate(*self.offset)
+        femm.mi_clearselected()
+
+    def restore(self) -> None:
+        """Devolve os nós, já deslocados, aos grupos originais."""
+        for group in sorted(set(self.groups)):
+            for node, node_group in zip(self.nodes, self.groups, strict=True):
+                if node_group == group:
+                    femm.mi_selectnode(*(node + self.offset))
+            femm.mi_setgroup(group)
+            femm.mi_clearselected()
+
+    def apply(self) -> None:
+        self.select()
+        self.translate()
+        self.restore()
+
+
+@dataclass
+class Delete:
+    """
+    Remove uma estrutura do documento. Apenas os nós e segmentos que não
+    pertencem a outras estruturas são removidos, para que as estruturas que
+    permanecem continuem intactas.
+
+    - `nodes`: Nós a remover, junto dos segmentos ligados a eles;
+    - `segments`: Pontos médios dos segmentos entre nós que permanecem.
+    """
+
+    structure: Structure
+    nodes: list[Vector2] = field(default_factory=list[Vector2])
+    segments: list[Vector2] = field(default_factory=list[Vector2])
+
+    def apply(self) -> None:
+        if self.segments:
+            for point in self.segments:
+                if self.structure.connect_method == 'circle':
+                    femm.mi_selectarcsegment(*point)
+                else:
+                    femm.mi_selectsegment(*point)
+            femm.mi_deleteselected()
+
+        if self.nodes:
+            for node in self.nodes:
+                femm.mi_selectnode(*node)
+            femm.mi_deleteselectednodes()
+
+
+@dataclass
+class Add:
+    """Desenha uma estrutura nova no documento."""
+
+    structure: Structure
+
+    def apply(self) -> None:
+        StructureBuilder(list(self.structure.nodes)).with_connect_method(
+            self.structure.connect_method
+        ).with_group(self.structure.group).build()
+
+
+type Operation = Move | Delete | Add
+
+
+@dataclass
+class ModelDiff:
+    """
+    Conjunto mínimo de operações que transforma o modelo anterior no
+    próximo. As remoções são aplicadas primeiro, seguidas dos deslocamentos
+    e, por último, das adições, para que nós recém desenhados não sejam
+    confundidos com nós que ainda serão movidos.
+    """
+
+    deletions: list[Delete] = field(default_factory=list[Delete])
+    moves: list[Move] = field(default_factory=list[Move])
+    additions: list[Add] = field(default_factory=list[Add])
+
+    def operations(self) -> list[Operation]:
+        return [*self.deletions, *self.moves, *self.additions]
+
+    def __len__(self) -> int:
+        return len(self.deletions) + len(self.moves) + len(self.additions)
+
+    def apply(self) -> None:
+        """Aplica as operações no documento aberto."""
+        for deletion in self.deletions:
+            deletion.apply()
+
+        # Todos os nós são separados antes do primeiro deslocamento, enquanto
+        # as posições ainda são as do modelo anterior.
+        for move in self.moves:
+            move.select()
+        for move in self.moves:
+            move.translate()
+        for move in self.moves:
+            move.restore()
+
+        for addition in self.additions:
+            addition.apply()
+
+
+def diff(previous: Model, target: Model) -> ModelDiff:
+    """
+    Compara dois modelos e retorna as operações necessárias para ir de
+    `previous` a `target`.
+
+    Estruturas de mesmo nome, mesmo método de ligação e mesma quantidade de
+    nós são consideradas a mesma estrutura deslocada. Os nós que se moveram
+    são agrupados pelo deslocamento, de forma que todos os nós com o mesmo
+    deslocamento, mesmo de estruturas diferentes, são movidos por um único
+    comando. Estruturas cuja topologia mudou são removidas e redesenhadas.
+
+    Um nó compartilhado que recebe deslocamentos diferentes de duas
+    estruturas gera um `ValueError`.
+    """
+    model_diff = ModelDiff()
+    removed: list[Structure] = []
+    kept: list[Structure] = []
+    moved: dict[Position, Move] = {}
+    # Deslocamento de cada nó, para que nós compartilhados entre estruturas
+    # sejam movidos uma única vez.
+    offsets: dict[Position, Position] = {}
+
+    for name, structure in previous.items():
+        if name not in target:
+            removed.append(structure)
+
+    for name, structure in target.items():
+        old = previous.get(name)
+
+        if old is None:
+            model_diff.additions.append(Add(structure))
+            continue
+
+        if old.connect_method != structure.connect_method or len(
+            old.nodes
+        ) != len(structure.nodes):
+            removed.append(old)
+            model_diff.additions.append(Add(structure))
+            continue
+
+        kept.append(old)
+        for old_node, new_node in zip(old.nodes, structure.nodes, strict=True):
+            offset = new_node - old_node
+            key = position(offset)
+            node = position(old_node)
+
+            if node in offsets:
+                if offsets[node] != key:
+                    raise ValueError(
+                        f'Shared node {node} has conflicting offsets '
+                        f'{offsets[node]} and {key}.'
+                    )
+                continue
+
+            offsets[node] = key
+            if key == (0, 0):
+                continue
+
+            if key not in moved:
+                moved[key] = Move([], offset)
+            moved[key].nodes.append(old_node)
+            moved[key].groups.append(old.group)
+
+    for index, move in enumerate(moved.values()):
+        move.group = MOVE_GROUP + index
+        model_diff.moves.append(move)
+
+    # Nós e segmentos que continuam no documento, nas posições anteriores.
+    kept_nodes = {
+        position(node) for structure in kept for node in structure.nodes
+    }
+    kept_segments = {
+        position(point)
+        for structure in kept
+        for point, _, _ in segments(structure)
+    }
+    deleted: set[Position] = set()
+    for structure in removed:
+        deletion = Delete(structure)
+        for node in structure.nodes:
+            key = position(node)
+            if key not in kept_nodes and key not in deleted:
+                deleted.add(key)
+                deletion.nodes.append(node)
+        # Os demais segmentos são removidos junto dos seus nós.
+        for point, start, end in segments(structure):
+            key = position(point)
+            if (
+                position(start) in kept_nodes
+                and position(end) in kept_nodes
+                and key not in kept_segments
+                and key not in deleted
+            ):
+                deleted.add(key)
+                deletion.segments.append(point)
+
+        model_diff.deletions.append(deletion)
+
+    return model_diff
@@ -0,0 +1,453 @@
+import hashlib
+import multiprocessing
+import os
+import queue
+import secrets
+import socket
+import threading
+import time
+import traceback
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass, field, replace
+from multiprocessing.managers import (
+    BaseManager,
+    # Existe em tempo de execução, mas não nos stubs da biblioteca padrão.
+    EventProxy,  # pyright: ignore[reportAttributeAccessIssue, reportUnknownVariableType]
+)
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+
+from femmlib.circuit import CircuitPropsExtended
+from femmlib.core import FEMM_FOLDER
+from femmlib.store import ResultStore
+from helpers.path import PathLike, parse_path
+
+type Address = tuple[str, int]
+type Solver = Callable[['Task'], CircuitPropsExtended]
+
+# Tempo, em s, que um trabalhador espera por uma tarefa antes de verificar
+# se o coordenador encerrou a varredura.
+POLL_INTERVAL = 0.1
+# Intervalo, em s, entre os sinais de vida de um trabalhador.
+HEARTBEAT_INTERVAL = 1.0
+
+
+@dataclass
+class Task:
+    """
+    Uma variante da varredura enviada a um trabalhador.
+
+    - `params`: Valores dos parâmetros da variante;
+    - `model_name`: Nome do arquivo `.FEM` do modelo;
+    - `model`: Conteúdo do arquivo do modelo. O servidor o envia apenas na
+    primeira tarefa de cada trabalhador e `run_worker()` o preenche nas
+    demais;
+    - `options`: Opções da solução, como os circuitos observados;
+    - `model_hash`: Identifica o conteúdo do modelo.
+    """
+
+    id: int
+    params: dict[str, float]
+    model_name: str = ''
+    model: bytes = b''
+    options: dict[str, Any] = field(default_factory=dict[str, Any])
+    model_hash: str = ''
+
+    def materialize(self, folder: PathLike = FEMM_FOLDER) -> Path:
+        """Salva o modelo em `folder` e retorna o caminho do arquivo."""
+        file = parse_path(folder) / self.model_name
+        file.parent.mkdir(parents=True, exist_ok=True)
+        if self.model:
+            file.write_bytes(self.model)
+
+        return file
+
+
+@dataclass
+class TaskResult:
+    """Resultado de uma tarefa. `error` contém o traceback de uma falha."""
+
+    id: int
+    params: dict[str, float]
+    props: CircuitPropsExtended | None
+    error: str = ''
+    worker: str = ''
+
+
+@dataclass
+class Lease:
+    """Tarefa em execução por um trabalhador."""
+
+    task: Task
+    worker: str
+
+
+class Dispatcher:
+    """
+    Entrega as tarefas aos trabalhadores no processo do servidor e registra
+    quais estão em execução por cada um, de forma que as tarefas de um
+    trabalhador que parou de dar sinais de vida voltem para a fila.
+
+    Os modelos são guardados uma única vez, pelo `model_hash`, e cada
+    trabalhador recebe o conteúdo de um modelo apenas na primeira tarefa
+    que o usa.
+    """
+
+    def __init__(
+        self,
+        tasks: queue.Queue[Task],
+        results: queue.Queue[TaskResult],
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.tasks = tasks
+        self.results = results
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.models: dict[str, bytes] = {}
+        self.running: dict[int, Lease] = {}
+        # Último sinal de vida e modelos já enviados a cada trabalhador.
+        self.seen: dict[str, float] = {}
+        self.sent: dict[str, set[str]] = {}
+
+    def add_model(self, key: str, model: bytes) -> None:
+        with self.lock:
+            self.models[key] = model
+
+    def model(self, key: str) -> bytes:
+        with self.lock:
+            return self.models[key]
+
+    def claim(self, worker: str, timeout: float) -> Task | None:
+        """
+        Espera até `timeout` por uma tarefa e a registra como em execução
+        por `worker`.
+        """
+        try:
+            task = self.tasks.get(timeout=timeout)
+        except queue.Empty:
+            self.heartbeat(worker)
+            return None
+
+        with self.lock:
+            self.seen[worker] = self.clock()
+            self.running[task.id] = Lease(task, worker)
+            sent = self.sent.setdefault(worker, set())
+            if task.model_hash and task.model_hash not in sent:
+                sent.add(task.model_hash)
+                return replace(task, model=self.models[task.model_hash])
+
+        return task
+
+    def heartbeat(self, worker: str) -> None:
+        with self.lock:
+            self.seen[worker] = self.clock()
+
+    def complete(self, result: TaskResult) -> None:
+        """Libera a tarefa e envia o resultado ao coordenador."""
+        with self.lock:
+            lease = self.running.get(result.id)
+            if lease is not None and lease.worker == result.worker:
+                del self.running[result.id]
+
+        self.results.put(result)
+
+    def expire(self, timeout: float) -> list[int]:
+        """
+        Devolve à fila as tarefas dos trabalhadores sem sinal de vida há mais
+        de `timeout` segundos e retorna os seus identificadores. Um
+        trabalhador que volte a se conectar recebe os modelos de novo.
+        """
+        now = self.clock()
+        with self.lock:
+            lost = {
+                worker
+                for worker, seen in self.seen.items()
+                if now - seen > timeout
+            }
+            expired = [
+                lease
+                for lease in self.running.values()
+                if lease.worker in lost
+            ]
+            for lease in expired:
+                del self.running[lease.task.id]
+            for worker in lost:
+                del self.seen[worker]
+                self.sent.pop(worker, None)
+
+        for lease in expired:
+            self.tasks.put(replace(lease.task, model=b''))
+
+        return [lease.task.id for lease in expired]
+
+
+# Estado do processo do servidor, criado por `Coordinator.start()`.
+TASKS: queue.Queue[Task] = queue.Queue()
+RESULTS: queue.Queue[TaskResult] = queue.Queue()
+STOPPED = threading.Event()
+DISPATCHER = Dispatcher(TASKS, RESULTS)
+
+
+def get_tasks() -> queue.Queue[Task]:
+    return TASKS
+
+
+def get_results() -> queue.Queue[TaskResult]:
+    return RESULTS
+
+
+def get_stopped() -> threading.Event:
+    return STOPPED
+
+
+def get_dispatcher() -> Dispatcher:
+    return DISPATCHER
+
+
+class SweepManager(BaseManager):
+    """Gerenciador compartilhado pelo coordenador e pelos trabalhadores."""
+
+
+SweepManager.register('tasks', callable=get_tasks)
+SweepManager.register('results', callable=get_results)
+SweepManager.register('stopped', callable=get_stopped, proxytype=EventProxy)
+SweepManager.register('dispatcher', callable=get_dispatcher)
+
+
+class Coordinator:
+    """
+    Distribui as variantes de uma varredura para trabalhadores em outras
+    máquinas por TCP, com `multiprocessing.managers`, e adiciona os
+    resultados a um `ResultStore` conforme chegam.
+
+    As filas ficam em um processo servidor iniciado por `start()`. Os
+    trabalhadores se conectam ao endereço `address` com a mesma `authkey`,
+    por meio de `run_worker()`. As tarefas de um trabalhador que para de
+    dar sinais de vida por `worker_timeout` segundos, por ter caído ou
+    perdido a conexão, são enviadas a outro.
+    """
+
+    def __init__(
+        self,
+        store: ResultStore,
+        address: Address = ('127.0.0.1', 0),
+        authkey: bytes | None = None,
+        worker_timeout: float = 30,
+    ) -> None:
+        """
+        - `store`: Destino dos resultados;
+        - `address`: Endereço do servidor. Por padrão aceita apenas conexões
+        locais; use o endereço da rede para trabalhadores em outras
+        máquinas. A porta 0 escolhe uma porta livre, disponível em `address`
+        depois de `start()`;
+        - `authkey`: Chave compartilhada com os trabalhadores. Se não for
+        definida, uma chave aleatória é gerada e fica em `authkey`;
+        - `worker_timeout`: Tempo, em s, sem sinais de vida de um
+        trabalhador antes que as suas tarefas voltem para a fila.
+        """
+        self.store = store
+        self.address = address
+        self.authkey = (
+            authkey if authkey is not None else secrets.token_bytes(32)
+        )
+        self.worker_timeout = worker_timeout
+        self.manager = SweepManager(
+            address=address,
+            authkey=self.authkey,
+            ctx=multiprocessing.get_context('spawn'),
+        )
+        self.pending: dict[int, Task] = {}
+        self.failed: list[TaskResult] = []
+        self.next_id = 0
+        # Hash do conteúdo de cada modelo já enviado ao servidor.
+        self.models: dict[Path, str] = {}
+        self.started = False
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def start(self) -> None:
+        self.manager.start()
+        # Representantes dos objetos do servidor, com a mesma interface.
+        manager: Any = self.manager
+        self.address = manager.address
+        self.tasks: queue.Queue[Task] = manager.tasks()
+        self.results: queue.Queue[TaskResult] = manager.results()
+        self.stopped: threading.Event = manager.stopped()
+        self.dispatcher: Dispatcher = manager.dispatcher()
+        self.started = True
+
+    def add_model(self, model: PathLike) -> str:
+        """
+        Envia o conteúdo do modelo ao servidor, uma única vez por arquivo, e
+        retorna o seu hash.
+        """
+        file = parse_path(model)
+        if file not in self.models:
+            content = file.read_bytes()
+            key = hashlib.sha256(content).hexdigest()
+            self.dispatcher.add_model(key, content)
+            self.models[file] = key
+
+        return self.models[file]
+
+    def submit(
+        self,
+        params: Mapping[str, float],
+        model: PathLike | None = None,
+        options: Mapping[str, Any] | None = None,
+    ) -> int:
+        """
+        Adiciona uma variante e retorna o seu identificador.
+
+        - `model`: Arquivo do modelo. O conteúdo é enviado uma única vez a
+        cada trabalhador, não junto de cada variante;
+        - `options`: Opções repassadas ao trabalhador.
+        """
+        file = parse_path(model) if model is not None else None
+        task = Task(
+            self.next_id,
+            dict(params),
+            file.name if file is not None else '',
+            options=dict(options or {}),
+            model_hash=self.add_model(file) if file is not None else '',
+        )
+        self.next_id += 1
+        self.pending[task.id] = task
+        self.tasks.put(task)
+
+        return task.id
+
+    def collect(self, timeout: float | None = None) -> Iterator[TaskResult]:
+        """
+        Retorna os resultados conforme chegam, até que todas as variantes
+        enviadas terminem, e adiciona os bem-sucedidos ao `store`. Enquanto
+        espera, devolve à fila as tarefas de trabalhadores perdidos. Lança
+        `TimeoutError` se nenhum resultado chegar em `timeout` segundos.
+
+        Uma tarefa enviada de novo pode terminar duas vezes; apenas o
+        primeiro resultado é usado.
+        """
+        last = time.monotonic()
+
+        while self.pending:
+            self.dispatcher.expire(self.worker_timeout)
+            try:
+                result: TaskResult = self.results.get(timeout=POLL_INTERVAL)
+            except queue.Empty as error:
+                if timeout is not None and time.monotonic() - last > timeout:
+                    raise TimeoutError(
+                        f'No results in {timeout} s, '
+                        f'{len(self.pending)} tasks pending.'
+                    ) from error
+                continue
+
+            last = time.monotonic()
+            if self.pending.pop(result.id, None) is None:
+                continue
+
+            if result.props is None:
+                self.failed.append(result)
+            else:
+                self.store.append(result.params, result.props)
+
+            yield result
+
+    def close(self) -> None:
+        """Avisa os trabalhadores e encerra o servidor, se foi iniciado."""
+        self.store.flush()
+        if not self.started:
+            return
+
+        self.stopped.set()
+        self.manager.shutdown()  # type: ignore
+        self.started = False
+
+
+def run_worker(
+    address: Address,
+    solve: Solver,
+    authkey: bytes,
+    name: str = '',
+    heartbeat: float = HEARTBEAT_INTERVAL,
+) -> int:
+    """
+    Conecta ao coordenador e resolve tarefas até a varredura ser
+    encerrada. Retorna quantas tarefas foram resolvidas.
+
+    - `solve`: Resolve uma tarefa, normalmente abrindo `task.materialize()`
+    com `FEMM.open()`. Exceções são enviadas ao coordenador como falhas;
+    - `authkey`: Chave do coordenador, `Coordinator.authkey`;
+    - `name`: Nome único do trabalhador. Por padrão usa a máquina e o
+    processo;
+    - `heartbeat`: Intervalo, em s, entre os sinais de vida enviados
+    enquanto uma tarefa é resolvida. Deve ser bem menor que o
+    `worker_timeout` do coordenador.
+    """
+    name = name or f'{socket.gethostname()}:{os.getpid()}'
+    manager: Any = SweepManager(address=address, authkey=authkey)
+    manager.connect()
+    dispatcher: Dispatcher = manager.dispatcher()
+    stopped: threading.Event = manager.stopped()
+    finished = threading.Event()
+    models: dict[str, bytes] = {}
+    solved = 0
+
+    def beat() -> None:
+        # Cada thread usa a sua própria conexão com o servidor.
+        while not finished.wait(heartbeat):
+            try:
+                dispatcher.heartbeat(name)
+            except (EOFError, ConnectionError):
+                return
+
+    threading.Thread(target=beat, daemon=True).start()
+
+    try:
+        while True:
+            try:
+                if stopped.is_set():
+                    break
+                task = dispatcher.claim(name, POLL_INTERVAL)
+            except (EOFError, ConnectionError):
+                # O coordenador foi encerrado.
+                break
+            if task is None:
+                continue
+
+            if task.model:
+                models[task.model_hash] = task.model
+            elif task.model_hash:
+                # Um trabalhador reiniciado com o mesmo nome não tem o modelo.
+                if task.model_hash not in models:
+                    models[task.model_hash] = dispatcher.model(task.model_hash)
+                task.model = models[task.model_hash]
+
+            try:
+                result = TaskResult(
+                    task.id, task.params, solve(task), '', name
+                )
+            except Exception:
+                result = TaskResult(
+                    task.id, task.params, None, traceback.format_exc(), name
+                )
+
+            try:
+                dispatcher.complete(result)
+            except (EOFError, ConnectionError):
+                break
+            solved += 1
+    finally:
+        finished.set()
+
+    return solved
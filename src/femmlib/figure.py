@@ -5,7 +5,7 @@ from typing import Literal, Self
 
 import femm
 
-from helpers import PathLike, to_path
+from helpers.path import PathLike, parse_path
 
 type VectorPlotType = Literal[0, 1, 2, 3, 4, 5, 6]
 type DensityPlotType = Literal[
@@ -121,7 +121,7 @@ class Figure:
         - `file`: Nome ou caminho do arquivo .png. Se o caminho possuir uma
         pasta não existente antes do nome do arquivo, a pasta será criada.
         """
-        file = to_path(file)
+        file = parse_path(file, ensure_parent=True)
 
         femm.mi_zoomnatural()
         femm.mo_showvectorplot(self.vector_plot_type, self.arrow_scale_factor)
@@ -0,0 +1,173 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+
+import numpy as np
+from numpy.typing import NDArray
+
+from femmlib import lua
+from femmlib.core import FEMM_FOLDER
+from femmlib.solution import Solution
+from femmlib.types import Group
+from mathlib.electromagnetics import VACUUM_PERMEABILITY
+
+# Tipos de `mo_blockintegral()` do tensor de tensões ponderado.
+WST_FORCE_X = 18
+WST_FORCE_Y = 19
+WST_TORQUE = 22
+
+
+@dataclass
+class ForceResult:
+    """
+    Força e torque de cada grupo em cada ponto da varredura.
+
+    Todos os vetores têm formato (pontos, grupos). As forças estão em N e o
+    torque, calculado em relação à origem, em N.m.
+    """
+
+    groups: list[Group]
+    fx: NDArray[np.float64]
+    fy: NDArray[np.float64]
+    torque: NDArray[np.float64]
+
+
+@dataclass
+class MaxwellStress:
+    """
+    Calcula a força e o torque pelo tensor de tensões de Maxwell ponderado
+    sobre os blocos de cada grupo, depois de cada solução.
+
+    Há dois modos que podem ser misturados ao longo da varredura:
+    - `measure()`: Uma única chamada ao FEMM por solução, que seleciona,
+    integra e limpa todos os grupos dentro de um programa Lua;
+    - `measure_from()`: Calcula o mesmo resultado sobre uma solução lida de um
+    arquivo `.ans`, de forma vetorizada e sem o FEMM.
+
+    Os resultados são acumulados e retornados por `result()`.
+    """
+
+    groups: list[Group]
+    rows: list[NDArray[np.float64]] = field(
+        default_factory=list[NDArray[np.float64]], init=False
+    )
+
+    def measure(self) -> NDArray[np.float64]:
+        """
+        Calcula força e torque na solução carregada no FEMM. Retorna um vetor
+        de formato (grupos, 3) com `fx`, `fy` e o torque.
+        """
+        results = FEMM_FOLDER / 'maxwell_stress.csv'
+        lines = [f'results = openfile({lua.path(results)}, "w")']
+
+        for group in self.groups:
+            lines.extend(
+                [
+                    f'mo_groupselectblock({group})',
+                    f'fx = mo_blockintegral({WST_FORCE_X})',
+                    f'fy = mo_blockintegral({WST_FORCE_Y})',
+                    f'torque = mo_blockintegral({WST_TORQUE})',
+                    'mo_clearblock()',
+                    'write(results, format("%.17g,%.17g,%.17g\\n", '
+                    're(fx), re(fy), re(torque)))',
+                ]
+            )
+
+        lines.append('closefile(results)')
+        lua.run('\n'.join(lines) + '\n', 'maxwell_stress')
+
+        row = np.loadtxt(results, delimiter=',', ndmin=2)
+        self.rows.append(row)
+
+        return row
+
+    def measure_from(self, solution: Solution) -> NDArray[np.float64]:
+        """
+        Calcula força e torque sobre uma solução lida de um arquivo `.ans`,
+        como em `force_from()`, e guarda o ponto no resultado.
+        """
+        row = self.force_from(solution)
+        self.rows.append(row)
+
+        return row
+
+    def force_from(self, solution: Solution) -> NDArray[np.float64]:
+        """
+        Calcula força e torque sobre uma solução lida de um arquivo `.ans`,
+        sem guardar o ponto. Retorna um vetor de formato (grupos, 3) com
+        `fx`, `fy` e o torque.
+
+        A função de ponderação vale 1 nos nós do grupo e 0 nos demais, de
+        forma que apenas a camada de triângulos que envolve o grupo contribui.
+        Assim como no FEMM, o grupo deve estar cercado por ar.
+        """
+        grad_x, grad_y, area = solution.shape_gradients
+        b = solution.flux_density
+        volume = area * solution.depth_in_meters()
+        centroids = solution.centroids() * solution.conv_rate()
+        element_groups = solution.element_groups()
+
+        # Tensor de Maxwell em cada triângulo. Em problemas harmônicos é
+        # usado o valor médio no tempo.
+        if np.iscomplexobj(b):
+            scale = 1 / (2 * VACUUM_PERMEABILITY)
+            bxx = np.real(b[:, 0] * np.conj(b[:, 0]))
+            byy = np.real(b[:, 1] * np.conj(b[:, 1]))
+            bxy = np.real(b[:, 0] * np.conj(b[:, 1]))
+        else:
+            scale = 1 / VACUUM_PERMEABILITY
+            bxx = b[:, 0] ** 2
+            byy = b[:, 1] ** 2
+            bxy = b[:, 0] * b[:, 1]
+
+        txx = scale * (bxx - (bxx + byy) / 2)
+        tyy = scale * (byy - (bxx + byy) / 2)
+        txy = scale * bxy
+
+        row = np.empty((len(self.groups), 3))
+        for i, group in enumerate(self.groups):
+            inside = element_groups == group
+            weights = np.zeros(len(solution.nodes))
+            weights[solution.elements[inside]] = 1
+
+            # Gradiente da função de ponderação, nulo fora da camada que
+            # envolve o grupo.
+            nodal = weights[solution.elements]
+            gx = (grad_x * nodal).sum(axis=1)
+            gy = (grad_y * nodal).sum(axis=1)
+
+            fx = -(txx * gx + txy * gy) * volume
+            fy = -(txy * gx + tyy * gy) * volume
+
+            row[i] = (
+                fx.sum(),
+                fy.sum(),
+                (centroids[:, 0] * fy - centroids[:, 1] * fx).sum(),
+            )
+
+        return row
+
+    def sweep(self, solutions: Sequence[Solution]) -> ForceResult:
+        """
+        Calcula força e torque sobre todas as soluções de uma varredura. O
+        resultado contém apenas essas soluções, sem os pontos guardados por
+        `measure()` e `measure_from()`.
+        """
+        return self.stack(
+            [self.force_from(solution) for solution in solutions]
+        )
+
+    def result(self) -> ForceResult:
+        """Empilha todos os pontos medidos até agora."""
+        return self.stack(self.rows)
+
+    def stack(self, rows: list[NDArray[np.float64]]) -> ForceResult:
+        stacked = (
+            np.stack(rows) if rows else np.empty((0, len(self.groups), 3))
+        )
+
+        return ForceResult(
+            list(self.groups),
+            stacked[:, :, 0],
+            stacked[:, :, 1],
+            stacked[:, :, 2],
+        )
@@ -0,0 +1,329 @@
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Literal, cast
+
+import numpy as np
+from numpy.typing import NDArray
+
+from femmlib import lua
+from femmlib.core import FEMM_FOLDER
+from femmlib.solution import Solution
+from femmlib.structure import Structure
+from femmlib.types import Group
+from mathlib.electromagnetics import VACUUM_PERMEABILITY
+from mathlib.vector2 import Vector2Array
+
+type BlockQuantity = Literal[
+    'a',
+    'energy',
+    'hysteresis losses',
+    'resistive losses',
+    'area',
+    'losses',
+    'current',
+    'bx',
+    'by',
+    'volume',
+]
+type LineQuantity = Literal['flux', 'tangential h', 'length']
+
+# Tipos de `mo_blockintegral()` e `mo_lineintegral()`.
+BLOCK_INTEGRAL: dict[BlockQuantity, int] = {
+    'a': 1,
+    'energy': 2,
+    'hysteresis losses': 3,
+    'resistive losses': 4,
+    'area': 5,
+    'losses': 6,
+    'current': 7,
+    'bx': 8,
+    'by': 9,
+    'volume': 10,
+}
+LINE_INTEGRAL: dict[LineQuantity, int] = {
+    'flux': 0,
+    'tangential h': 1,
+    'length': 2,
+}
+
+
+@dataclass
+class BlockIntegral:
+    """
+    Integral de volume sobre todos os blocos dos grupos `groups`.
+
+    - `name`: Nome da coluna no resultado;
+    - `quantity`: Grandeza integrada. Valores: "a", "energy",
+      "hysteresis losses", "resistive losses", "area", "losses", "current",
+      "bx", "by", "volume".
+    """
+
+    name: str
+    groups: list[Group]
+    quantity: BlockQuantity
+
+
+@dataclass
+class LineIntegral:
+    """
+    Integral de linha ao longo do contorno de `structure`.
+
+    - `name`: Nome da coluna no resultado;
+    - `quantity`: Grandeza integrada. Valores: "flux" (fluxo normal),
+      "tangential h" (H tangencial), "length" (comprimento do contorno).
+    """
+
+    name: str
+    structure: Structure
+    quantity: LineQuantity
+
+
+type Integral = BlockIntegral | LineIntegral
+
+
+@dataclass
+class IntegralResult:
+    """
+    Resultado em colunas: cada integral é uma coluna e cada solução uma
+    linha de `values`, no formato (soluções, integrais).
+    """
+
+    names: list[str]
+    values: NDArray[np.float64] | NDArray[np.complex128]
+
+    def __getitem__(
+        self, name: str
+    ) -> NDArray[np.float64] | NDArray[np.complex128]:
+        return self.values[:, self.names.index(name)]
+
+    def columns(
+        self,
+    ) -> dict[str, NDArray[np.float64] | NDArray[np.complex128]]:
+        return {name: self[name] for name in self.names}
+
+
+@dataclass
+class Integrals:
+    """
+    Avalia uma lista de integrais de bloco e de linha de uma só vez.
+
+    Assim como `MaxwellStress`, há dois modos que podem ser misturados:
+    - `measure()`: Um único programa Lua por solução carregada no FEMM;
+    - `measure_from()`: Cálculo vetorizado sobre uma solução lida de um
+    arquivo `.ans`, sem o FEMM. Suporta as grandezas "a", "energy" (apenas
+    materiais lineares), "area", "bx", "by" e "volume" nos blocos e "flux" e
+    "length" nas linhas.
+
+    Os resultados são acumulados e retornados por `result()`.
+    """
+
+    integrals: list[Integral]
+    rows: list[NDArray[np.float64] | NDArray[np.complex128]] = field(
+        default_factory=list[NDArray[np.float64] | NDArray[np.complex128]],
+        init=False,
+    )
+
+    def names(self) -> list[str]:
+        return [integral.name for integral in self.integrals]
+
+    def measure(self) -> NDArray[np.float64] | NDArray[np.complex128]:
+        """Avalia todas as integrais na solução carregada no FEMM."""
+        results = FEMM_FOLDER / 'integrals.csv'
+        lines = [f'results = openfile({lua.path(results)}, "w")']
+
+        for integral in self.integrals:
+            match integral:
+                case BlockIntegral():
+                    lines.extend(
+                        f'mo_groupselectblock({group})'
+                        for group in integral.groups
+                    )
+                    lines.extend(
+                        [
+                            'value = mo_blockintegral('
+                            f'{BLOCK_INTEGRAL[integral.quantity]})',
+                            'mo_clearblock()',
+                        ]
+                    )
+                case LineIntegral():
+                    lines.extend(contour(integral.structure))
+                    lines.extend(
+                        [
+                            'value = mo_lineintegral('
+                            f'{LINE_INTEGRAL[integral.quantity]})',
+                            'mo_clearcontour()',
+                        ]
+                    )
+
+            lines.append(
+                'write(results, format("%.17g,%.17g\\n", re(value), '
+                'im(value)))'
+            )
+
+        lines.append('closefile(results)')
+        lua.run('\n'.join(lines) + '\n', 'integrals')
+
+        values = np.loadtxt(results, delimiter=',', ndmin=2)
+        row = values[:, 0] + 1j * values[:, 1]
+        row = row if np.any(row.imag != 0) else row.real
+        self.rows.append(row)
+
+        return row
+
+    def measure_from(
+        self, solution: Solution
+    ) -> NDArray[np.float64] | NDArray[np.complex128]:
+        """
+        Avalia todas as integrais sobre uma solução lida sem o FEMM, como em
+        `values_from()`, e guarda o ponto no resultado.
+        """
+        row = self.values_from(solution)
+        self.rows.append(row)
+
+        return row
+
+    def values_from(
+        self, solution: Solution
+    ) -> NDArray[np.float64] | NDArray[np.complex128]:
+        """Avalia todas as integrais sobre uma solução, sem guardar o ponto."""
+        dtype = np.complex128 if np.iscomplexobj(solution.potential) else float
+        row = np.empty(len(self.integrals), dtype=dtype)
+        element_groups = solution.element_groups()
+
+        for i, integral in enumerate(self.integrals):
+            match integral:
+                case BlockIntegral():
+                    inside = np.isin(element_groups, integral.groups)
+                    row[i] = block_integral(
+                        solution, inside, integral.quantity
+                    )
+                case LineIntegral():
+                    row[i] = line_integral(
+                        solution, integral.structure, integral.quantity
+                    )
+
+        return row
+
+    def sweep(self, solutions: Sequence[Solution]) -> IntegralResult:
+        """
+        Avalia as integrais sobre todas as soluções de uma varredura. O
+        resultado contém apenas essas soluções, sem os pontos guardados por
+        `measure()` e `measure_from()`.
+        """
+        return self.stack(
+            [self.values_from(solution) for solution in solutions]
+        )
+
+    def result(self) -> IntegralResult:
+        """Empilha todas as soluções avaliadas até agora."""
+        return self.stack(self.rows)
+
+    def stack(
+        self, rows: list[NDArray[np.float64] | NDArray[np.complex128]]
+    ) -> IntegralResult:
+        if not rows:
+            return IntegralResult(
+                self.names(), np.empty((0, len(self.integrals)))
+            )
+
+        # Complexo se alguma das soluções for harmônica.
+        values = cast(
+            'NDArray[np.float64] | NDArray[np.complex128]', np.stack(rows)
+        )
+        return IntegralResult(self.names(), values)
+
+
+def contour(structure: Structure) -> list[str]:
+    """Comandos Lua que desenham o contorno de `structure`."""
+    nodes = structure.nodes
+    add = [
+        f'mo_addcontour({lua.number(node.x)}, {lua.number(node.y)})'
+        for node in nodes
+    ]
+
+    match structure.connect_method:
+        case 'open loop':
+            return add
+        case 'closed loop':
+            return [*add, add[0]]
+        case 'circle':
+            return [
+                add[0],
+                add[1],
+                'mo_bendcontour(180, 1)',
+                add[0],
+                'mo_bendcontour(180, 1)',
+            ]
+
+
+def block_integral(
+    solution: Solution,
+    inside: NDArray[np.bool_],
+    quantity: BlockQuantity,
+) -> float | complex:
+    volume = solution.volumes()[inside]
+
+    match quantity:
+        case 'area':
+            return float(solution.areas()[inside].sum())
+        case 'volume':
+            return float(volume.sum())
+        case 'a':
+            potential = solution.potential[solution.elements[inside]]
+            return (potential.mean(axis=1) * volume).sum()
+        case 'bx' | 'by':
+            axis = 0 if quantity == 'bx' else 1
+            return (solution.flux_density[inside, axis] * volume).sum()
+        case 'energy':
+            permeability = solution.element_permeability()[inside]
+            if np.isnan(permeability).any():
+                raise NotImplementedError(
+                    'Missing implementation for nonlinear materials.'
+                )
+
+            b = solution.flux_density[inside]
+            density = (
+                np.abs(b) ** 2 / (2 * VACUUM_PERMEABILITY * permeability)
+            ).sum(axis=1)
+            # Valor médio no tempo em problemas harmônicos.
+            if np.iscomplexobj(b):
+                density /= 2
+
+            return float((density * volume).sum())
+        case _:
+            raise NotImplementedError(
+                f'Missing implementation for {quantity}.'
+            )
+
+
+def line_integral(
+    solution: Solution, structure: Structure, quantity: LineQuantity
+) -> float | complex:
+    nodes = Vector2Array.parse(structure.nodes)
+    points = nodes.data
+    closed = structure.connect_method != 'open loop'
+
+    match quantity:
+        case 'length':
+            if structure.connect_method == 'circle':
+                radius = (nodes[1] - nodes[0]).magnitude() / 2
+                return float(2 * np.pi * radius * solution.conv_rate())
+
+            path = np.vstack((points, points[:1])) if closed else points
+            length = np.linalg.norm(np.diff(path, axis=0), axis=1).sum()
+            return float(length * solution.conv_rate())
+        case 'flux':
+            solution.assert_planar()
+
+            # Em problemas planos, o fluxo que atravessa um contorno depende
+            # apenas do potencial nas extremidades. A normal aponta para a
+            # direita do sentido de percurso.
+            if closed:
+                return 0.0
+
+            potential = solution.potential_at(points[[0, -1]])
+            return (potential[1] - potential[0]) * solution.depth_in_meters()
+        case _:
+            raise NotImplementedError(
+                f'Missing implementation for {quantity}.'
+            )
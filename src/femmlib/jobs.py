@@ -0,0 +1,386 @@
+import hashlib
+import json
+import os
+import secrets
+import socket
+import sqlite3
+import time
+import traceback
+from collections.abc import Callable, Generator, Iterable, Mapping
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Literal
+
+from helpers.path import PathLike, parse_path
+
+type JobStatus = Literal['pending', 'running', 'done', 'failed']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    worker TEXT,
+    claimed_at REAL,
+    finished_at REAL,
+    result TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_claim ON jobs (status, available_at);
+"""
+
+
+def worker_name() -> str:
+    """
+    Identidade única de um trabalhador: o computador, o processo e um sufixo
+    aleatório que distingue filas abertas no mesmo processo.
+    """
+    return f'{socket.gethostname()}:{os.getpid()}:{secrets.token_hex(4)}'
+
+
+def model_hash(params: Mapping[str, float], model: str | bytes = '') -> str:
+    """
+    Identifica uma variante da varredura pelos valores dos parâmetros e pelo
+    conteúdo do modelo, como o texto de um arquivo `.FEM`.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(dict(params), sort_keys=True).encode())
+    digest.update(model.encode() if isinstance(model, str) else model)
+
+    return digest.hexdigest()
+
+
+@dataclass
+class Job:
+    id: int
+    key: str
+    params: dict[str, float]
+    status: JobStatus
+    attempts: int
+    result: str | None = None
+    error: str | None = None
+
+
+@dataclass
+class JobStats:
+    """
+    - `throughput`: Trabalhos concluídos por segundo, entre o primeiro e o
+    último concluído;
+    - `retries`: Tentativas além da primeira, somadas em todos os trabalhos.
+    """
+
+    pending: int
+    running: int
+    done: int
+    failed: int
+    retries: int
+    throughput: float
+
+
+class JobQueue:
+    """
+    Fila de trabalhos de uma varredura guardada em um banco SQLite, de forma
+    que a varredura pode ser retomada depois de uma falha.
+
+    Cada variante é registrada uma única vez, pelo `model_hash()`. Vários
+    processos podem usar o mesmo arquivo: `claim()` reserva um trabalho
+    dentro de uma transação exclusiva. Trabalhos que falham voltam para a
+    fila com espera exponencial até `max_attempts` tentativas.
+
+    Um trabalho reservado só pode ser concluído ou registrado como falho
+    pelo trabalhador que o reservou e enquanto ainda estiver em execução. Um
+    resultado que chega depois de `recover()` devolver o trabalho à fila é
+    descartado. Sem um nome explícito, o trabalhador é `worker`, único para
+    cada instância da fila.
+    """
+
+    def __init__(
+        self,
+        file: PathLike,
+        *,
+        max_attempts: int = 3,
+        backoff: float = 1,
+        lease: float = 3600,
+        worker: str | None = None,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        - `file`: Arquivo do banco. É criado se não existir;
+        - `max_attempts`: Tentativas antes de marcar o trabalho como falho;
+        - `backoff`: Espera, em s, antes da segunda tentativa. Dobra a cada
+        nova falha;
+        - `lease`: Tempo, em s, que um trabalho pode ficar em execução antes
+        de `recover()` considerá-lo abandonado;
+        - `worker`: Nome padrão do trabalhador. Por padrão, `worker_name()`;
+        - `clock`: Relógio usado para a espera, substituível nos testes.
+        """
+        self.file = parse_path(file)
+        self.file.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.lease = lease
+        self.worker = worker if worker is not None else worker_name()
+        self.clock = clock
+
+        self.connection = sqlite3.connect(
+            self.file, timeout=30, isolation_level=None
+        )
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.connection.close()
+
+    @contextmanager
+    def transaction(self) -> Generator[sqlite3.Connection]:
+        self.connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute('ROLLBACK')
+            raise
+        else:
+            self.connection.execute('COMMIT')
+
+    def submit(
+        self, params: Mapping[str, float], model: str | bytes = ''
+    ) -> int:
+        """
+        Adiciona uma variante e retorna o seu identificador. Uma variante já
+        registrada, em qualquer estado, não é adicionada de novo.
+        """
+        key = model_hash(params, model)
+        with self.transaction() as connection:
+            connection.execute(
+                'INSERT OR IGNORE INTO jobs (key, params) VALUES (?, ?)',
+                (key, json.dumps(dict(params))),
+            )
+            (job_id,) = connection.execute(
+                'SELECT id FROM jobs WHERE key = ?', (key,)
+            ).fetchone()
+
+        return job_id
+
+    def submit_all(
+        self, variants: Iterable[Mapping[str, float]], model: str | bytes = ''
+    ) -> list[int]:
+        return [self.submit(params, model) for params in variants]
+
+    def claim(self, worker: str | None = None) -> Job | None:
+        """
+        Reserva o próximo trabalho disponível para `worker`, ou para o
+        trabalhador da fila. Retorna `None` se não houver nenhum disponível
+        agora.
+        """
+        worker = worker if worker is not None else self.worker
+        now = self.clock()
+        with self.transaction() as connection:
+            row = connection.execute(
+                """
+                UPDATE jobs
+                SET status = 'running', attempts = attempts + 1,
+                    worker = ?, claimed_at = ?
+                WHERE id = (
+                    SELECT id FROM jobs
+                    WHERE status = 'pending' AND available_at <= ?
+                    ORDER BY id LIMIT 1
+                )
+                RETURNING id, key, params, status, attempts
+                """,
+                (worker, now, now),
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        job_id, key, params, status, attempts = row
+        return Job(job_id, key, json.loads(params), status, attempts)
+
+    def complete(
+        self, job_id: int, result: str = '', worker: str | None = None
+    ) -> bool:
+        """
+        Marca o trabalho reservado por `worker` como concluído. `result`
+        indica onde está o resultado, como a pasta de um `ResultStore`.
+        Retorna falso, sem alterar nada, se o trabalho não está mais em
+        execução por `worker`.
+        """
+        worker = worker if worker is not None else self.worker
+        with self.transaction() as connection:
+            cursor = connection.execute(
+                """
+                UPDATE jobs
+                SET status = 'done', result = ?, error = NULL,
+                    finished_at = ?
+                WHERE id = ? AND status = 'running' AND worker = ?
+                """,
+                (result, self.clock(), job_id, worker),
+            )
+
+        return cursor.rowcount == 1
+
+    def fail(
+        self, job_id: int, error: str = '', worker: str | None = None
+    ) -> bool:
+        """
+        Registra uma falha do trabalho reservado por `worker`. O trabalho
+        volta para a fila depois da espera, ou é marcado como falho se já
+        atingiu `max_attempts` tentativas. Retorna falso, sem alterar nada,
+        se o trabalho não está mais em execução por `worker`.
+        """
+        worker = worker if worker is not None else self.worker
+        with self.transaction() as connection:
+            row = connection.execute(
+                """
+                SELECT attempts FROM jobs
+                WHERE id = ? AND status = 'running' AND worker = ?
+                """,
+                (job_id, worker),
+            ).fetchone()
+            if row is None:
+                return False
+
+            (attempts,) = row
+
+            if attempts >= self.max_attempts:
+                connection.execute(
+                    """
+                    UPDATE jobs
+                    SET status = 'failed', error = ?, finished_at = ?
+                    WHERE id = ?
+                    """,
+                    (error, self.clock(), job_id),
+                )
+            else:
+                delay = self.backoff * 2 ** (attempts - 1)
+                connection.execute(
+                    """
+                    UPDATE jobs
+                    SET status = 'pending', error = ?, available_at = ?
+                    WHERE id = ?
+                    """,
+                    (error, self.clock() + delay, job_id),
+                )
+
+        return True
+
+    def recover(self, timeout: float | None = None) -> list[int]:
+        """
+        Trata como falhos os trabalhos em execução há mais de `timeout`
+        segundos, ou `lease` se não for definido, como os de um processo que
+        parou sem avisar. Deve ser chamado ao retomar a varredura.
+
+        O prazo precisa ser maior que o tempo de uma solução: um trabalho
+        ainda em execução por outro processo também seria devolvido à fila.
+        """
+        limit = self.clock() - (self.lease if timeout is None else timeout)
+        rows = self.connection.execute(
+            """
+            SELECT id, worker FROM jobs
+            WHERE status = 'running' AND claimed_at <= ?
+            """,
+            (limit,),
+        ).fetchall()
+
+        return [
+            job_id
+            for job_id, worker in rows
+            if self.fail(
+                job_id, 'Worker stopped before finishing the job.', worker
+            )
+        ]
+
+    def next_available(self) -> float | None:
+        """
+        Instante em que o próximo trabalho pendente pode ser reservado, ou
+        `None` se não houver trabalhos pendentes.
+        """
+        (available_at,) = self.connection.execute(
+            "SELECT MIN(available_at) FROM jobs WHERE status = 'pending'"
+        ).fetchone()
+
+        return available_at
+
+    def get(self, job_id: int) -> Job:
+        row = self.connection.execute(
+            """
+            SELECT id, key, params, status, attempts, result, error
+            FROM jobs WHERE id = ?
+            """,
+            (job_id,),
+        ).fetchone()
+        if row is None:
+            raise KeyError(f'Job not found: {job_id}.')
+
+        job_id, key, params, status, attempts, result, error = row
+        return Job(
+            job_id, key, json.loads(params), status, attempts, result, error
+        )
+
+    def stats(self) -> JobStats:
+        counts = dict(
+            self.connection.execute(
+                'SELECT status, COUNT(*) FROM jobs GROUP BY status'
+            ).fetchall()
+        )
+        retries, first, last, done = self.connection.execute(
+            """
+            SELECT
+                COALESCE(SUM(MAX(attempts - 1, 0)), 0),
+                MIN(claimed_at) FILTER (WHERE status = 'done'),
+                MAX(finished_at) FILTER (WHERE status = 'done'),
+                COUNT(*) FILTER (WHERE status = 'done')
+            FROM jobs
+            """
+        ).fetchone()
+
+        elapsed = (last - first) if done else 0
+        return JobStats(
+            counts.get('pending', 0),
+            counts.get('running', 0),
+            counts.get('done', 0),
+            counts.get('failed', 0),
+            retries,
+            done / elapsed if elapsed > 0 else 0,
+        )
+
+    def run(
+        self,
+        solve: Callable[[dict[str, float]], str],
+        worker: str | None = None,
+        *,
+        wait: bool = False,
+        poll_interval: float = 0.1,
+    ) -> int:
+        """
+        Executa trabalhos até a fila esvaziar e retorna quantos foram
+        concluídos.
+
+        - `solve`: Resolve uma variante a partir dos parâmetros e retorna onde
+        está o resultado. Exceções são registradas como falhas;
+        - `wait`: Se verdadeiro, espera os trabalhos em espera exponencial ou
+        reservados por outros processos.
+        """
+        worker = worker if worker is not None else self.worker
+        completed = 0
+
+        while True:
+            job = self.claim(worker)
+            if job is None:
+                stats = self.stats()
+                if wait and stats.pending + stats.running > 0:
+                    time.sleep(poll_interval)
+                    continue
+
+                return completed
+
+            try:
+                result = solve(job.params)
+            except Exception:
+                self.fail(job.id, traceback.format_exc(), worker)
+            else:
+                if self.complete(job.id, result, worker):
+                    completed += 1
@@ -0,0 +1,133 @@
+import math
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+import numpy as np
+from numpy.typing import NDArray
+
+from femmlib.solution import Solution
+
+# Amostras usadas para integrar |cos(θ)|^α no fator do iGSE.
+IGSE_SAMPLES = 4096
+
+
+@dataclass
+class SteinmetzCoefficients:
+    """
+    Coeficientes da equação de Steinmetz, P = k * f^α * B^β, com a
+    densidade de perdas em W/m³, a frequência em Hz e a densidade de fluxo
+    de pico em T.
+    """
+
+    k: float
+    alpha: float
+    beta: float
+
+    def density(
+        self, freq: float, b_peak: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        """Densidade de perdas para uma excitação senoidal."""
+        return self.k * freq**self.alpha * b_peak**self.beta
+
+    def igse_k(self) -> float:
+        """Coeficiente `ki` da equação de Steinmetz generalizada (iGSE)."""
+        theta = np.linspace(0, 2 * math.pi, IGSE_SAMPLES, endpoint=False)
+        integral = 2 * math.pi * np.mean(np.abs(np.cos(theta)) ** self.alpha)
+
+        return self.k / (
+            (2 * math.pi) ** (self.alpha - 1)
+            * integral
+            * 2 ** (self.beta - self.alpha)
+        )
+
+    def waveform_factor(self, waveform: NDArray[np.float64]) -> float:
+        """
+        Fator que multiplica `f^α * B^β` na iGSE para uma forma de onda
+        periódica `waveform`, amostrada uniformemente ao longo de um período e
+        normalizada para pico 1. Para uma senoide, o fator é igual a `k`.
+        """
+        waveform = np.asarray(waveform, dtype=np.float64)
+        # Derivada em relação ao tempo normalizado pelo período.
+        derivative = (np.roll(waveform, -1) - np.roll(waveform, 1)) * (
+            len(waveform) / 2
+        )
+        swing = waveform.max() - waveform.min()
+
+        return (
+            self.igse_k()
+            * swing ** (self.beta - self.alpha)
+            * float(np.mean(np.abs(derivative) ** self.alpha))
+        )
+
+
+@dataclass
+class CoreLosses:
+    """
+    Perdas no núcleo, em W.
+
+    - `elements`: Perdas em cada triângulo;
+    - `blocks`: Perdas em cada rótulo de bloco, na ordem de
+    `Solution.labels`;
+    - `total`: Perdas totais.
+    """
+
+    elements: NDArray[np.float64]
+    blocks: NDArray[np.float64]
+    total: float
+
+
+def core_losses(
+    solution: Solution,
+    coefficients: Mapping[str, SteinmetzCoefficients],
+    waveform: NDArray[np.float64] | None = None,
+    freq: float | None = None,
+) -> CoreLosses:
+    """
+    Calcula as perdas no núcleo de todos os triângulos de uma só vez, sem o
+    FEMM.
+
+    - `coefficients`: Coeficientes de Steinmetz de cada material, pelo nome.
+    Materiais sem coeficientes não têm perdas;
+    - `waveform`: Forma de onda de um período da densidade de fluxo,
+    normalizada para pico 1. Se definida, usa a iGSE. Caso contrário, assume
+    uma excitação senoidal;
+    - `freq`: Frequência da excitação. Por padrão, a da solução. Em
+    soluções magnetostáticas, que representam o pico da excitação, precisa
+    ser definida.
+
+    A amplitude em cada triângulo é a magnitude da densidade de fluxo. Em
+    problemas harmônicos, é a magnitude das amplitudes das componentes.
+    """
+    freq = solution.freq if freq is None else freq
+    b = solution.flux_density
+    b_peak = np.sqrt((np.abs(b) ** 2).sum(axis=1))
+
+    # Coeficientes de cada material, com zeros para os que não foram
+    # definidos e para rótulos sem material (último item).
+    table = np.zeros((len(solution.materials) + 1, 3))
+    for i, material in enumerate(solution.materials):
+        if material.name not in coefficients:
+            continue
+
+        steinmetz = coefficients[material.name]
+        factor = (
+            steinmetz.k
+            if waveform is None
+            else steinmetz.waveform_factor(waveform)
+        )
+        table[i] = (factor, steinmetz.alpha, steinmetz.beta)
+
+    materials = np.array([label.material for label in solution.labels])
+    k, alpha, beta = table[materials[solution.element_labels]].T
+
+    density: NDArray[np.float64] = (
+        k * np.power(float(freq), alpha) * np.power(b_peak, beta)
+    )
+    elements: NDArray[np.float64] = density * solution.volumes()
+    blocks: NDArray[np.float64] = np.bincount(
+        solution.element_labels,
+        weights=elements,
+        minlength=len(solution.labels),
+    )
+
+    return CoreLosses(elements, blocks, float(elements.sum()))
@@ -0,0 +1,57 @@
+from collections.abc import Iterable
+from pathlib import Path
+
+import femm
+
+
+def number(value: float) -> str:
+    """Converte um número em um literal Lua sem perda de precisão."""
+    return f'{value:.17g}'
+
+
+def string(value: str) -> str:
+    """Converte um texto em um literal de string Lua."""
+    escaped = (
+        value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    )
+    return f'"{escaped}"'
+
+
+def path(file: Path) -> str:
+    """
+    Converte um caminho em um literal de string Lua. O FEMM aceita barras
+    normais também no Windows, o que evita escapar as contrabarras.
+    """
+    return string(file.resolve().as_posix())
+
+
+def table(values: Iterable[float]) -> str:
+    """Converte uma sequência de números em uma tabela Lua."""
+    return '{' + ', '.join(number(value) for value in values) + '}'
+
+
+def write(code: str, name: str) -> Path:
+    """Salva o programa Lua `code` na pasta do FEMM como `name.lua`."""
+    # Importado aqui porque `core` depende dos módulos que usam `lua`.
+    from femmlib import core
+
+    if not core.FEMM_FOLDER.exists():
+        core.FEMM_FOLDER.mkdir()
+
+    file = core.FEMM_FOLDER / (
+        name if name.endswith('.lua') else f'{name}.lua'
+    )
+    file.write_text(code)
+
+    return file
+
+
+def run(code: str, name: str) -> Path:
+    """
+    Salva e executa o programa Lua `code` no FEMM aberto com uma única
+    chamada. Retorna o caminho do programa salvo.
+    """
+    file = write(code, name)
+    femm.callfemm_noeval(f'dofile({path(file)})')
+
+    return file
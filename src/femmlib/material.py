@@ -0,0 +1,280 @@
+import csv
+import re
+from collections.abc import Callable, Iterable, Mapping
+from dataclasses import astuple, dataclass, field, fields
+from typing import Literal, cast
+
+import femm
+import numpy as np
+from numpy.typing import NDArray
+
+from femmlib import lua
+from helpers.path import PathLike, parse_path
+
+type BuiltinMaterial = Literal[
+    'Air', 'Pure Iron', '18 AWG', '1010 Steel', 'M-45 Steel'
+]
+"""Alguns materiais da biblioteca do FEMM, usados nos exemplos."""
+type MaterialName = str
+"""
+Nome livre de um material: qualquer material da biblioteca do FEMM, não
+apenas os de `BuiltinMaterial`, ou um registrado em `MaterialRegistry`. Um
+nome desconhecido só é detectado pelo FEMM, ao carregar o material.
+"""
+
+BLOCK_NAME = re.compile(r'<blockname>\s*=\s*"(.*)"', re.IGNORECASE)
+
+
+@dataclass
+class Material:
+    """
+    Material personalizado, na ordem dos argumentos de `mi_addmaterial()`.
+
+    - `coercivity`: Coercividade de ímãs permanentes, em A/m;
+    - `current_density`: Densidade de corrente, em MA/m²;
+    - `conductivity`: Condutividade elétrica, em MS/m;
+    - `lam_thickness`: Espessura das lâminas, em mm;
+    - `hysteresis_angle`: Ângulo máximo de atraso por histerese, em graus;
+    - `bh_points`: Curva B-H, no formato (pontos, 2) com B em T e H em A/m.
+    Vazia para materiais lineares.
+    """
+
+    name: str
+    mu_x: float = 1
+    mu_y: float = 1
+    coercivity: float = 0
+    current_density: float = 0
+    conductivity: float = 0
+    lam_thickness: float = 0
+    hysteresis_angle: float = 0
+    lam_fill: float = 1
+    lam_type: int = 0
+    hysteresis_angle_x: float = 0
+    hysteresis_angle_y: float = 0
+    strands: int = 0
+    wire_diameter: float = 0
+    bh_points: NDArray[np.float64] = field(
+        default_factory=lambda: np.empty((0, 2))
+    )
+
+    def props(self) -> tuple[float, ...]:
+        """Propriedades numéricas, sem o nome e a curva B-H."""
+        return astuple(self)[1:-1]
+
+    def lua(self) -> list[str]:
+        """Comandos Lua que adicionam o material ao documento."""
+        name = lua.string(self.name)
+        lines = [
+            f'mi_addmaterial({name}, '
+            + ', '.join(lua.number(value) for value in self.props())
+            + ')'
+        ]
+
+        if len(self.bh_points) > 0:
+            b, h = np.asarray(self.bh_points, dtype=np.float64).T
+            lines.extend(
+                [
+                    f'b = {lua.table(b.tolist())}',
+                    f'h = {lua.table(h.tolist())}',
+                    f'for i = 1, {len(b)} do',
+                    f'mi_addbhpoint({name}, b[i], h[i])',
+                    'end',
+                ]
+            )
+
+        return lines
+
+
+PROPS = [item.name for item in fields(Material)][1:-1]
+# Conversão de cada propriedade lida de um arquivo.
+PROP_TYPES: dict[str, Callable[[float], float]] = {
+    'mu_x': float,
+    'mu_y': float,
+    'coercivity': float,
+    'current_density': float,
+    'conductivity': float,
+    'lam_thickness': float,
+    'hysteresis_angle': float,
+    'lam_fill': float,
+    'lam_type': int,
+    'hysteresis_angle_x': float,
+    'hysteresis_angle_y': float,
+    'strands': int,
+    'wire_diameter': float,
+}
+
+
+def parse_material(name: str, values: Mapping[str, str | float]) -> Material:
+    """
+    Material a partir de valores possivelmente vazios das propriedades. As
+    vazias mantêm o valor padrão.
+    """
+    material = Material(name)
+    for prop in PROPS:
+        value = values.get(prop, '')
+        if value != '':
+            setattr(material, prop, PROP_TYPES[prop](float(value)))
+
+    return material
+
+
+def read_library(file: PathLike) -> dict[str, Material]:
+    """
+    Lê materiais personalizados de um arquivo `.csv` ou `.npz`.
+
+    No `.csv`, cada linha tem o nome, as propriedades de `Material` e um
+    ponto `b`, `h` da curva B-H. Materiais não lineares repetem o nome em
+    uma linha por ponto e materiais lineares deixam `b` e `h` vazios. No
+    `.npz`, `names` tem os nomes, `props` as propriedades no formato
+    (materiais, propriedades) e `bh` os pontos de todas as curvas B-H, em
+    sequência. A curva do material `i` vai de `bh_offsets[i]` a
+    `bh_offsets[i + 1]`.
+    """
+    file = parse_path(file)
+    materials: dict[str, Material] = {}
+
+    match file.suffix.lower():
+        case '.csv':
+            points: dict[str, list[tuple[float, float]]] = {}
+            with file.open(newline='') as stream:
+                for row in csv.DictReader(stream):
+                    name = row['name']
+                    if name not in materials:
+                        materials[name] = parse_material(name, row)
+                        points[name] = []
+                    if row.get('b') and row.get('h'):
+                        points[name].append((float(row['b']), float(row['h'])))
+
+            for name, bh in points.items():
+                materials[name].bh_points = np.array(bh).reshape(-1, 2)
+        case '.npz':
+            with np.load(file) as data:
+                offsets = data['bh_offsets'].tolist()
+                for i, name in enumerate(data['names'].tolist()):
+                    values = data['props'][i].tolist()
+                    material = parse_material(
+                        name, dict(zip(PROPS, values, strict=True))
+                    )
+                    material.bh_points = data['bh'][
+                        offsets[i] : offsets[i + 1]
+                    ]
+                    materials[name] = material
+        case _:
+            raise NotImplementedError(
+                f'Missing implementation for {file.suffix}.'
+            )
+
+    return materials
+
+
+def write_library(file: PathLike, materials: Iterable[Material]) -> None:
+    """Salva materiais no formato lido por `read_library()`."""
+    file = parse_path(file, ensure_parent=True)
+    materials = list(materials)
+
+    match file.suffix.lower():
+        case '.csv':
+            with file.open('w', newline='') as stream:
+                writer = csv.writer(stream)
+                writer.writerow(['name', *PROPS, 'b', 'h'])
+                for material in materials:
+                    bh = material.bh_points.tolist() or [['', '']]
+                    for b, h in bh:
+                        writer.writerow(
+                            [material.name, *material.props(), b, h]
+                        )
+        case '.npz':
+            curves = [
+                np.asarray(material.bh_points, dtype=np.float64).reshape(-1, 2)
+                for material in materials
+            ]
+            np.savez(
+                file,
+                names=np.array([material.name for material in materials]),
+                props=np.array(
+                    [material.props() for material in materials]
+                ).reshape(len(materials), len(PROPS)),
+                bh=np.concatenate([np.empty((0, 2)), *curves]),
+                bh_offsets=np.cumsum([0, *map(len, curves)]),
+            )
+        case _:
+            raise NotImplementedError(
+                f'Missing implementation for {file.suffix}.'
+            )
+
+
+class MaterialRegistry:
+    """
+    Materiais já carregados no documento aberto e a biblioteca de materiais
+    personalizados.
+
+    Cada material é adicionado ao documento uma única vez. O registro é
+    esvaziado por `FEMM.new()` e `FEMM.open()`, que leem os materiais já
+    presentes em um arquivo `.FEM`. A biblioteca é mantida entre
+    documentos.
+    """
+
+    def __init__(self) -> None:
+        self.loaded: set[str] = set()
+        self.library: dict[str, Material] = {}
+
+    def reset(self, file: PathLike | None = None) -> None:
+        """Esvazia o registro e lê os materiais do arquivo `.FEM` aberto."""
+        self.loaded.clear()
+        if file is None:
+            return
+
+        file = parse_path(file)
+        if file.suffix.upper() == '.FEM' and file.exists():
+            self.loaded.update(
+                BLOCK_NAME.findall(file.read_text(errors='replace'))
+            )
+
+    def register(self, materials: Iterable[Material]) -> None:
+        """Adiciona materiais personalizados à biblioteca."""
+        for material in materials:
+            self.library[material.name] = material
+
+    def register_file(self, file: PathLike) -> None:
+        """Adiciona os materiais de um arquivo lido por `read_library()`."""
+        self.register(read_library(file).values())
+
+    def ensure(self, *names: MaterialName) -> None:
+        """
+        Carrega no documento os materiais `names` que ainda não foram
+        carregados. Materiais da biblioteca personalizada, com as curvas
+        B-H, e da biblioteca do FEMM são adicionados com um único programa
+        Lua.
+        """
+        missing = list(dict.fromkeys(n for n in names if n not in self.loaded))
+        if not missing:
+            return
+
+        if len(missing) == 1 and missing[0] not in self.library:
+            femm.mi_getmaterial(missing[0])
+        else:
+            lines: list[str] = []
+            for name in missing:
+                if name in self.library:
+                    lines.extend(self.library[name].lua())
+                else:
+                    lines.append(f'mi_getmaterial({lua.string(name)})')
+            lua.run('\n'.join(lines) + '\n', 'materials')
+
+        self.loaded.update(missing)
+
+    def load(
+        self, materials: Mapping[str, Material] | Iterable[Material]
+    ) -> None:
+        """Registra e carrega materiais personalizados de uma só vez."""
+        values = list(
+            cast('Mapping[str, Material]', materials).values()
+            if isinstance(materials, Mapping)
+            else materials
+        )
+        self.register(values)
+        self.ensure(*(material.name for material in values))
+
+
+# O pyfemm controla um único documento por processo.
+registry = MaterialRegistry()
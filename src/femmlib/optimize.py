@@ -0,0 +1,319 @@
+from collections.abc import Callable, Mapping, Sequence
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+
+import numpy as np
+from numpy.typing import NDArray
+
+from femmlib.circuit import CircuitPropsExtended, CircuitPropsExtendedBatch
+from femmlib.store import PROPS_COLUMNS, ResultStore
+
+type Params = dict[str, float]
+type Solver = Callable[[Params], CircuitPropsExtended]
+type Objective = Callable[[CircuitPropsExtended], float]
+
+# Casas decimais usadas para identificar pontos já resolvidos.
+CACHE_DECIMALS = 12
+
+
+@dataclass
+class Parameter:
+    """Parâmetro do modelo otimizado, limitado a [`lower`, `upper`]."""
+
+    name: str
+    lower: float
+    upper: float
+
+
+def target(name: str, value: float) -> Objective:
+    """
+    Objetivo que mede a distância relativa entre o campo `name` de
+    `CircuitPropsExtended` e `value`, como uma indutância desejada.
+    """
+
+    def objective(props: CircuitPropsExtended) -> float:
+        return abs(abs(getattr(props, name)) - value) / abs(value)
+
+    return objective
+
+
+def minimize(name: str) -> Objective:
+    """Objetivo que minimiza o campo `name` de `CircuitPropsExtended`."""
+    return lambda props: float(np.abs(getattr(props, name)))
+
+
+def maximize(name: str) -> Objective:
+    """Objetivo que maximiza o campo `name` de `CircuitPropsExtended`."""
+    return lambda props: -float(np.abs(getattr(props, name)))
+
+
+class Evaluator:
+    """
+    Resolve lotes de pontos em paralelo e guarda os resultados, de forma que
+    um ponto nunca é resolvido duas vezes.
+
+    Se um `ResultStore` for definido, os pontos já salvos nele são
+    reaproveitados e os novos são adicionados a ele.
+    """
+
+    def __init__(
+        self,
+        solve: Solver,
+        executor: Executor | None = None,
+        store: ResultStore | None = None,
+    ) -> None:
+        """
+        - `solve`: Resolve o modelo com os parâmetros recebidos. Com um
+        `ProcessPoolExecutor`, deve ser uma função definida no nível de um
+        módulo;
+        - `executor`: Executa os lotes em paralelo. Se não for definido, os
+        pontos são resolvidos em série;
+        - `store`: Resultados salvos de execuções anteriores.
+        """
+        self.solve = solve
+        self.executor = executor
+        self.store = store
+        self.cache: dict[
+            tuple[tuple[str, float], ...], CircuitPropsExtended
+        ] = {}
+        self.solves = 0
+        self.hits = 0
+
+        if store is not None:
+            self.load(store)
+
+    @staticmethod
+    def key(params: Mapping[str, float]) -> tuple[tuple[str, float], ...]:
+        return tuple(
+            sorted(
+                (name, round(float(value), CACHE_DECIMALS))
+                for name, value in params.items()
+            )
+        )
+
+    def load(self, store: ResultStore) -> None:
+        for chunk in store.read():
+            props = CircuitPropsExtendedBatch(chunk[PROPS_COLUMNS])
+            for i, row in enumerate(chunk):
+                params = {name: float(row[name]) for name in store.params}
+                self.cache[self.key(params)] = props[i]
+
+    def __call__(
+        self, batch: Sequence[Mapping[str, float]]
+    ) -> list[CircuitPropsExtended]:
+        """Resolve os pontos de `batch` que ainda não foram resolvidos."""
+        keys = [self.key(params) for params in batch]
+        missing: dict[tuple[tuple[str, float], ...], Params] = {}
+        for key, params in zip(keys, batch, strict=True):
+            if key in self.cache or key in missing:
+                self.hits += 1
+            else:
+                missing[key] = dict(params)
+
+        points = list(missing.values())
+        if self.executor is None:
+            results = [self.solve(params) for params in points]
+        else:
+            results = list(self.executor.map(self.solve, points))
+
+        self.solves += len(points)
+        for key, params, props in zip(missing, points, results, strict=True):
+            self.cache[key] = props
+            if self.store is not None:
+                self.store.append(params, props)
+
+        return [self.cache[key] for key in keys]
+
+
+@dataclass
+class OptimizeResult:
+    """
+    - `params`: Melhor ponto encontrado;
+    - `props`: Propriedades do circuito no melhor ponto;
+    - `value`: Valor do objetivo no melhor ponto;
+    - `iterations`: Quantidade de lotes avaliados;
+    - `history`: Melhor valor do objetivo após cada lote.
+    """
+
+    params: Params
+    props: CircuitPropsExtended
+    value: float
+    iterations: int
+    history: list[float] = field(default_factory=list[float])
+
+
+def k_section(
+    evaluate: Evaluator,
+    parameter: Parameter,
+    objective: Objective,
+    *,
+    fixed: Mapping[str, float] | None = None,
+    batch: int = 4,
+    tolerance: float = 1e-6,
+    max_iterations: int = 100,
+) -> OptimizeResult:
+    """
+    Minimiza um objetivo unimodal de um parâmetro, como a distância entre a
+    indutância e um valor desejado em função do comprimento do entreferro.
+
+    É uma generalização paralela da busca da seção áurea: a cada iteração,
+    `batch` pontos internos são avaliados de uma só vez e o intervalo é
+    reduzido para os vizinhos do melhor ponto, um fator de `(batch + 1) / 2`.
+
+    - `fixed`: Valores dos demais parâmetros do modelo;
+    - `tolerance`: Largura final do intervalo, relativa à inicial.
+    """
+    fixed = dict(fixed or {})
+    lower, upper = parameter.lower, parameter.upper
+    width = upper - lower
+    best: tuple[float, Params, CircuitPropsExtended] | None = None
+    history: list[float] = []
+    iterations = 0
+
+    while upper - lower > tolerance * width and iterations < max_iterations:
+        x = np.linspace(lower, upper, batch + 2)
+        points = [fixed | {parameter.name: float(value)} for value in x]
+        results = evaluate(points)
+        values = [objective(props) for props in results]
+        iterations += 1
+
+        i = int(np.argmin(values))
+        if best is None or values[i] < best[0]:
+            best = (values[i], points[i], results[i])
+        history.append(best[0])
+
+        lower = float(x[max(i - 1, 0)])
+        upper = float(x[min(i + 1, len(x) - 1)])
+
+    assert best is not None, 'Tolerance must be smaller than 1.'
+    return OptimizeResult(best[1], best[2], best[0], iterations, history)
+
+
+def nelder_mead(
+    evaluate: Evaluator,
+    parameters: Sequence[Parameter],
+    objective: Objective,
+    *,
+    start: Mapping[str, float] | None = None,
+    fixed: Mapping[str, float] | None = None,
+    step: float = 0.1,
+    tolerance: float = 1e-6,
+    max_iterations: int = 200,
+) -> OptimizeResult:
+    """
+    Minimiza um objetivo de vários parâmetros pelo método de Nelder-Mead,
+    com os pontos limitados aos intervalos de cada parâmetro.
+
+    A cada iteração, a reflexão, a expansão e as duas contrações são
+    avaliadas no mesmo lote, em paralelo, e a redução do simplex avalia
+    todos os novos vértices de uma vez.
+
+    - `start`: Ponto inicial. Por padrão, o centro dos intervalos;
+    - `fixed`: Valores dos demais parâmetros do modelo;
+    - `step`: Tamanho do simplex inicial, relativo a cada intervalo;
+    - `tolerance`: Variação máxima do objetivo e do tamanho do simplex,
+    relativo aos intervalos, para terminar.
+    """
+    fixed = dict(fixed or {})
+    lower = np.array([parameter.lower for parameter in parameters])
+    upper = np.array([parameter.upper for parameter in parameters])
+    span = upper - lower
+    n = len(parameters)
+
+    def clip(point: NDArray[np.float64]) -> NDArray[np.float64]:
+        return np.clip(point, lower, upper)
+
+    def run(
+        points: list[NDArray[np.float64]],
+    ) -> tuple[list[float], list[CircuitPropsExtended]]:
+        batch = [
+            fixed
+            | {
+                parameter.name: float(value)
+                for parameter, value in zip(parameters, point, strict=True)
+            }
+            for point in points
+        ]
+        results = evaluate(batch)
+        return [objective(props) for props in results], results
+
+    x0 = (
+        np.array([start[parameter.name] for parameter in parameters])
+        if start is not None
+        else (lower + upper) / 2
+    )
+    simplex: list[NDArray[np.float64]] = [clip(x0)]
+    for i in range(n):
+        vertex = x0.copy()
+        # Vértice no sentido oposto se o passo sair do intervalo.
+        vertex[i] += (
+            step * span[i]
+            if x0[i] + step * span[i] <= upper[i]
+            else -step * span[i]
+        )
+        simplex.append(clip(vertex))
+
+    values: list[float]
+    props: list[CircuitPropsExtended]
+    values, props = run(simplex)
+    history: list[float] = []
+    iterations = 0
+
+    while iterations < max_iterations:
+        order = np.argsort(values)
+        simplex = [simplex[i] for i in order]
+        values = [values[i] for i in order]
+        props = [props[i] for i in order]
+        history.append(values[0])
+
+        size = max(
+            float(np.abs((vertex - simplex[0]) / span).max())
+            for vertex in simplex[1:]
+        )
+        if values[-1] - values[0] <= tolerance and size <= tolerance:
+            break
+
+        iterations += 1
+        centroid = np.mean(simplex[:-1], axis=0)
+        worst = simplex[-1]
+        candidates = [
+            clip(centroid + (centroid - worst)),
+            clip(centroid + 2 * (centroid - worst)),
+            clip(centroid + (centroid - worst) / 2),
+            clip(centroid - (centroid - worst) / 2),
+        ]
+        (reflected, expanded, outside, inside), results = run(candidates)
+
+        if reflected < values[0]:
+            chosen = 1 if expanded < reflected else 0
+        elif reflected < values[-2]:
+            chosen = 0
+        elif reflected < values[-1] and outside <= reflected:
+            chosen = 2
+        elif inside < values[-1]:
+            chosen = 3
+        else:
+            # Redução do simplex em direção ao melhor vértice.
+            shrunk = [
+                simplex[0] + (vertex - simplex[0]) / 2
+                for vertex in simplex[1:]
+            ]
+            shrunk_values, shrunk_props = run(shrunk)
+            simplex = [simplex[0], *shrunk]
+            values = [values[0], *shrunk_values]
+            props = [props[0], *shrunk_props]
+            continue
+
+        simplex[-1] = candidates[chosen]
+        values[-1] = [reflected, expanded, outside, inside][chosen]
+        props[-1] = results[chosen]
+
+    best = int(np.argmin(values))
+    params = fixed | {
+        parameter.name: float(value)
+        for parameter, value in zip(parameters, simplex[best], strict=True)
+    }
+
+    return OptimizeResult(
+        params, props[best], values[best], iterations, history
+    )
@@ -0,0 +1,249 @@
+import multiprocessing
+from collections.abc import Iterable
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from pathlib import Path
+
+import numpy as np
+from matplotlib.axes import Axes
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure as PlotFigure
+from matplotlib.tri import Triangulation
+from numpy.typing import NDArray
+
+from femmlib.figure import DensityPlotType, Figure, VectorPlotType
+from femmlib.solution import Solution
+from helpers.path import PathLike, parse_path
+
+# Rótulos das plotagens de densidade, nas unidades do FEMM.
+DENSITY_LABELS: dict[DensityPlotType, str] = {
+    'bmag': '|B| (T)',
+    'breal': '|Re(B)| (T)',
+    'bimag': '|Im(B)| (T)',
+    'logb': 'log10 |B| (T)',
+    'hmag': '|H| (A/m)',
+    'hreal': '|Re(H)| (A/m)',
+    'himag': '|Im(H)| (A/m)',
+    'jmag': '|J| (MA/m²)',
+    'jreal': 'Re(J) (MA/m²)',
+    'jimag': 'Im(J) (MA/m²)',
+}
+# Fração da maior dimensão da malha ocupada pelo maior vetor.
+ARROW_LENGTH = 0.05
+
+
+def magnitude(
+    field: NDArray[np.float64] | NDArray[np.complex128],
+) -> NDArray[np.float64]:
+    """Módulo de um campo vetorial complexo, no formato (M, 2)."""
+    return np.sqrt((np.abs(field) ** 2).sum(axis=1))
+
+
+def density(
+    solution: Solution, plot_type: DensityPlotType
+) -> NDArray[np.float64]:
+    """
+    Valor da plotagem de densidade `plot_type` em cada triângulo, como em
+    `mo_showdensityplot()`. Triângulos sem valor definido, como o campo
+    magnético em materiais não lineares, recebem `NaN`.
+    """
+    match plot_type:
+        case 'bmag':
+            return magnitude(solution.flux_density)
+        case 'breal':
+            return magnitude(np.real(solution.flux_density))
+        case 'bimag':
+            return magnitude(np.imag(solution.flux_density))
+        case 'logb':
+            b = magnitude(solution.flux_density)
+            return np.log10(np.maximum(b, np.finfo(np.float64).tiny))
+        case 'hmag':
+            return magnitude(solution.magnetic_field)
+        case 'hreal':
+            return magnitude(np.real(solution.magnetic_field))
+        case 'himag':
+            return magnitude(np.imag(solution.magnetic_field))
+        case 'jmag':
+            return np.abs(solution.current_density()) / 1e6
+        case 'jreal':
+            return np.real(solution.current_density()) / 1e6
+        case 'jimag':
+            return np.imag(solution.current_density()) / 1e6
+        case _:
+            raise NotImplementedError(
+                f'Missing implementation for {plot_type}.'
+            )
+
+
+def vectors(
+    solution: Solution, plot_type: VectorPlotType
+) -> list[NDArray[np.float64]]:
+    """
+    Campos da plotagem de vetores `plot_type` em cada triângulo, como em
+    `mo_showvectorplot()`. Os tipos 5 e 6 retornam a parte real seguida da
+    imaginária.
+    """
+    match plot_type:
+        case 0:
+            return []
+        case 1:
+            return [np.real(solution.flux_density)]
+        case 2:
+            return [np.real(solution.magnetic_field)]
+        case 3:
+            return [np.imag(solution.flux_density)]
+        case 4:
+            return [np.imag(solution.magnetic_field)]
+        case 5:
+            field = solution.flux_density
+            return [np.real(field), np.imag(field)]
+        case 6:
+            field = solution.magnetic_field
+            return [np.real(field), np.imag(field)]
+        case _:
+            raise NotImplementedError(
+                f'Missing implementation for {plot_type}.'
+            )
+
+
+def draw(
+    ax: Axes, solution: Solution, figure: Figure, max_arrows: int = 2000
+) -> None:
+    """
+    Desenha em `ax` as plotagens de densidade e de vetores configuradas em
+    `figure`, sem o FEMM.
+
+    - `max_arrows`: Quantidade máxima de vetores. Em malhas maiores, os
+    triângulos são amostrados em intervalos regulares.
+    """
+    triangulation = Triangulation(
+        solution.nodes[:, 0], solution.nodes[:, 1], solution.elements
+    )
+    bounded = figure.density_upper_bound > figure.density_lower_bound
+    mesh = ax.tripcolor(
+        triangulation,
+        facecolors=np.ma.masked_invalid(
+            density(solution, figure.density_plot_type)
+        ),
+        cmap='gray' if figure.gray_scale else 'turbo',
+        vmin=figure.density_lower_bound if bounded else None,
+        vmax=figure.density_upper_bound if bounded else None,
+    )
+    if figure.legend:
+        ax.figure.colorbar(
+            mesh, ax=ax, label=DENSITY_LABELS[figure.density_plot_type]
+        )
+
+    centroids = solution.centroids()
+    step = max(1, len(centroids) // max_arrows)
+    size = float(np.ptp(solution.nodes, axis=0).max())
+    for field, color in zip(
+        vectors(solution, figure.vector_plot_type), ('k', 'r'), strict=False
+    ):
+        largest = np.nanmax(np.hypot(field[:, 0], field[:, 1]))
+        if not largest > 0:
+            continue
+
+        ax.quiver(
+            centroids[::step, 0],
+            centroids[::step, 1],
+            field[::step, 0],
+            field[::step, 1],
+            color=color,
+            angles='xy',
+            scale_units='xy',
+            scale=largest / (ARROW_LENGTH * size * figure.arrow_scale_factor),
+        )
+
+    ax.set_aspect('equal')
+    ax.set_xlabel(f'x ({solution.unit})')
+    ax.set_ylabel(f'y ({solution.unit})')
+
+
+def render(
+    solution: Solution,
+    figure: Figure,
+    file: PathLike,
+    *,
+    dpi: int = 100,
+    size: tuple[float, float] = (6.4, 4.8),
+    max_arrows: int = 2000,
+) -> Path:
+    """
+    Salva a imagem de `solution` com as opções de `figure`, equivalente a
+    `Figure.save()`, mas sem a interface do FEMM. Usa o backend Agg do
+    Matplotlib sem passar pelo `pyplot`, então pode ser chamada em qualquer
+    processo.
+
+    - `size`: Tamanho da imagem em polegadas.
+    """
+    file = parse_path(file, ensure_parent=True)
+
+    plot = PlotFigure(figsize=size)
+    FigureCanvasAgg(plot)
+    draw(plot.add_subplot(), solution, figure, max_arrows)
+    plot.savefig(file, dpi=dpi)
+
+    return file
+
+
+def render_file(
+    file: PathLike, figure: Figure, output: PathLike, dpi: int = 100
+) -> Path:
+    """Lê um arquivo `.ans` e salva a sua imagem em `output`."""
+    return render(Solution.read(file), figure, output, dpi=dpi)
+
+
+def render_all(
+    files: Iterable[PathLike],
+    figure: Figure,
+    folder: PathLike,
+    *,
+    dpi: int = 100,
+    processes: int | None = None,
+) -> list[Path]:
+    """
+    Salva as imagens de vários arquivos `.ans` na pasta `folder`, com o
+    nome de cada arquivo, em paralelo. As imagens de uma varredura servem
+    como quadros de uma animação, já que os limites da plotagem de
+    densidade são os mesmos para todas.
+
+    - `processes`: Quantidade de processos. Por padrão, um por CPU. Com 1,
+    as imagens são salvas no próprio processo.
+    """
+    folder = parse_path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    files = [parse_path(file) for file in files]
+    outputs = [folder / f'{file.stem}.png' for file in files]
+
+    if processes == 1:
+        return [
+            render_file(file, figure, output, dpi)
+            for file, output in zip(files, outputs, strict=True)
+        ]
+
+    with ProcessPoolExecutor(
+        processes, mp_context=multiprocessing.get_context('spawn')
+    ) as executor:
+        return list(
+            executor.map(
+                render_file, files, repeat(figure), outputs, repeat(dpi)
+            )
+        )
+
+
+def render_sweep(
+    folder: PathLike,
+    figure: Figure,
+    output: PathLike,
+    pattern: str = '*.ans',
+    *,
+    dpi: int = 100,
+    processes: int | None = None,
+) -> list[Path]:
+    """
+    Salva, em ordem alfabética, as imagens de todas as soluções de uma
+    pasta de varredura, como em `render_all()`.
+    """
+    files = sorted(parse_path(folder).glob(pattern))
+    return render_all(files, figure, output, dpi=dpi, processes=processes)
@@ -0,0 +1,144 @@
+import math
+from collections.abc import Sequence
+from dataclasses import dataclass
+from typing import Any, Self
+
+import femm
+import numpy as np
+from numpy.typing import NDArray
+
+from femmlib.boundary import Boundary
+from femmlib.circuit import Circuit
+
+
+@dataclass
+class RotorSweepResult:
+    """
+    Resultado de uma varredura de posição do rotor.
+
+    - `angles`: Posições do rotor em graus;
+    - `torque`: Torque no entreferro em cada posição, em N.m;
+    - `flux_linkage`: Fluxo concatenado de cada circuito em cada posição.
+    Complexo em problemas harmônicos.
+    """
+
+    angles: NDArray[np.float64]
+    torque: NDArray[np.float64]
+    flux_linkage: dict[str, NDArray[np.float64 | np.complex128]]
+
+    def back_emf(self, circuit: str, speed: float) -> NDArray[np.inexact[Any]]:
+        """
+        Computa a força contra-eletromotriz do circuito `circuit` derivando o
+        fluxo concatenado em relação à posição do rotor.
+
+        - `speed`: Velocidade do rotor em rpm.
+        """
+        omega = speed * 2 * math.pi / 60
+        dtheta = np.radians(self.angles)
+
+        return np.gradient(self.flux_linkage[circuit], dtheta) * omega
+
+
+class RotorSweepBuilder:
+    def __init__(self, boundary: Boundary) -> None:
+        """
+        - `boundary`: Fronteira de entreferro (periódica ou anti-periódica)
+        entre o estator e o rotor.
+        """
+        assert boundary.props.boundary_format in (6, 7), (
+            'The rotor sweep needs an air gap boundary.'
+        )
+
+        self.boundary = boundary
+        self.angles: list[float] = []
+        self.circuits: list[Circuit] = []
+        self.freq: float = 0
+
+    def with_angles(self, angles: Sequence[float]) -> Self:
+        """Posições do rotor em graus."""
+        self.angles = list(angles)
+        return self
+
+    def with_steps(self, steps: int, stop: float = 360) -> Self:
+        """
+        Divide o intervalo de 0 a `stop` graus em `steps` posições igualmente
+        espaçadas, sem repetir a última.
+        """
+        self.angles = [stop * i / steps for i in range(steps)]
+        return self
+
+    def with_output(self, *circuits: Circuit) -> Self:
+        """Circuitos cujo fluxo concatenado será salvo em cada posição."""
+        self.circuits.extend(circuits)
+        return self
+
+    def with_freq(self, freq: float) -> Self:
+        """
+        Frequência do problema, a mesma passada ao `FEMM`. Com frequência
+        diferente de 0, o fluxo concatenado é complexo. Valor padrão: 0.
+        """
+        self.freq = freq
+        return self
+
+    def build(self) -> 'RotorSweep':
+        assert len(self.angles) > 0, 'The sweep needs at least one angle.'
+
+        return RotorSweep(self.boundary, self.angles, self.circuits, self.freq)
+
+
+@dataclass
+class RotorSweep:
+    """
+    Varredura da posição do rotor de uma máquina girante.
+
+    O estator e o rotor são desenhados uma única vez. Cada posição é obtida
+    alterando apenas o ângulo interno da fronteira de entreferro, de forma
+    que a varredura custa uma análise por posição e nenhum redesenho.
+    """
+
+    boundary: Boundary
+    angles: list[float]
+    circuits: list[Circuit]
+    freq: float = 0
+
+    @staticmethod
+    def builder(boundary: Boundary) -> RotorSweepBuilder:
+        return RotorSweepBuilder(boundary)
+
+    def run(self) -> RotorSweepResult:
+        """
+        Resolve o documento aberto em cada posição do rotor. Ao final, o
+        ângulo original da fronteira é restaurado.
+        """
+        inner_angle = self.boundary.props.inner_angle
+        outer_angle = self.boundary.props.outer_angle
+
+        torque = np.empty(len(self.angles))
+        flux_linkage: dict[str, NDArray[np.float64 | np.complex128]] = {
+            circuit.name: np.empty(
+                len(self.angles),
+                dtype=np.float64 if self.freq == 0 else np.complex128,
+            )
+            for circuit in self.circuits
+        }
+
+        try:
+            for i, angle in enumerate(self.angles):
+                self.boundary.set_angles(inner_angle + angle, outer_angle)
+
+                femm.mi_analyze()
+                femm.mi_loadsolution()
+
+                torque[i] = femm.mo_gapintegral(self.boundary.name, 0)
+                for circuit in self.circuits:
+                    flux_linkage[circuit.name][i] = (
+                        circuit.props().flux_linkage
+                    )
+
+                femm.mo_close()
+        finally:
+            self.boundary.set_angles(inner_angle, outer_angle)
+
+        return RotorSweepResult(
+            np.array(self.angles, dtype=np.float64), torque, flux_linkage
+        )
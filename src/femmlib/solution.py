@@ -0,0 +1,640 @@
+import math
+import re
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from functools import cached_property
+from typing import cast
+
+import numpy as np
+from numpy.typing import NDArray
+
+from femmlib.circuit import CircuitProps, CircuitPropsExtended
+from femmlib.core import CONV_RATE
+from femmlib.types import Group, ProbType, Unit
+from helpers.path import PathLike, parse_path
+from mathlib import sampling
+from mathlib.electromagnetics import VACUUM_PERMEABILITY
+from mathlib.sampling import BoundingBox
+from mathlib.vector2 import Vector2Like
+
+HEADER = re.compile(r'^\[(\w+)\]\s*=\s*(.*)$')
+PROPERTY = re.compile(r'^<(\w+)>\s*=\s*(.*)$')
+
+
+@dataclass
+class SolutionMaterial:
+    """Propriedades de um material lidas do arquivo de solução."""
+
+    name: str
+    mu_x: float
+    mu_y: float
+    conductivity: float
+    bh_points: int
+
+    def is_linear(self) -> bool:
+        return self.bh_points == 0
+
+
+@dataclass
+class SolutionCircuit:
+    """Propriedades de um circuito lidas do arquivo de solução."""
+
+    name: str
+    current: complex
+    type: int
+
+
+@dataclass
+class SolutionLabel:
+    """
+    Rótulo de bloco lido do arquivo de solução.
+
+    - `material`: Índice em `Solution.materials`, ou -1 se não houver;
+    - `circuit`: Índice em `Solution.circuits`, ou -1 se não houver.
+    """
+
+    x: float
+    y: float
+    material: int
+    circuit: int
+    magnetization_direction: float
+    group: Group
+    turns: int
+
+
+@dataclass(eq=False)
+class Solution:
+    """
+    Solução de um problema magnético lida de um arquivo `.ans`, sem o FEMM.
+
+    A malha é guardada em vetores do NumPy para que o pós-processamento seja
+    feito de uma só vez sobre todos os elementos. As coordenadas estão na
+    unidade do problema e o potencial vetor magnético em Wb/m.
+
+    - `nodes`: Coordenadas dos nós, formato (N, 2);
+    - `potential`: Potencial vetor magnético em cada nó, formato (N,).
+    Complexo se o problema for harmônico;
+    - `elements`: Índices dos nós de cada triângulo, formato (M, 3);
+    - `element_labels`: Índice em `Solution.labels` de cada triângulo.
+    """
+
+    freq: float
+    depth: float
+    unit: Unit
+    type: ProbType
+    materials: list[SolutionMaterial]
+    circuits: list[SolutionCircuit]
+    labels: list[SolutionLabel]
+    nodes: NDArray[np.float64]
+    potential: NDArray[np.float64] | NDArray[np.complex128]
+    elements: NDArray[np.int64]
+    element_labels: NDArray[np.int64]
+
+    @classmethod
+    def read(cls, file: PathLike) -> 'Solution':
+        """Lê o arquivo de solução `.ans` do FEMM."""
+        return cls.read_text(parse_path(file).read_text(errors='replace'))
+
+    @classmethod
+    def read_text(cls, text: str) -> 'Solution':
+        """Lê o conteúdo de um arquivo de solução `.ans` do FEMM."""
+        lines = text.splitlines()
+        header: dict[str, str] = {}
+        materials: list[SolutionMaterial] = []
+        circuits: list[SolutionCircuit] = []
+        labels: list[SolutionLabel] = []
+        block: dict[str, str] = {}
+
+        i = 0
+        while i < len(lines):
+            line = lines[i].strip()
+            i += 1
+
+            if line.lower() == '[solution]':
+                break
+            elif match := HEADER.match(line):
+                key = match[1].lower()
+                header[key] = match[2].strip().strip('"')
+
+                if key == 'numblocklabels':
+                    for _ in range(int(header[key])):
+                        labels.append(parse_label(lines[i]))
+                        i += 1
+            elif match := PROPERTY.match(line):
+                block[match[1].lower()] = match[2].strip().strip('"')
+
+                if match[1].lower() == 'bhpoints':
+                    i += int(block['bhpoints'])
+            elif line.lower() == '<endblock>':
+                materials.append(
+                    SolutionMaterial(
+                        block.get('blockname', ''),
+                        float(block.get('mu_x', 1)),
+                        float(block.get('mu_y', 1)),
+                        float(block.get('sigma', 0)),
+                        int(block.get('bhpoints', 0)),
+                    )
+                )
+                block = {}
+            elif line.lower() == '<endcircuit>':
+                circuits.append(
+                    SolutionCircuit(
+                        block.get('circuitname', ''),
+                        complex(
+                            float(block.get('totalamps_re', 0)),
+                            float(block.get('totalamps_im', 0)),
+                        ),
+                        int(block.get('circuittype', 0)),
+                    )
+                )
+                block = {}
+
+        node_count = int(lines[i])
+        node_data = np.array(
+            ' '.join(lines[i + 1 : i + 1 + node_count]).split(),
+            dtype=np.float64,
+        ).reshape(node_count, -1)
+        i += 1 + node_count
+
+        element_count = int(lines[i])
+        element_data = np.array(
+            ' '.join(lines[i + 1 : i + 1 + element_count]).split(),
+            dtype=np.int64,
+        ).reshape(element_count, -1)
+
+        # Em problemas harmônicos, o potencial tem parte real e imaginária.
+        freq = float(header.get('frequency', 0))
+        if freq != 0:
+            potential = node_data[:, 2] + 1j * node_data[:, 3]
+        else:
+            potential = node_data[:, 2]
+
+        return cls(
+            freq=freq,
+            depth=float(header.get('depth', 1)),
+            unit=cast('Unit', header.get('lengthunits', 'inches').lower()),
+            type='axi'
+            if header.get('problemtype', '').lower() == 'axisymmetric'
+            else 'planar',
+            materials=materials,
+            circuits=circuits,
+            labels=labels,
+            nodes=node_data[:, :2].copy(),
+            potential=potential,
+            elements=element_data[:, :3].copy(),
+            element_labels=element_data[:, 3].copy(),
+        )
+
+    def conv_rate(self) -> float:
+        """Fator de conversão da unidade do problema para metros."""
+        return CONV_RATE[self.unit]
+
+    def depth_in_meters(self) -> float:
+        return self.depth * self.conv_rate()
+
+    @cached_property
+    def shape_gradients(
+        self,
+    ) -> tuple[NDArray[np.float64], NDArray[np.float64], NDArray[np.float64]]:
+        """
+        Gradientes das funções de forma lineares de cada triângulo, em 1/m,
+        e a área de cada triângulo, em m². Retorna `(grad_x, grad_y, area)`
+        com formatos (M, 3), (M, 3) e (M,).
+        """
+        points = self.nodes[self.elements] * self.conv_rate()
+        x = points[:, :, 0]
+        y = points[:, :, 1]
+
+        b = np.roll(y, -1, axis=1) - np.roll(y, -2, axis=1)
+        c = np.roll(x, -2, axis=1) - np.roll(x, -1, axis=1)
+        double_area = (x[:, 1] - x[:, 0]) * (y[:, 2] - y[:, 0]) - (
+            x[:, 2] - x[:, 0]
+        ) * (y[:, 1] - y[:, 0])
+
+        return (
+            b / double_area[:, None],
+            c / double_area[:, None],
+            np.abs(double_area) / 2,
+        )
+
+    def areas(self) -> NDArray[np.float64]:
+        """Área de cada triângulo em m²."""
+        return self.shape_gradients[2]
+
+    def volumes(self) -> NDArray[np.float64]:
+        """Volume de cada triângulo em m³."""
+        self.assert_planar()
+        return self.areas() * self.depth_in_meters()
+
+    def centroids(self) -> NDArray[np.float64]:
+        """Centroide de cada triângulo, na unidade do problema."""
+        return self.nodes[self.elements].mean(axis=1)
+
+    @cached_property
+    def flux_density(self) -> NDArray[np.float64] | NDArray[np.complex128]:
+        """
+        Densidade de fluxo magnético em cada triângulo, em T, formato
+        (M, 2). Como as funções de forma são lineares, o campo é constante
+        dentro de cada triângulo.
+        """
+        self.assert_planar()
+
+        grad_x, grad_y, _ = self.shape_gradients
+        potential = self.potential[self.elements]
+
+        # Real ou complexo, como o potencial.
+        return cast(
+            'NDArray[np.float64] | NDArray[np.complex128]',
+            np.stack(
+                (
+                    (grad_y * potential).sum(axis=1),
+                    -(grad_x * potential).sum(axis=1),
+                ),
+                axis=1,
+            ),
+        )
+
+    @cached_property
+    def magnetic_field(self) -> NDArray[np.float64] | NDArray[np.complex128]:
+        """
+        Campo magnético em cada triângulo, em A/m, formato (M, 2).
+        Triângulos de materiais não lineares recebem `NaN`, como em
+        `Solution.element_permeability()`.
+        """
+        return self.flux_density / (
+            VACUUM_PERMEABILITY * self.element_permeability()
+        )
+
+    def current_density(self) -> NDArray[np.float64] | NDArray[np.complex128]:
+        """
+        Densidade de corrente imposta pelos circuitos em cada triângulo, em
+        A/m², formato (M,). Complexa se o problema for harmônico.
+
+        Em circuitos em série, cada bloco conduz a corrente do circuito vezes
+        o seu número de voltas. Em paralelo, a corrente é dividida pela área
+        total dos blocos do circuito. Correntes induzidas não são incluídas.
+        """
+        area = self.areas()
+        circuits = np.array([label.circuit for label in self.labels])
+        turns = np.array([label.turns for label in self.labels])
+
+        label_area = np.bincount(
+            self.element_labels, weights=area, minlength=len(self.labels)
+        )
+        in_circuit = circuits >= 0
+        circuit_area = np.bincount(
+            circuits[in_circuit],
+            weights=label_area[in_circuit],
+            minlength=len(self.circuits),
+        )
+
+        # O último item representa os blocos sem circuito.
+        current = np.array(
+            [circuit.current for circuit in self.circuits] + [0]
+        )
+        series = np.array(
+            [circuit.type == 1 for circuit in self.circuits] + [True]
+        )
+        area = np.where(
+            series[circuits], label_area, np.append(circuit_area, 1)[circuits]
+        )
+        density: NDArray[np.complex128] = np.where(
+            in_circuit & (area > 0),
+            current[circuits]
+            * np.where(series[circuits], turns, 1)
+            / np.where(area > 0, area, 1),
+            0,
+        )
+        if self.freq == 0:
+            return density.real[self.element_labels]
+
+        return density[self.element_labels]
+
+    @cached_property
+    def element_index(
+        self,
+    ) -> tuple[NDArray[np.float64], NDArray[np.int64], NDArray[np.int64]]:
+        """
+        Índice espacial dos triângulos: uma grade uniforme sobre a malha em
+        que cada célula guarda os triângulos que a tocam. Retorna `(bounds,
+        starts, elements)`, em que os triângulos da célula `k` são
+        `elements[starts[k]:starts[k + 1]]` e `bounds` guarda o canto
+        inferior, o tamanho das células e a quantidade de células em cada
+        direção.
+        """
+        points = self.nodes[self.elements]
+        lower = self.nodes.min(axis=0)
+        upper = self.nodes.max(axis=0)
+        cells = max(1, int(np.sqrt(len(self.elements))))
+        size = np.maximum((upper - lower) / cells, np.finfo(float).tiny)
+
+        first = np.clip(
+            ((points.min(axis=1) - lower) / size).astype(np.int64),
+            0,
+            cells - 1,
+        )
+        last = np.clip(
+            ((points.max(axis=1) - lower) / size).astype(np.int64),
+            0,
+            cells - 1,
+        )
+
+        # Expande cada triângulo em todas as células que sua caixa toca.
+        span = last - first + 1
+        counts = span[:, 0] * span[:, 1]
+        element = np.repeat(np.arange(len(self.elements)), counts)
+        offset = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        ix = first[element, 0] + offset % span[element, 0]
+        iy = first[element, 1] + offset // span[element, 0]
+        cell = iy * cells + ix
+
+        order = np.argsort(cell, kind='stable')
+        starts = np.searchsorted(cell[order], np.arange(cells**2 + 1))
+
+        return (
+            np.array([*lower, *size, cells], dtype=np.float64),
+            starts,
+            element[order],
+        )
+
+    def barycentric(
+        self, points: NDArray[np.float64], elements: NDArray[np.int64]
+    ) -> NDArray[np.float64]:
+        """
+        Coordenadas baricêntricas de cada ponto, na unidade do problema, em
+        relação ao triângulo correspondente, no formato (k, 3).
+        """
+        grad_x, grad_y, _ = self.shape_gradients
+        centroids = self.nodes[self.elements[elements]].mean(axis=1)
+        delta = (points - centroids) * self.conv_rate()
+
+        return (
+            1 / 3
+            + grad_x[elements] * delta[:, 0, None]
+            + grad_y[elements] * delta[:, 1, None]
+        )
+
+    def locate(self, points: NDArray[np.float64]) -> NDArray[np.int64]:
+        """
+        Retorna o índice do triângulo que contém cada ponto, na unidade do
+        problema, ou -1 para os pontos fora da malha.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        bounds, starts, candidates = self.element_index
+        lower, size, cells = bounds[:2], bounds[2:4], int(bounds[4])
+
+        # Pontos sobre a borda superior da malha ficam na última célula.
+        scaled = (points - lower) / size
+        inside = ((scaled >= 0) & (scaled <= cells)).all(axis=1)
+        index = np.minimum(np.floor(scaled), cells - 1).astype(np.int64)
+        cell = np.where(inside, index[:, 1] * cells + index[:, 0], 0)
+        start = starts[cell]
+        count = np.where(inside, starts[cell + 1] - start, 0)
+
+        found = np.full(len(points), -1, dtype=np.int64)
+        tolerance = 1e-9
+
+        # Testa o k-ésimo candidato de todos os pontos ao mesmo tempo.
+        for k in range(int(count.max(initial=0))):
+            pending = (found < 0) & (count > k)
+            if not pending.any():
+                break
+
+            element = candidates[start[pending] + k]
+            weights = self.barycentric(points[pending], element)
+            hit = (weights >= -tolerance).all(axis=1)
+            found[np.flatnonzero(pending)[hit]] = element[hit]
+
+        return found
+
+    def sample(
+        self, points: NDArray[np.float64]
+    ) -> NDArray[np.float64] | NDArray[np.complex128]:
+        """
+        Densidade de fluxo magnético em cada ponto, com o mesmo formato de
+        `points` e valores `NaN` fora da malha.
+        """
+        points = np.asarray(points, dtype=np.float64)
+        elements = self.locate(points)
+        b = self.flux_density[np.maximum(elements, 0)]
+        b[elements < 0] = np.nan
+
+        return b.reshape(points.shape)
+
+    def potential_at(
+        self, points: NDArray[np.float64]
+    ) -> NDArray[np.float64] | NDArray[np.complex128]:
+        """
+        Potencial vetor magnético interpolado em cada ponto, no formato
+        (k,), com valores `NaN` fora da malha.
+        """
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        elements = self.locate(points)
+        found = np.maximum(elements, 0)
+        weights = self.barycentric(points, found)
+        potential = (weights * self.potential[self.elements[found]]).sum(
+            axis=1
+        )
+        potential[elements < 0] = np.nan
+
+        return potential
+
+    def sample_line(
+        self, a: Vector2Like, b: Vector2Like, n: int
+    ) -> NDArray[np.float64] | NDArray[np.complex128]:
+        """Amostra `n` pontos de `a` até `b`. Formato (n, 2)."""
+        return self.sample(sampling.line(a, b, n))
+
+    def sample_grid(
+        self, bbox: BoundingBox, nx: int, ny: int
+    ) -> NDArray[np.float64] | NDArray[np.complex128]:
+        """Amostra uma grade de `nx` por `ny` pontos. Formato (ny, nx, 2)."""
+        return self.sample(sampling.grid(bbox, nx, ny))
+
+    def element_permeability(self) -> NDArray[np.float64]:
+        """
+        Permeabilidade relativa de cada triângulo nas direções x e y, no
+        formato (M, 2). Triângulos de materiais não lineares recebem `NaN`,
+        já que a permeabilidade depende do campo.
+        """
+        permeability = np.array(
+            [
+                (material.mu_x, material.mu_y)
+                if material.is_linear()
+                else (np.nan, np.nan)
+                for material in self.materials
+            ]
+            + [(1.0, 1.0)],
+            dtype=np.float64,
+        ).reshape(-1, 2)
+        # Rótulos sem material apontam para o último item, o ar.
+        materials = np.array([label.material for label in self.labels])
+
+        return permeability[materials[self.element_labels]]
+
+    def element_groups(self) -> NDArray[np.int64]:
+        """Grupo do rótulo de bloco de cada triângulo."""
+        groups = np.array([label.group for label in self.labels])
+        return groups[self.element_labels]
+
+    def circuit_props(self) -> dict[str, CircuitProps]:
+        """
+        Calcula as propriedades de todos os circuitos de uma só vez, sem o
+        FEMM.
+
+        O fluxo concatenado é a integral do potencial vetor sobre os blocos de
+        cada circuito. Em circuitos em série, a integral de cada bloco é
+        ponderada pelo número de voltas e dividida pela área do bloco. Em
+        paralelo, os blocos formam um único condutor e a integral é dividida
+        pela área total, como em `current_density()`. A tensão considera
+        apenas a parcela induzida, jωλ, já que a resistência dos enrolamentos
+        não é conhecida.
+        """
+        self.assert_planar()
+
+        area = self.areas()
+        circuits = np.array([label.circuit for label in self.labels])
+        turns = np.array([label.turns for label in self.labels])
+
+        # Área de cada bloco e integral do potencial sobre cada bloco.
+        label_area = np.bincount(
+            self.element_labels, weights=area, minlength=len(self.labels)
+        )
+        potential = self.potential[self.elements].mean(axis=1) * area
+        label_potential = bincount(
+            self.element_labels, potential, len(self.labels)
+        )
+
+        in_circuit = (circuits >= 0) & (label_area > 0)
+        circuit_area = np.bincount(
+            circuits[in_circuit],
+            weights=label_area[in_circuit],
+            minlength=len(self.circuits),
+        )
+
+        # O último item representa os blocos sem circuito.
+        series = np.array(
+            [circuit.type == 1 for circuit in self.circuits] + [True]
+        )
+        area = np.where(
+            series[circuits], label_area, np.append(circuit_area, 1)[circuits]
+        )
+        weight = np.where(series[circuits], turns, 1)
+        linkage = bincount(
+            circuits[in_circuit],
+            weight[in_circuit]
+            * label_potential[in_circuit]
+            / area[in_circuit],
+            len(self.circuits),
+        )
+        linkage *= self.depth_in_meters()
+        omega = 2 * math.pi * self.freq
+
+        props: dict[str, CircuitProps] = {}
+        for circuit, flux_linkage in zip(
+            self.circuits, linkage.tolist(), strict=True
+        ):
+            current = circuit.current
+            if self.freq == 0:
+                props[circuit.name] = CircuitProps(
+                    current.real, 0.0, flux_linkage.real
+                )
+            else:
+                props[circuit.name] = CircuitProps(
+                    current, 1j * omega * flux_linkage, flux_linkage
+                )
+
+        return props
+
+    def circuit_props_extended(
+        self, area: float, turns: Mapping[str, int] | None = None
+    ) -> dict[str, CircuitPropsExtended]:
+        """
+        Equivalente a `CircuitProps.with_extension()` para todos os circuitos.
+
+        - `area`: Área da secção transversal do núcleo em m²;
+        - `turns`: Número de voltas de cada circuito. Por padrão, é o maior
+        número de voltas, em módulo, entre os blocos do circuito.
+        """
+        props = self.circuit_props()
+        extended: dict[str, CircuitPropsExtended] = {}
+
+        for i, circuit in enumerate(self.circuits):
+            if turns is not None and circuit.name in turns:
+                circuit_turns = turns[circuit.name]
+            else:
+                circuit_turns = max(
+                    (
+                        abs(label.turns)
+                        for label in self.labels
+                        if label.circuit == i
+                    ),
+                    default=1,
+                )
+
+            extended[circuit.name] = props[circuit.name].with_extension(
+                circuit_turns, area
+            )
+
+        return extended
+
+    def assert_planar(self) -> None:
+        if self.type != 'planar':
+            raise NotImplementedError(
+                f'Missing implementation for {self.type} problems.'
+            )
+
+
+def parse_label(line: str) -> SolutionLabel:
+    values = line.split()
+
+    return SolutionLabel(
+        x=float(values[0]),
+        y=float(values[1]),
+        material=int(values[2]) - 1,
+        circuit=int(values[4]) - 1,
+        magnetization_direction=float(values[5]),
+        group=int(values[6]),
+        turns=int(values[7]),
+    )
+
+
+def bincount(
+    indices: NDArray[np.int64],
+    weights: NDArray[np.float64] | NDArray[np.complex128],
+    length: int,
+) -> NDArray[np.complex128]:
+    """Versão de `np.bincount()` que aceita pesos complexos."""
+    real = np.bincount(indices, weights=np.real(weights), minlength=length)
+    imag = np.bincount(indices, weights=np.imag(weights), minlength=length)
+
+    return real + 1j * imag
+
+
+def read_all(folder: PathLike, pattern: str = '*.ans') -> Iterator[Solution]:
+    """Lê, em ordem alfabética, todas as soluções de uma pasta de varredura."""
+    for file in sorted(parse_path(folder).glob(pattern)):
+        yield Solution.read(file)
+
+
+def sweep_circuit_props(
+    folder: PathLike,
+    area: float,
+    turns: Mapping[str, int] | None = None,
+    pattern: str = '*.ans',
+) -> dict[str, list[CircuitPropsExtended]]:
+    """
+    Refaz o pós-processamento dos circuitos de todas as soluções arquivadas
+    em `folder`, sem o FEMM. Retorna as propriedades de cada circuito na
+    ordem dos arquivos.
+    """
+    results: dict[str, list[CircuitPropsExtended]] = {}
+
+    for solution in read_all(folder, pattern):
+        props = solution.circuit_props_extended(area, turns)
+        for name, circuit_props in props.items():
+            results.setdefault(name, []).append(circuit_props)
+
+    return results
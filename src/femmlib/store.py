@@ -0,0 +1,208 @@
+import io
+import json
+import os
+from collections.abc import Iterator, Mapping, Sequence
+from dataclasses import fields
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Self
+
+import numpy as np
+from numpy.typing import NDArray
+
+from femmlib.circuit import CircuitPropsExtended, CircuitPropsExtendedBatch
+from helpers.path import PathLike, parse_path
+
+PROPS_COLUMNS = [field.name for field in fields(CircuitPropsExtended)]
+SCHEMA_FILE = 'schema.json'
+
+
+def replace_file(file: Path, data: bytes) -> None:
+    """
+    Escreve `data` em um arquivo temporário e o renomeia para `file`, de
+    forma que o arquivo nunca fica escrito pela metade.
+    """
+    temporary = file.with_name(f'{file.name}.tmp')
+    with temporary.open('wb') as handle:
+        handle.write(data)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(temporary, file)
+
+
+def save_chunk(file: Path, rows: NDArray[np.void]) -> None:
+    data = io.BytesIO()
+    np.save(data, rows)
+    replace_file(file, data.getvalue())
+
+
+class ResultStore:
+    """
+    Armazena os resultados de uma varredura em colunas, no disco.
+
+    Cada ponto é uma linha com os parâmetros da varredura seguidos dos campos
+    de `CircuitPropsExtended`. As linhas são acumuladas em um bloco de
+    tamanho fixo e salvas como um arquivo `.npy` quando o bloco enche, de
+    forma que a memória usada não cresce com a varredura. Os blocos salvos
+    são lidos com mapeamento de memória, um de cada vez.
+
+    As propriedades são reais até o primeiro ponto complexo, de um problema
+    harmônico. A partir dele, as colunas das propriedades passam a ser
+    complexas, inclusive nos blocos já salvos.
+    """
+
+    def __init__(
+        self,
+        folder: PathLike,
+        params: Sequence[str] = (),
+        chunk_size: int = 65536,
+    ) -> None:
+        """
+        - `folder`: Pasta da varredura. Se já existir, os novos pontos são
+        adicionados aos anteriores e os parâmetros são lidos do esquema. Se
+        `params` for definido, precisa ser igual aos do esquema;
+        - `params`: Nomes dos parâmetros da varredura;
+        - `chunk_size`: Quantidade de linhas de cada arquivo.
+        """
+        self.folder = parse_path(folder)
+        self.folder.mkdir(parents=True, exist_ok=True)
+        self.chunk_size = chunk_size
+        self.complex = False
+
+        schema = self.folder / SCHEMA_FILE
+        if schema.exists():
+            saved = json.loads(schema.read_text())
+            if params and list(params) != saved['params']:
+                raise ValueError(
+                    f'The store at {self.folder} has the parameters '
+                    f'{saved["params"]}, not {list(params)}.'
+                )
+            params = saved['params']
+            self.complex = saved.get('complex', False)
+        else:
+            self.params = list(params)
+            self.save_schema()
+
+        assert not set(params) & set(PROPS_COLUMNS), (
+            'Parameter names must differ from CircuitPropsExtended fields.'
+        )
+
+        self.params = list(params)
+        self.dtype = self.row_dtype()
+        self.buffer = np.empty(chunk_size, dtype=self.dtype)
+        self.buffered = 0
+        self.chunk_count = len(self.chunk_files())
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.flush()
+
+    def columns(self) -> list[str]:
+        return [*self.params, *PROPS_COLUMNS]
+
+    def props_type(self) -> type[np.float64] | type[np.complex128]:
+        return np.complex128 if self.complex else np.float64
+
+    def row_dtype(self) -> np.dtype[np.void]:
+        return np.dtype(
+            [(name, np.float64) for name in self.params]
+            + [(name, self.props_type()) for name in PROPS_COLUMNS]
+        )
+
+    def save_schema(self) -> None:
+        schema = {'params': self.params, 'complex': self.complex}
+        replace_file(self.folder / SCHEMA_FILE, json.dumps(schema).encode())
+
+    def chunk_files(self) -> list[Path]:
+        return sorted(self.folder.glob('chunk_*.npy'))
+
+    def promote(self) -> None:
+        """Passa as colunas das propriedades, já salvas ou não, a complexas."""
+        self.complex = True
+        self.dtype = self.row_dtype()
+        for file in self.chunk_files():
+            save_chunk(file, np.load(file).astype(self.dtype))
+
+        buffer = np.empty(self.chunk_size, dtype=self.dtype)
+        buffer[: self.buffered] = self.buffer[: self.buffered]
+        self.buffer = buffer
+        self.save_schema()
+
+    def append(
+        self, params: Mapping[str, float], props: CircuitPropsExtended
+    ) -> None:
+        """Adiciona um ponto da varredura."""
+        values = tuple(props)
+        if not self.complex and any(isinstance(v, complex) for v in values):
+            self.promote()
+
+        row = self.buffer[self.buffered]
+        for name in self.params:
+            row[name] = params[name]
+        for name, value in zip(PROPS_COLUMNS, values, strict=True):
+            row[name] = value
+
+        self.buffered += 1
+        if self.buffered == self.chunk_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Salva as linhas acumuladas como um novo bloco. O bloco é escrito em
+        um arquivo temporário e renomeado, então uma interrupção nunca deixa
+        um bloco incompleto.
+        """
+        if self.buffered == 0:
+            return
+
+        file = self.folder / f'chunk_{self.chunk_count:06d}.npy'
+        save_chunk(file, self.buffer[: self.buffered])
+        self.chunk_count += 1
+        self.buffered = 0
+
+    def read(
+        self, names: Sequence[str] | None = None
+    ) -> Iterator[NDArray[np.void]]:
+        """
+        Lê as colunas `names`, ou todas, um bloco de cada vez: cada bloco
+        salvo, mapeado em memória, seguido das linhas que ainda não foram
+        salvas. Nenhuma cópia dos dados é feita.
+        """
+        selected = list(names) if names is not None else None
+        for file in self.chunk_files():
+            chunk: NDArray[np.void] = np.load(file, mmap_mode='r')
+            yield chunk[selected] if selected is not None else chunk
+
+        if self.buffered > 0:
+            rows = self.buffer[: self.buffered]
+            yield rows[selected] if selected is not None else rows
+
+    def column(self, name: str) -> Iterator[NDArray[Any]]:
+        """Lê uma única coluna, um bloco de cada vez."""
+        for chunk in self.read([name]):
+            yield chunk[name]
+
+    def load(self, names: Sequence[str] | None = None) -> NDArray[np.void]:
+        """
+        Carrega as colunas `names`, ou todas, de todos os blocos em um único
+        vetor na memória. Use apenas com as colunas necessárias.
+        """
+        names = list(names) if names is not None else self.columns()
+        dtype = np.dtype([(name, self.dtype[name]) for name in names])
+        chunks = [chunk.astype(dtype) for chunk in self.read(names)]
+
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+
+    def props_batch(self) -> CircuitPropsExtendedBatch:
+        """Lê as propriedades de todos os pontos como um único lote."""
+        return CircuitPropsExtendedBatch(self.load(PROPS_COLUMNS))
+
+    def __len__(self) -> int:
+        return sum(len(chunk) for chunk in self.read())
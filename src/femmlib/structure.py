@@ -1,9 +1,12 @@
+from collections.abc import Callable
 from dataclasses import dataclass
 from typing import Literal, Self
 
 import femm
 
-from mathlib.vector2 import Vector2, Vector2Like
+from femmlib import lua
+from femmlib.types import Group
+from mathlib.vector2 import Vector2, Vector2Array, Vector2Like
 
 type ConnectMethod = Literal[
     'open loop',
@@ -19,33 +22,30 @@ class Structure:
     Assume que as coordenadas providas estão na ordem em que os nós
     serão ligados.
 
-    - `nodes`: Lista de coordenadas dos nós que compôem a estrutura;
+    - `nodes`: Lista de coordenadas dos nós que compôem a estrutura. Pode
+      ser um `Vector2Array` em modelos grandes;
     - `material`: Material que representa a estrutura.
     - `connect_method`: Método de conectar os nós. Valores: "open loop",
       "closed loop", "circle". Valor padrão: "open loop".
+    - `group`: Grupo dos nós e segmentos. Valor padrão: 0.
     """
 
-    nodes: list[Vector2]
+    nodes: list[Vector2] | Vector2Array
     # material: Block
     connect_method: ConnectMethod
+    group: Group = 0
 
     def select(self) -> None:
         first = self.nodes[0]
         last = self.nodes[-1]
 
         match self.connect_method:
-            case 'open loop':
-                for node, next_node in zip(
-                    self.nodes, self.nodes[1:], strict=False
-                ):
-                    femm.mi_selectsegment(*Vector2.midpoint(node, next_node))
-            case 'closed loop':
-                for node, next_node in zip(
-                    self.nodes, self.nodes[1:], strict=False
-                ):
-                    femm.mi_selectsegment(*Vector2.midpoint(node, next_node))
-
-                femm.mi_selectsegment(*Vector2.midpoint(first, last))
+            case 'open loop' | 'closed loop':
+                midpoints = Vector2Array.parse(self.nodes).midpoints(
+                    self.connect_method == 'closed loop'
+                )
+                for x, y in midpoints.data.tolist():
+                    femm.mi_selectsegment(x, y)
             case 'circle':
                 # radius = Vector2.distance(first, last) / 2
                 # center = Vector2.midpoint(first, last)
@@ -68,6 +68,150 @@ class Structure:
                 femm.mi_selectarcsegment(*first_arc)
                 femm.mi_selectarcsegment(*second_arc)
 
+    def selection(self) -> list[str]:
+        """Comandos Lua que selecionam os nós e segmentos da estrutura."""
+
+        def point(vec: Vector2Like) -> str:
+            x, y = vec
+            return f'{lua.number(x)}, {lua.number(y)}'
+
+        nodes = Vector2Array.parse(self.nodes)
+        lines = [
+            f'mi_selectnode({point(node)})' for node in nodes.data.tolist()
+        ]
+
+        match self.connect_method:
+            case 'open loop' | 'closed loop':
+                midpoints = nodes.midpoints(
+                    self.connect_method == 'closed loop'
+                )
+                return [
+                    *lines,
+                    *(
+                        f'mi_selectsegment({point(midpoint)})'
+                        for midpoint in midpoints.data.tolist()
+                    ),
+                ]
+            case 'circle':
+                center = Vector2.midpoint(nodes[0], nodes[1])
+                arm = (nodes[0] - center).perpendicular()
+                return [
+                    *lines,
+                    f'mi_selectarcsegment({point(arm + center)})',
+                    f'mi_selectarcsegment({point(-arm + center)})',
+                ]
+
+    def set_group(self, group: Group) -> None:
+        """Move os nós e segmentos da estrutura para o grupo `group`."""
+        lines = [
+            'mi_clearselected()',
+            *self.selection(),
+            f'mi_setgroup({group})',
+            'mi_clearselected()',
+        ]
+        lua.run('\n'.join(lines) + '\n', 'group')
+
+        self.group = group
+
+    def replicate(
+        self,
+        copies: list[Vector2Array],
+        command: str,
+        new_group: Callable[[], Group],
+    ) -> list[Self]:
+        """
+        Executa o comando Lua de cópia `command` sobre o grupo da estrutura
+        e move cada cópia, de nós `copies`, para um grupo novo.
+        """
+        assert self.group != 0, 'The structure must be in its own group.'
+
+        structures = [
+            self.__class__(nodes, self.connect_method, new_group())
+            for nodes in copies
+        ]
+        groups = {self.group, *(structure.group for structure in structures)}
+        assert len(groups) == len(structures) + 1, (
+            'new_group must return a new group for every copy.'
+        )
+
+        lines = [
+            'mi_clearselected()',
+            f'mi_selectgroup({self.group})',
+            command,
+            'mi_clearselected()',
+        ]
+        # As cópias herdam o grupo original e são separadas em seguida.
+        for structure in structures:
+            lines.extend(
+                [
+                    *structure.selection(),
+                    f'mi_setgroup({structure.group})',
+                    'mi_clearselected()',
+                ]
+            )
+
+        lua.run('\n'.join(lines) + '\n', 'replicate')
+
+        return [self, *structures]
+
+    def replicate_polar(
+        self,
+        n: int,
+        new_group: Callable[[], Group],
+        center: Vector2Like = (0, 0),
+        angle: float | None = None,
+    ) -> list[Self]:
+        """
+        Replica a estrutura em torno de `center` com `mi_copyrotate2()`, como
+        as ranhuras de um estator. A estrutura precisa estar sozinha em um
+        grupo, definido por `StructureBuilder.with_group()`.
+
+        - `n`: Quantidade total de instâncias, incluindo a original;
+        - `new_group`: Gera o grupo de cada cópia. Use `FEMM.new_group()`
+        para que os grupos não coincidam com os de outras estruturas;
+        - `angle`: Ângulo entre instâncias, em graus. Por padrão, `360 / n`.
+
+        Retorna a estrutura original seguida das cópias.
+        """
+        center = Vector2.parse(center)
+        angle = 360 / n if angle is None else angle
+        nodes = Vector2Array.parse(self.nodes)
+        copies = [nodes.rotate(k * angle, center) for k in range(1, n)]
+        command = (
+            f'mi_copyrotate2({lua.number(center.x)}, {lua.number(center.y)}, '
+            f'{lua.number(angle)}, {n - 1}, 4)'
+        )
+
+        return self.replicate(copies, command, new_group)
+
+    def replicate_linear(
+        self,
+        n: int,
+        offset: Vector2Like,
+        new_group: Callable[[], Group],
+    ) -> list[Self]:
+        """
+        Replica a estrutura em intervalos de `offset` com
+        `mi_copytranslate2()`, como as camadas de um enrolamento. A
+        estrutura precisa estar sozinha em um grupo, definido por
+        `StructureBuilder.with_group()`.
+
+        - `n`: Quantidade total de instâncias, incluindo a original;
+        - `new_group`: Gera o grupo de cada cópia. Use `FEMM.new_group()`
+        para que os grupos não coincidam com os de outras estruturas.
+
+        Retorna a estrutura original seguida das cópias.
+        """
+        offset = Vector2.parse(offset)
+        nodes = Vector2Array.parse(self.nodes)
+        copies = [nodes + offset * k for k in range(1, n)]
+        command = (
+            f'mi_copytranslate2({lua.number(offset.x)}, '
+            f'{lua.number(offset.y)}, {n - 1}, 4)'
+        )
+
+        return self.replicate(copies, command, new_group)
+
     # def update_turns(self, turns: int) -> None:
     #     self.material.turns = turns
     #     self.material.update_props()
@@ -94,19 +238,63 @@ class Structure:
 class StructureBuilder:
     def __init__(
         self,
-        nodes: list[Vector2Like],
+        nodes: list[Vector2Like] | Vector2Array,
         # material: Block,
     ) -> None:
-        self.nodes = [Vector2.parse(node) for node in nodes]
+        """
+        - `nodes`: Nós da estrutura. Os `Vector2` são copiados. Um
+        `Vector2Array` é mantido sem criar um `Vector2` por nó e é desenhado
+        por um único programa Lua.
+        """
+        self.nodes: list[Vector2] | Vector2Array = (
+            nodes
+            if isinstance(nodes, Vector2Array)
+            else [Vector2.parse(node, copy=True) for node in nodes]
+        )
         # self.material = material
         self.connect_method: ConnectMethod = 'open loop'
+        self.group: Group = 0
 
     def with_connect_method(self, connect_method: ConnectMethod) -> Self:
         self.connect_method = connect_method
         return self
 
+    def with_group(self, group: Group) -> Self:
+        """
+        Grupo dos nós e segmentos, necessário para replicar a estrutura.
+        Valor padrão: 0.
+        """
+        self.group = group
+        return self
+
+    def lua(self) -> str:
+        """Programa Lua que posiciona e liga nós em laço ou em linha."""
+        nodes = Vector2Array.parse(self.nodes)
+        n = len(nodes)
+        lines = [
+            f'x = {lua.table(nodes.x.tolist())}',
+            f'y = {lua.table(nodes.y.tolist())}',
+            f'for i = 1, {n} do',
+            'mi_addnode(x[i], y[i])',
+            'end',
+            f'for i = 1, {n - 1} do',
+            'mi_addsegment(x[i], y[i], x[i + 1], y[i + 1])',
+            'end',
+        ]
+        if self.connect_method == 'closed loop':
+            lines.append(f'mi_addsegment(x[{n}], y[{n}], x[1], y[1])')
+
+        return '\n'.join(lines) + '\n'
+
     def build(self) -> Structure:
         """Posiciona e liga os nós da estrutura."""
+        if (
+            isinstance(self.nodes, Vector2Array)
+            and self.connect_method != 'circle'
+        ):
+            lua.run(self.lua(), 'structure')
+            return self.finish()
+
         for node in self.nodes:
             femm.mi_addnode(*node)
 
@@ -136,8 +324,15 @@ class StructureBuilder:
                     *self.nodes[1], *self.nodes[0], angle=180, maxseg=1
                 )
 
-        return Structure(
+        return self.finish()
+
+    def finish(self) -> Structure:
+        structure = Structure(
             self.nodes,
             # self.material,
             self.connect_method,
         )
+        if self.group != 0:
+            structure.set_group(self.group)
+
+        return structure
@@ -0,0 +1,404 @@
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection, wait
+from multiprocessing.context import SpawnContext
+from multiprocessing.process import BaseProcess
+from types import TracebackType
+from typing import Any, Literal, Self
+
+import psutil
+
+from femmlib.jobs import JobQueue
+
+type Target = Callable[[dict[str, Any]], Any]
+type FailureReason = Literal['wall timeout', 'cpu timeout', 'crash', 'error']
+
+# Intervalo, em s, entre atualizações do tempo de CPU pelo trabalhador.
+HEARTBEAT_INTERVAL = 0.05
+
+# Posições do vetor compartilhado com cada trabalhador.
+CPU_START = 0
+CPU_NOW = 1
+
+
+def tree_cpu_time(process: psutil.Process) -> float:
+    """
+    Tempo de CPU, em s, de `process` e de todos os seus descendentes, como o
+    `femm.exe` aberto pelo `pyfemm`, inclusive dos que já terminaram.
+    """
+    total = 0.0
+    for member in [process, *process.children(recursive=True)]:
+        try:
+            times = member.cpu_times()
+        except psutil.Error:
+            # O processo terminou durante a leitura.
+            continue
+        total += times.user + times.system
+        total += times.children_user + times.children_system
+
+    return total
+
+
+def kill_tree(process: BaseProcess) -> None:
+    """Encerra o processo e todos os seus descendentes e espera o processo."""
+    try:
+        children = psutil.Process(process.pid).children(recursive=True)
+    except psutil.Error:
+        children = []
+
+    process.kill()
+    for child in children:
+        try:
+            child.kill()
+        except psutil.Error:
+            continue
+    psutil.wait_procs(children, timeout=1)
+    process.join()
+
+
+@dataclass
+class Diagnostics:
+    """
+    Informações sobre um trabalho que falhou.
+
+    - `reason`: "wall timeout" ou "cpu timeout" se o trabalhador foi
+    encerrado pelo supervisor, "crash" se o processo terminou sozinho e
+    "error" se `target` lançou uma exceção;
+    - `wall_time` e `cpu_time`: Tempos gastos no trabalho, em s;
+    - `exitcode`: Código de saída do processo encerrado, se houver;
+    - `message`: Descrição ou traceback do erro.
+    """
+
+    reason: FailureReason
+    wall_time: float
+    cpu_time: float
+    pid: int | None
+    exitcode: int | None
+    message: str
+
+    def __str__(self) -> str:
+        return (
+            f'{self.reason} after {self.wall_time:.3f} s '
+            f'(cpu {self.cpu_time:.3f} s, pid {self.pid}, '
+            f'exitcode {self.exitcode}): {self.message}'
+        )
+
+
+@dataclass
+class Outcome:
+    """Resultado de um trabalho. `diagnostics` existe apenas em falhas."""
+
+    id: int
+    params: dict[str, Any]
+    result: Any = None
+    diagnostics: Diagnostics | None = None
+
+    def ok(self) -> bool:
+        return self.diagnostics is None
+
+
+def work(
+    index: int,
+    target: Target,
+    tasks: 'multiprocessing.Queue[tuple[int, dict[str, Any]] | None]',
+    results: Connection,
+    cpu: Any,
+) -> None:
+    """
+    Laço de cada processo trabalhador. Uma thread mantém o tempo de CPU do
+    processo e dos seus descendentes atualizado em `cpu` enquanto `target`
+    executa, mesmo que o FEMM não responda.
+
+    O início da medição é reiniciado pelo próprio trabalhador, antes e
+    depois de cada trabalho, sob a trava de `cpu`, de forma que o supervisor
+    nunca lê o início de um trabalho com o tempo atual de outro.
+    """
+    process = psutil.Process()
+
+    def reset() -> None:
+        with cpu.get_lock():
+            cpu[CPU_START] = cpu[CPU_NOW] = tree_cpu_time(process)
+
+    def beat() -> None:
+        while True:
+            now = tree_cpu_time(process)
+            with cpu.get_lock():
+                cpu[CPU_NOW] = now
+            time.sleep(HEARTBEAT_INTERVAL)
+
+    reset()
+    threading.Thread(target=beat, daemon=True).start()
+
+    while (task := tasks.get()) is not None:
+        task_id, params = task
+        reset()
+
+        try:
+            message = (index, task_id, True, target(params))
+        except Exception:
+            message = (index, task_id, False, traceback.format_exc())
+
+        # Antes do envio, para que o próximo trabalho não herde o tempo deste.
+        reset()
+        results.send(message)
+
+
+@dataclass
+class Worker:
+    process: BaseProcess
+    tasks: 'multiprocessing.Queue[tuple[int, dict[str, Any]] | None]'
+    results: Connection
+    cpu: Any
+    task: tuple[int, dict[str, Any]] | None = None
+    started: float = 0
+
+    def busy(self) -> bool:
+        return self.task is not None
+
+    def cpu_time(self) -> float:
+        """Tempo de CPU gasto no trabalho atual, em s."""
+        with self.cpu.get_lock():
+            return self.cpu[CPU_NOW] - self.cpu[CPU_START]
+
+
+@dataclass
+class Supervisor:
+    """
+    Mantém um conjunto de processos que executam `target` e encerra os que
+    passam do tempo limite, como um `mi_analyze()` que não converge.
+
+    O trabalho do processo encerrado é registrado como falho, com
+    diagnósticos, e um novo processo toma o seu lugar, de forma que o
+    conjunto continua completo. `target` deve poder ser serializado pelo
+    `pickle`, como uma função definida no nível de um módulo.
+
+    - `workers`: Quantidade de processos;
+    - `wall_timeout`: Tempo máximo, em s, de cada trabalho;
+    - `cpu_timeout`: Tempo máximo de CPU, em s, do processo trabalhador e
+    dos seus descendentes em cada trabalho;
+    - `poll_interval`: Intervalo, em s, entre verificações dos processos;
+    - `context`: Contexto "spawn" do `multiprocessing`, o único disponível
+    no Windows.
+    """
+
+    target: Target
+    workers: int = field(default_factory=lambda: os.cpu_count() or 1)
+    wall_timeout: float | None = None
+    cpu_timeout: float | None = None
+    poll_interval: float = 0.05
+    context: SpawnContext = field(
+        default_factory=lambda: multiprocessing.get_context('spawn')
+    )
+    pool: list[Worker] = field(default_factory=list[Worker], init=False)
+
+    def __post_init__(self) -> None:
+        self.pool = [self.spawn(i) for i in range(self.workers)]
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def spawn(self, index: int) -> Worker:
+        # Cada processo tem a sua própria conexão de resultados, que não é
+        # afetada quando outro processo é encerrado no meio de um envio.
+        receiver, sender = self.context.Pipe(duplex=False)
+        tasks = self.context.Queue()
+        cpu = self.context.Array('d', 2)
+        process = self.context.Process(
+            target=work,
+            args=(index, self.target, tasks, sender, cpu),
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+
+        return Worker(process, tasks, receiver, cpu)
+
+    def idle(self) -> list[int]:
+        return [i for i, worker in enumerate(self.pool) if not worker.busy()]
+
+    def busy(self) -> int:
+        return len(self.pool) - len(self.idle())
+
+    def submit(self, index: int, task_id: int, params: dict[str, Any]) -> None:
+        """Envia um trabalho ao processo `index`, que deve estar livre."""
+        worker = self.pool[index]
+        assert not worker.busy(), f'Worker {index} is busy.'
+
+        worker.task = (task_id, params)
+        worker.started = time.monotonic()
+        worker.tasks.put(worker.task)
+
+    def poll(self) -> list[Outcome]:
+        """
+        Espera até `poll_interval` por resultados, encerra os processos que
+        passaram do tempo limite e retorna os trabalhos finalizados.
+        """
+        outcomes: list[Outcome] = []
+
+        connections = [worker.results for worker in self.pool]
+        for connection in wait(connections, timeout=self.poll_interval):
+            assert isinstance(connection, Connection)
+            try:
+                message = connection.recv()
+            except EOFError:
+                # O processo terminou; tratado abaixo como falha.
+                continue
+
+            outcome = self.receive(*message)
+            if outcome is not None:
+                outcomes.append(outcome)
+
+        for index, worker in enumerate(self.pool):
+            if worker.task is None:
+                if not worker.process.is_alive():
+                    self.pool[index] = self.spawn(index)
+                continue
+
+            wall_time = time.monotonic() - worker.started
+            cpu_time = worker.cpu_time()
+            reason: FailureReason | None = None
+
+            if not worker.process.is_alive():
+                reason = 'crash'
+            elif self.wall_timeout and wall_time > self.wall_timeout:
+                reason = 'wall timeout'
+            elif self.cpu_timeout and cpu_time > self.cpu_timeout:
+                reason = 'cpu timeout'
+
+            if reason is None:
+                continue
+
+            kill_tree(worker.process)
+            worker.results.close()
+            task_id, params = worker.task
+            diagnostics = Diagnostics(
+                reason,
+                wall_time,
+                max(cpu_time, 0),
+                worker.process.pid,
+                worker.process.exitcode,
+                'Worker was killed by the supervisor.'
+                if reason != 'crash'
+                else 'Worker exited while solving.',
+            )
+            outcomes.append(Outcome(task_id, params, None, diagnostics))
+            self.pool[index] = self.spawn(index)
+
+        return outcomes
+
+    def receive(
+        self, index: int, task_id: int, ok: bool, payload: Any
+    ) -> Outcome | None:
+        worker = self.pool[index]
+        # Resultado de um processo que já foi substituído.
+        if worker.task is None or worker.task[0] != task_id:
+            return None
+
+        params = worker.task[1]
+        wall_time = time.monotonic() - worker.started
+        worker.task = None
+
+        if ok:
+            return Outcome(task_id, params, payload)
+
+        return Outcome(
+            task_id,
+            params,
+            None,
+            Diagnostics(
+                'error',
+                wall_time,
+                worker.cpu_time(),
+                worker.process.pid,
+                None,
+                payload,
+            ),
+        )
+
+    def map(self, tasks: Iterable[Mapping[str, Any]]) -> Iterator[Outcome]:
+        """
+        Executa todos os trabalhos e retorna os resultados na ordem em que
+        terminam. `Outcome.id` é a posição do trabalho em `tasks`.
+        """
+        pending = deque(enumerate(tasks))
+
+        while pending or self.busy() > 0:
+            for index in self.idle():
+                if not pending:
+                    break
+                task_id, params = pending.popleft()
+                self.submit(index, task_id, dict(params))
+
+            yield from self.poll()
+
+    def drain(self, jobs: JobQueue, worker: str | None = None) -> int:
+        """
+        Executa os trabalhos de uma `JobQueue` até que não haja mais nenhum
+        pendente. `target` deve retornar onde está o resultado. Falhas são
+        registradas com os diagnósticos e seguem a política de novas
+        tentativas da fila: os trabalhos em espera exponencial são
+        aguardados. Retorna quantos trabalhos foram concluídos.
+
+        - `worker`: Prefixo dos nomes dos processos na fila. Por padrão,
+        `JobQueue.worker`, único para cada fila.
+        """
+        worker = worker if worker is not None else jobs.worker
+        completed = 0
+        # Nome com que cada trabalho em execução foi reservado.
+        claimed: dict[int, str] = {}
+
+        while True:
+            for index in self.idle():
+                name = f'{worker}:{index}'
+                job = jobs.claim(name)
+                if job is None:
+                    break
+                claimed[job.id] = name
+                self.submit(index, job.id, job.params)
+
+            if self.busy() == 0:
+                available_at = jobs.next_available()
+                if available_at is None:
+                    return completed
+
+                # Nenhum trabalho disponível agora: espera o fim da espera
+                # exponencial do próximo.
+                time.sleep(max(available_at - jobs.clock(), 0))
+                continue
+
+            for outcome in self.poll():
+                name = claimed.pop(outcome.id)
+                if outcome.diagnostics is None:
+                    if jobs.complete(outcome.id, str(outcome.result), name):
+                        completed += 1
+                else:
+                    jobs.fail(outcome.id, str(outcome.diagnostics), name)
+
+    def close(self) -> None:
+        """Encerra todos os processos."""
+        for worker in self.pool:
+            if worker.busy():
+                kill_tree(worker.process)
+            else:
+                worker.tasks.put(None)
+
+        for worker in self.pool:
+            worker.process.join(timeout=1)
+            if worker.process.is_alive():
+                kill_tree(worker.process)
+
+        self.pool = []
@@ -0,0 +1,255 @@
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any, Literal, Self
+
+import numpy as np
+from numpy.typing import NDArray
+
+from femmlib.circuit import CircuitPropsExtended
+from femmlib.store import PROPS_COLUMNS, ResultStore
+
+type Kernel = Literal['thin plate', 'cubic', 'multiquadric', 'gaussian']
+type Solver = Callable[[dict[str, float]], CircuitPropsExtended]
+
+
+def kernel_matrix(
+    r: NDArray[np.float64], kernel: Kernel, epsilon: float
+) -> NDArray[np.float64]:
+    match kernel:
+        case 'thin plate':
+            # r² log(r) tende a zero na origem.
+            return r**2 * np.log(np.maximum(r, np.finfo(np.float64).tiny))
+        case 'cubic':
+            return r**3
+        case 'multiquadric':
+            return -np.sqrt(1 + (epsilon * r) ** 2)
+        case 'gaussian':
+            return np.exp(-((epsilon * r) ** 2))
+
+
+def distances(
+    a: NDArray[np.float64], b: NDArray[np.float64]
+) -> NDArray[np.float64]:
+    return np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2))
+
+
+@dataclass
+class SurrogateResult:
+    """
+    - `props`: Propriedades interpoladas;
+    - `error`: Erro estimado de cada campo de `CircuitPropsExtended`;
+    - `trusted`: Se o ponto está na região em que o modelo é confiável.
+    """
+
+    props: CircuitPropsExtended
+    error: dict[str, float]
+    trusted: bool
+
+
+@dataclass
+class RBFSurrogate:
+    """
+    Superfície de resposta por funções de base radial ajustada sobre os
+    pontos de uma varredura, com um termo linear.
+
+    As coordenadas são normalizadas pelos limites dos dados. O erro de cada
+    ponto é estimado pela validação cruzada deixando um de fora, calculada
+    de uma só vez pela fórmula de Rippa, e o erro de uma consulta é o do
+    ponto de treino mais próximo.
+
+    Em problemas harmônicos, os valores são complexos. Como o sistema é
+    real, as partes real e imaginária são interpoladas de forma
+    independente e o erro é a magnitude do resíduo complexo.
+
+    Use `fit()` ou `from_store()` para construir.
+    """
+
+    params: list[str]
+    quantities: list[str]
+    kernel: Kernel
+    epsilon: float
+    lower: NDArray[np.float64]
+    scale: NDArray[np.float64]
+    centers: NDArray[np.float64]
+    weights: NDArray[np.inexact[Any]]
+    loo_errors: NDArray[np.float64]
+    trust_radius: float
+
+    @classmethod
+    def fit(
+        cls,
+        params: Sequence[str],
+        x: NDArray[np.float64],
+        y: NDArray[np.inexact[Any]],
+        *,
+        quantities: Sequence[str] = PROPS_COLUMNS,
+        kernel: Kernel = 'thin plate',
+        epsilon: float = 1,
+        smoothing: float = 0,
+        trust_factor: float = 2,
+    ) -> Self:
+        """
+        - `x`: Pontos da varredura, no formato (pontos, parâmetros);
+        - `y`: Valores de `quantities` em cada ponto, no formato (pontos,
+        grandezas). Podem ser complexos;
+        - `epsilon`: Forma dos kernels "multiquadric" e "gaussian", nas
+        coordenadas normalizadas;
+        - `smoothing`: Suavização, zero para interpolar os pontos;
+        - `trust_factor`: O raio confiável é este fator vezes a maior
+        distância entre um ponto e o seu vizinho mais próximo.
+        """
+        x = np.asarray(x, dtype=np.float64).reshape(len(x), len(params))
+        dtype = np.complex128 if np.iscomplexobj(y) else np.float64
+        y = np.asarray(y, dtype=dtype).reshape(len(x), len(quantities))
+        n, d = x.shape
+        assert n > d + 1, f'At least {d + 2} points are needed.'
+
+        lower = x.min(axis=0)
+        spread = x.max(axis=0) - lower
+        scale = np.where(spread > 0, spread, 1)
+        centers = (x - lower) / scale
+
+        r = distances(centers, centers)
+        polynomial = np.hstack((np.ones((n, 1)), centers))
+        system = np.zeros((n + d + 1, n + d + 1))
+        system[:n, :n] = kernel_matrix(
+            r, kernel, epsilon
+        ) + smoothing * np.eye(n)
+        system[:n, n:] = polynomial
+        system[n:, :n] = polynomial.T
+
+        inverse = np.linalg.pinv(system)
+        rhs = np.vstack((y, np.zeros((d + 1, y.shape[1]))))
+        weights = inverse @ rhs
+
+        # Fórmula de Rippa: o resíduo de deixar o ponto k de fora é o seu
+        # coeficiente dividido pelo elemento k da diagonal da inversa.
+        loo_errors = np.abs(weights[:n] / np.diag(inverse)[:n, None])
+
+        np.fill_diagonal(r, np.inf)
+        trust_radius = trust_factor * float(r.min(axis=1).max())
+
+        return cls(
+            list(params),
+            list(quantities),
+            kernel,
+            epsilon,
+            lower,
+            scale,
+            centers,
+            weights,
+            loo_errors,
+            trust_radius,
+        )
+
+    @classmethod
+    def from_store(
+        cls,
+        store: ResultStore,
+        params: Sequence[str] | None = None,
+        **kwargs: Any,
+    ) -> Self:
+        """Ajusta o modelo sobre todos os pontos de um `ResultStore`."""
+        params = list(params) if params is not None else store.params
+        quantities = list(kwargs.pop('quantities', PROPS_COLUMNS))
+        rows = store.load([*params, *quantities])
+        x = np.column_stack([rows[name].astype(np.float64) for name in params])
+        y = np.column_stack(
+            [rows[name].astype(store.props_type()) for name in quantities]
+        )
+
+        return cls.fit(params, x, y, quantities=quantities, **kwargs)
+
+    def normalize(self, points: NDArray[np.float64]) -> NDArray[np.float64]:
+        points = np.asarray(points, dtype=np.float64)
+        return (points.reshape(-1, len(self.params)) - self.lower) / self.scale
+
+    def predict(
+        self, points: NDArray[np.float64]
+    ) -> tuple[
+        NDArray[np.inexact[Any]], NDArray[np.float64], NDArray[np.bool_]
+    ]:
+        """
+        Avalia o modelo em vários pontos, no formato (pontos, parâmetros).
+        Retorna os valores e os erros estimados, no formato (pontos,
+        grandezas), e se cada ponto é confiável.
+        """
+        u = self.normalize(points)
+        n = len(self.centers)
+        r = distances(u, self.centers)
+        basis = kernel_matrix(r, self.kernel, self.epsilon)
+        values = (
+            basis @ self.weights[:n]
+            + self.weights[n]
+            + u @ self.weights[n + 1 :]
+        )
+
+        nearest = r.argmin(axis=1)
+        trusted = (
+            (r[np.arange(len(u)), nearest] <= self.trust_radius)
+            & (u >= 0).all(axis=1)
+            & (u <= 1).all(axis=1)
+        )
+
+        return values, self.loo_errors[nearest], trusted
+
+    def query(self, params: Mapping[str, float]) -> SurrogateResult:
+        """Avalia o modelo em um único ponto."""
+        point = np.array([[params[name] for name in self.params]])
+        values, errors, trusted = self.predict(point)
+        fields = dict(zip(self.quantities, values[0].tolist(), strict=True))
+
+        return SurrogateResult(
+            CircuitPropsExtended(
+                *(fields.get(name, np.nan) for name in PROPS_COLUMNS)
+            ),
+            dict(zip(self.quantities, errors[0].tolist(), strict=True)),
+            bool(trusted[0]),
+        )
+
+
+class Surrogate:
+    """
+    Responde consultas pelo `RBFSurrogate` quando o ponto está na região
+    confiável e o erro estimado é aceitável. Caso contrário, resolve o
+    modelo com `solve`, normalmente pelo `FEMM.solve()`, adiciona o ponto ao
+    `ResultStore` e ajusta o modelo de novo.
+    """
+
+    def __init__(
+        self,
+        store: ResultStore,
+        solve: Solver,
+        *,
+        max_error: Mapping[str, float] | None = None,
+        **kwargs: Any,
+    ) -> None:
+        """
+        - `max_error`: Erro máximo aceito de cada campo. Campos ausentes
+        não são verificados;
+        - `kwargs`: Opções de `RBFSurrogate.fit()`.
+        """
+        self.store = store
+        self.solve = solve
+        self.max_error = dict(max_error or {})
+        self.kwargs = kwargs
+        self.model = RBFSurrogate.from_store(store, **kwargs)
+        self.solves = 0
+
+    def __call__(self, params: Mapping[str, float]) -> SurrogateResult:
+        result = self.model.query(params)
+        acceptable = all(
+            result.error[name] <= limit
+            for name, limit in self.max_error.items()
+        )
+        if result.trusted and acceptable:
+            return result
+
+        props = self.solve(dict(params))
+        self.solves += 1
+        self.store.append(params, props)
+        self.model = RBFSurrogate.from_store(self.store, **self.kwargs)
+
+        return SurrogateResult(
+            props, dict.fromkeys(self.model.quantities, 0.0), True
+        )
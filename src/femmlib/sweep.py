@@ -0,0 +1,337 @@
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Self
+
+import numpy as np
+
+from femmlib import lua
+from femmlib.circuit import Circuit, CircuitProps, CircuitPropsBatch
+from femmlib.core import FEMM, FEMM_FOLDER
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterator, Sequence
+    from pathlib import Path
+
+    from femmlib.air_gap import AirGap
+
+# Intervalo entre leituras do arquivo de resultados enquanto o FEMM resolve.
+POLL_INTERVAL = 0.1
+
+
+@dataclass
+class SweepAxis:
+    """
+    Um parâmetro da varredura.
+
+    - `name`: Nome da coluna no arquivo de resultados;
+    - `values`: Valores que o parâmetro assume;
+    - `setter`: Corpo Lua que aplica o valor guardado na variável `value`;
+    - `setup`: Código Lua executado uma vez antes da varredura.
+    """
+
+    name: str
+    values: list[float]
+    setter: str
+    setup: str = ''
+
+
+@dataclass
+class SweepPoint:
+    """
+    Resultado de um ponto da varredura: os valores dos parâmetros e as
+    propriedades de cada circuito observado.
+    """
+
+    params: dict[str, float]
+    props: dict[str, CircuitProps]
+
+
+class LuaSweepBuilder:
+    def __init__(self, app: FEMM, file_name: str) -> None:
+        """
+        - `app`: Problema que define as variáveis passadas a `mi_probdef()`;
+        - `file_name`: Nome do arquivo `.FEM` aberto que será varrido.
+        """
+        self.app = app
+        self.file_name = file_name
+        self.axes: list[SweepAxis] = []
+        self.circuits: list[str] = []
+
+    def with_air_gap(self, air_gap: AirGap, lengths: Sequence[float]) -> Self:
+        """
+        Varre o tamanho do entreferro. Os nós são deslocados da mesma forma
+        que `AirGap.increment()`, mas dentro do FEMM.
+        """
+        if air_gap.direction == 'horizontal':
+            plus = (air_gap.upper_right, air_gap.lower_right)
+            minus = (air_gap.upper_left, air_gap.lower_left)
+            axis = ('shift', '0')
+        else:
+            plus = (air_gap.upper_right, air_gap.upper_left)
+            minus = (air_gap.lower_right, air_gap.lower_left)
+            axis = ('0', 'shift')
+
+        # Os nós já foram deslocados por `offset` nas iterações anteriores.
+        offset = ('offset', '0') if axis[1] == '0' else ('0', 'offset')
+        select_plus = '\n'.join(
+            f'mi_selectnode({lua.number(x)} + {offset[0]}, '
+            f'{lua.number(y)} + {offset[1]})'
+            for x, y in plus
+        )
+        select_minus = '\n'.join(
+            f'mi_selectnode({lua.number(x)} - {offset[0]}, '
+            f'{lua.number(y)} - {offset[1]})'
+            for x, y in minus
+        )
+        initial = lua.number(air_gap.length())
+
+        self.axes.append(
+            SweepAxis(
+                'air_gap',
+                list(lengths),
+                f"""\
+offset = (gap - {initial}) / 2
+shift = (value - gap) / 2
+{select_plus}
+mi_movetranslate({axis[0]}, {axis[1]})
+mi_clearselected()
+{select_minus}
+mi_movetranslate(-{axis[0]}, -{axis[1]})
+mi_clearselected()
+gap = value""",
+                setup=f'gap = {initial}',
+            )
+        )
+        return self
+
+    def with_current(
+        self, circuit: Circuit, currents: Sequence[float]
+    ) -> Self:
+        """Varre a corrente do circuito `circuit`."""
+        self.axes.append(
+            SweepAxis(
+                f'{circuit.name}_current',
+                list(currents),
+                f'mi_setcurrent({lua.string(circuit.name)}, value)',
+            )
+        )
+        return self
+
+    def with_freq(self, freqs: Sequence[float]) -> Self:
+        """Varre a frequência do problema."""
+        app = self.app
+        self.axes.append(
+            SweepAxis(
+                'freq',
+                list(freqs),
+                f'mi_probdef(value, {lua.string(app.unit)}, '
+                f'{lua.string(app.type)}, {lua.number(app.precision)}, '
+                f'{lua.number(app.depth)}, {lua.number(app.min_angle)}, '
+                f'{1 if app.arc_solver == "newton" else 0})',
+            )
+        )
+        return self
+
+    def with_output(self, *circuits: Circuit) -> Self:
+        """Circuitos cujas propriedades serão salvas em cada ponto."""
+        self.circuits.extend(circuit.name for circuit in circuits)
+        return self
+
+    def build(self) -> LuaSweep:
+        assert len(self.axes) > 0, 'The sweep needs at least one parameter.'
+        assert len(self.circuits) > 0, 'The sweep needs at least one output.'
+
+        return LuaSweep(self.file_name, self.axes, self.circuits)
+
+
+@dataclass
+class LuaSweep:
+    """
+    Varredura paramétrica compilada para um único programa Lua.
+
+    O programa percorre a grade formada pelo produto cartesiano dos
+    parâmetros dentro do FEMM, resolve cada ponto e adiciona o resultado de
+    `mo_getcircuitproperties()` de cada circuito a um arquivo CSV. O Python
+    apenas inicia o programa e lê os resultados conforme são escritos.
+    """
+
+    file_name: str
+    axes: list[SweepAxis]
+    circuits: list[str]
+
+    @staticmethod
+    def builder(app: FEMM, file_name: str) -> LuaSweepBuilder:
+        return LuaSweepBuilder(app, file_name)
+
+    def name(self) -> str:
+        return self.file_name.removesuffix('.FEM')
+
+    def columns(self) -> list[str]:
+        columns = [axis.name for axis in self.axes]
+        for circuit in self.circuits:
+            for prop in ('current', 'voltage', 'flux_linkage'):
+                columns.extend(
+                    (f'{circuit}_{prop}_re', f'{circuit}_{prop}_im')
+                )
+
+        return columns
+
+    def compile(self) -> str:
+        """Gera o programa Lua da varredura."""
+        results = FEMM_FOLDER / f'{self.name()}.csv'
+        lines = [
+            f'results = openfile({lua.path(results)}, "w")',
+            f'write(results, {lua.string(",".join(self.columns()) + "\n")})',
+        ]
+
+        for i, axis in enumerate(self.axes):
+            lines.append(f'values_{i} = {lua.table(axis.values)}')
+            if axis.setup:
+                lines.append(axis.setup)
+
+        for i, axis in enumerate(self.axes):
+            lines.append(f'function set_{i}(value)\n{axis.setter}\nend')
+
+        for i, axis in enumerate(self.axes):
+            lines.append(f'for i_{i} = 1, {len(axis.values)} do')
+            lines.append(f'set_{i}(values_{i}[i_{i}])')
+
+        lines.extend(['mi_analyze()', 'mi_loadsolution()'])
+
+        row = [f'values_{i}[i_{i}]' for i in range(len(self.axes))]
+        for circuit in self.circuits:
+            lines.append(
+                f'i, v, fl = mo_getcircuitproperties({lua.string(circuit)})'
+            )
+            row.extend(
+                f'{part}({prop})'
+                for prop in ('i', 'v', 'fl')
+                for part in ('re', 'im')
+            )
+
+        lines.extend(
+            [
+                'write(results, format("'
+                + ','.join(['%.17g'] * len(row))
+                + '\\n", '
+                + ', '.join(row)
+                + '))',
+                'flush(results)',
+                'mo_close()',
+            ]
+        )
+        lines.extend(['end'] * len(self.axes))
+        lines.append('closefile(results)')
+
+        return '\n'.join(lines) + '\n'
+
+    def run(
+        self, on_point: Callable[[SweepPoint], None] | None = None
+    ) -> list[SweepPoint]:
+        """
+        Executa a varredura no documento aberto e retorna todos os pontos.
+        Ao final, o documento fica com os valores do último ponto da grade.
+
+        O programa Lua é executado na thread que chama o método, já que o
+        FEMM é controlado por COM e não pode ser usado de outra thread. O
+        arquivo de resultados é lido por uma thread auxiliar, que chama
+        `on_point` para cada ponto conforme o FEMM os resolve.
+        """
+        results = FEMM_FOLDER / f'{self.name()}.csv'
+        results.unlink(missing_ok=True)
+        code = self.compile()
+
+        points: list[SweepPoint] = []
+        done = threading.Event()
+
+        def follow() -> None:
+            for row in self.tail(results, done):
+                point = self.parse_row(row)
+                points.append(point)
+                if on_point is not None:
+                    on_point(point)
+
+        reader = threading.Thread(target=follow)
+        reader.start()
+        try:
+            lua.run(code, self.name())
+        finally:
+            done.set()
+            reader.join()
+
+        return points
+
+    def tail(
+        self, results: Path, done: threading.Event
+    ) -> Iterator[list[str]]:
+        """
+        Linhas completas do arquivo de resultados conforme são escritas, até
+        `done` ser sinalizado e o arquivo terminar.
+        """
+        while not results.exists():
+            if done.is_set():
+                return
+            time.sleep(POLL_INTERVAL)
+
+        with results.open() as file:
+            pending = ''
+
+            while True:
+                # Lido antes da linha para não perder o final do arquivo.
+                finished = done.is_set()
+                chunk = file.readline()
+                if chunk:
+                    # O FEMM pode estar no meio da escrita de uma linha.
+                    pending += chunk
+                    if not pending.endswith('\n'):
+                        continue
+
+                    row = pending.strip().split(',')
+                    pending = ''
+                    if row != self.columns():
+                        yield row
+                elif not finished:
+                    time.sleep(POLL_INTERVAL)
+                else:
+                    break
+
+    def props_batch(self, circuit: str) -> CircuitPropsBatch:
+        """
+        Lê de uma só vez as propriedades de `circuit` em todos os pontos já
+        escritos no arquivo de resultados, sem criar um objeto por ponto.
+        """
+        results = FEMM_FOLDER / f'{self.name()}.csv'
+        values = np.loadtxt(results, delimiter=',', skiprows=1, ndmin=2)
+
+        start = len(self.axes) + 6 * self.circuits.index(circuit)
+        parts = values[:, start : start + 6]
+        columns = parts[:, 0::2] + 1j * parts[:, 1::2]
+        if not np.any(columns.imag != 0):
+            columns = columns.real
+
+        return CircuitPropsBatch.from_columns(*columns.T)
+
+    def parse_row(self, row: list[str]) -> SweepPoint:
+        values = [float(value) for value in row]
+        params = {
+            axis.name: value
+            for axis, value in zip(self.axes, values, strict=False)
+        }
+        parts = values[len(self.axes) :]
+
+        props: dict[str, CircuitProps] = {}
+        for i, circuit in enumerate(self.circuits):
+            current, voltage, flux_linkage = (
+                complex(re, im) if im != 0 else re
+                for re, im in zip(
+                    parts[6 * i : 6 * i + 6 : 2],
+                    parts[6 * i + 1 : 6 * i + 6 : 2],
+                    strict=True,
+                )
+            )
+            props[circuit] = CircuitProps(current, voltage, flux_linkage)
+
+        return SweepPoint(params, props)
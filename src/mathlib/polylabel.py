@@ -0,0 +1,116 @@
+import math
+from collections.abc import Sequence
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+
+def signed_distance(
+    points: NDArray[np.float64], rings: Sequence[NDArray[np.float64]]
+) -> NDArray[np.float64]:
+    """
+    Distância de cada ponto, no formato (n, 2), até o contorno mais próximo
+    de um polígono formado por `rings`, o contorno externo seguido dos
+    furos. Positiva dentro e negativa fora do polígono.
+    """
+    x = points[:, 0:1]
+    y = points[:, 1:2]
+    inside = np.zeros(len(points), dtype=bool)
+    distance = np.full(len(points), np.inf)
+
+    for ring in rings:
+        a = ring
+        b = np.roll(ring, -1, axis=0)
+        ax, ay = a[:, 0], a[:, 1]
+        bx, by = b[:, 0], b[:, 1]
+
+        # Regra par-ímpar: cruzamentos de um raio horizontal para a direita.
+        crosses = ((ay > y) != (by > y)) & (
+            x < (bx - ax) * (y - ay) / np.where(by != ay, by - ay, 1) + ax
+        )
+        inside ^= (crosses.sum(axis=1) % 2).astype(bool)
+
+        # Distância até cada segmento.
+        dx = bx - ax
+        dy = by - ay
+        length = dx**2 + dy**2
+        t = np.clip(
+            ((x - ax) * dx + (y - ay) * dy) / np.where(length > 0, length, 1),
+            0,
+            1,
+        )
+        segment = np.hypot(x - (ax + t * dx), y - (ay + t * dy)).min(axis=1)
+        distance = np.minimum(distance, segment)
+
+    return np.where(inside, distance, -distance)
+
+
+def polylabel(
+    polygon: ArrayLike,
+    holes: Sequence[ArrayLike] = (),
+    precision: float = 1e-6,
+) -> tuple[NDArray[np.float64], float]:
+    """
+    Encontra o polo de inacessibilidade de um polígono: o ponto interno mais
+    distante do contorno, adequado para posicionar rótulos.
+
+    É o algoritmo `polylabel`, com todas as células de cada nível avaliadas
+    de uma só vez: as células cujo limite superior ainda pode superar o
+    melhor ponto por mais de `precision` são divididas em quatro.
+
+    - `polygon`: Contorno externo no formato (n, 2);
+    - `holes`: Contornos dos furos;
+    - `precision`: Tolerância da distância, relativa ao maior lado da caixa
+    delimitadora.
+
+    Retorna o ponto e a sua distância até o contorno.
+    """
+    rings = [
+        np.asarray(ring, dtype=np.float64).reshape(-1, 2)
+        for ring in (polygon, *holes)
+    ]
+    outer = rings[0]
+    lower = outer.min(axis=0)
+    upper = outer.max(axis=0)
+    size = float((upper - lower).max())
+    if size == 0:
+        return lower, 0.0
+
+    tolerance = precision * size
+    h = size / 2
+    # Células que cobrem a caixa delimitadora.
+    nx, ny = (
+        int(count) for count in np.maximum(np.ceil((upper - lower) / size), 1)
+    )
+    xs = lower[0] + size * (np.arange(nx) + 0.5)
+    ys = lower[1] + size * (np.arange(ny) + 0.5)
+    # Centro de cada célula, no formato (células, 2), linha por linha.
+    centers = np.column_stack((np.tile(xs, ny), np.repeat(ys, nx)))
+
+    # Centroide como primeiro candidato.
+    candidates = np.vstack((centers, outer.mean(axis=0)))
+    distances = signed_distance(candidates, rings)
+    best = int(distances.argmax())
+    best_point = candidates[best]
+    best_distance = float(distances[best])
+    distances = distances[:-1]
+
+    while len(centers) > 0:
+        # Limite superior da distância dentro de cada célula.
+        potential = distances + h * math.sqrt(2)
+        keep = potential > best_distance + tolerance
+        centers = centers[keep]
+        if len(centers) == 0:
+            break
+
+        h /= 2
+        offsets = np.array([[-h, -h], [h, -h], [-h, h], [h, h]])
+        centers = (centers[:, None, :] + offsets[None, :, :]).reshape(-1, 2)
+        distances = signed_distance(centers, rings)
+
+        i = int(distances.argmax())
+        if distances[i] > best_distance:
+            best_point = centers[i]
+            best_distance = float(distances[i])
+
+    return best_point, best_distance
@@ -0,0 +1,35 @@
+import numpy as np
+from numpy.typing import NDArray
+
+from mathlib.vector2 import Vector2, Vector2Like
+
+type BoundingBox = tuple[Vector2Like, Vector2Like]
+"""Caixa delimitadora no formato (inferior esquerdo, superior direito)."""
+
+
+def line(a: Vector2Like, b: Vector2Like, n: int) -> NDArray[np.float64]:
+    """
+    Retorna `n` pontos igualmente espaçados no segmento de `a` até `b`,
+    incluindo as extremidades, no formato (n, 2).
+    """
+    a = Vector2.parse(a)
+    b = Vector2.parse(b)
+
+    return np.stack(
+        (np.linspace(a.x, b.x, n), np.linspace(a.y, b.y, n)), axis=1
+    )
+
+
+def grid(bbox: BoundingBox, nx: int, ny: int) -> NDArray[np.float64]:
+    """
+    Retorna uma grade de `nx` por `ny` pontos igualmente espaçados que cobre
+    a caixa `bbox`, no formato (ny, nx, 2). As linhas variam em y e as
+    colunas em x.
+    """
+    lower = Vector2.parse(bbox[0])
+    upper = Vector2.parse(bbox[1])
+    x, y = np.meshgrid(
+        np.linspace(lower.x, upper.x, nx), np.linspace(lower.y, upper.y, ny)
+    )
+
+    return np.stack((x, y), axis=-1)
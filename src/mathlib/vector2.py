@@ -1,7 +1,10 @@
 import math
 from collections.abc import Iterator, Sequence
 from dataclasses import dataclass
-from typing import Literal, Self
+from typing import Any, Literal, Self, overload
+
+import numpy as np
+from numpy.typing import DTypeLike, NDArray
 
 type Vector2Like = Vector2 | Sequence[float]
 
@@ -17,22 +20,26 @@ class Vector2:
 
     def __iter__(self) -> Iterator[float]:
         """Define o vetor como uma classe iterável."""
-        yield self.x
-        yield self.y
+        return iter((self.x, self.y))
 
     def __len__(self) -> Literal[2]:
         """Define o tamanho de um objeto de classe vetor."""
         return 2
 
     @classmethod
-    def parse(cls, vec: Vector2Like) -> Self:
+    def parse(cls, vec: Vector2Like, copy: bool = False) -> Self:
         """
         Converte um objeto similar a um vetor no próprio vetor.
 
         Condições:
         - Ser uma sequência de `float`s;
         - Possuir tamanho 2.
+
+        Um `Vector2` é retornado sem cópia, a menos que `copy` seja
+        verdadeiro. Como o vetor é mutável, use `copy` ao guardá-lo.
         """
+        if isinstance(vec, cls):
+            return cls(vec.x, vec.y) if copy else vec
         if isinstance(vec, Sequence):
             assert len(vec) == 2, 'O tamanho precisa ser 2.'
 
@@ -40,13 +47,15 @@ class Vector2:
 
     def __add__(self, other: Vector2Like) -> Self:
         """Define a soma de um vetor com um similar. Retorna um vetor."""
-        other = self.parse(other)
+        if not isinstance(other, Vector2):
+            other = self.parse(other)
 
         return self.__class__(self.x + other.x, self.y + other.y)
 
     def __sub__(self, other: Vector2Like) -> Self:
         """Define a subtração de um `Vector2` com um similar."""
-        other = self.parse(other)
+        if not isinstance(other, Vector2):
+            other = self.parse(other)
 
         return self.__class__(self.x - other.x, self.y - other.y)
 
@@ -64,7 +73,7 @@ class Vector2:
 
     def magnitude(self) -> float:
         """Retorna a magnitude do vetor."""
-        return math.sqrt(self.x**2 + self.y**2)
+        return math.hypot(self.x, self.y)
 
     def direction(self) -> Self:
         """Retorna um versor que aponta na mesma direção que o vetor."""
@@ -88,29 +97,226 @@ class Vector2:
             case 'counterclockwise':
                 return self.__class__(y, -x)
 
+    def rotate(self, angle: float, center: Vector2Like = (0, 0)) -> Self:
+        """Retorna o vetor girado `angle` graus em torno de `center`."""
+        cx, cy = center
+        theta = math.radians(angle)
+        cos, sin = math.cos(theta), math.sin(theta)
+        x, y = self.x - cx, self.y - cy
+
+        return self.__class__(cx + x * cos - y * sin, cy + x * sin + y * cos)
+
     @classmethod
     def dot(cls, vec: Vector2Like, other: Vector2Like) -> float:
         """Retorna o produto escalar entre dois vetores."""
-        vec = cls.parse(vec)
-        other = cls.parse(other)
+        if not isinstance(vec, Vector2):
+            vec = cls.parse(vec)
+        if not isinstance(other, Vector2):
+            other = cls.parse(other)
 
         return vec.x * other.x + vec.y * other.y
 
     @classmethod
     def distance(cls, vec: Vector2Like, other: Vector2Like) -> float:
         """Retorna a distância entre dois vetores."""
-        vec = cls.parse(vec)
-        other = cls.parse(other)
+        if not isinstance(vec, Vector2):
+            vec = cls.parse(vec)
+        if not isinstance(other, Vector2):
+            other = cls.parse(other)
 
-        return (vec - other).magnitude()
+        # Sem o vetor intermediário da diferença.
+        return math.hypot(vec.x - other.x, vec.y - other.y)
 
     @classmethod
     def midpoint(cls, vec: Vector2Like, other: Vector2Like) -> Self:
         """Retorna o ponto médio entre dois vetores."""
-        vec = cls.parse(vec)
-        other = cls.parse(other)
+        if not isinstance(vec, Vector2):
+            vec = cls.parse(vec)
+        if not isinstance(other, Vector2):
+            other = cls.parse(other)
+
+        # Sem os vetores intermediários da soma e da divisão.
+        return cls((vec.x + other.x) / 2, (vec.y + other.y) / 2)
+
+
+type Vector2ArrayLike = (
+    Vector2Array | Sequence[Vector2Like] | NDArray[np.float64]
+)
+
+
+def coordinates(value: Vector2Like | Vector2ArrayLike) -> NDArray[np.float64]:
+    """
+    Coordenadas de um vetor, no formato (2,), ou de vários, (n, 2). Uma
+    sequência de vetores pode misturar `Vector2` com outros similares.
+    """
+    if isinstance(value, Vector2Array):
+        return value.data
+    if isinstance(value, Vector2):
+        return np.array((value.x, value.y))
+    if isinstance(value, np.ndarray):
+        return value.astype(np.float64, copy=False)
+
+    return np.array(
+        [tuple(item) if isinstance(item, Vector2) else item for item in value],
+        dtype=np.float64,
+    )
+
+
+@dataclass(slots=True, eq=False)
+class Vector2Array:
+    """
+    Sequência de vetores 2D armazenada em um único array no formato (n, 2),
+    como os nós de uma polilinha. As operações são vetorizadas e não criam um
+    `Vector2` por nó.
+
+    A iteração e a indexação por inteiro retornam `Vector2`, de forma que o
+    array pode substituir uma `list[Vector2]`.
+    """
+
+    data: NDArray[np.float64]
+
+    def __post_init__(self) -> None:
+        self.data = np.asarray(self.data, dtype=np.float64).reshape(-1, 2)
+
+    @classmethod
+    def parse(cls, nodes: Vector2ArrayLike) -> Self:
+        """Converte uma sequência de similares a vetores em um array."""
+        if isinstance(nodes, cls):
+            return nodes
+        if isinstance(nodes, np.ndarray):
+            return cls(nodes)
+
+        return cls(np.array([tuple(node) for node in nodes], dtype=np.float64))
+
+    @property
+    def x(self) -> NDArray[np.float64]:
+        return self.data[:, 0]
+
+    @property
+    def y(self) -> NDArray[np.float64]:
+        return self.data[:, 1]
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __iter__(self) -> Iterator[Vector2]:
+        for x, y in self.data.tolist():
+            yield Vector2(x, y)
+
+    @overload
+    def __getitem__(self, index: int) -> Vector2: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> Self: ...
+
+    def __getitem__(self, index: int | slice) -> Vector2 | Self:
+        if isinstance(index, slice):
+            return self.__class__(self.data[index])
+
+        x, y = self.data[index].tolist()
+        return Vector2(x, y)
+
+    def __array__(
+        self, dtype: DTypeLike | None = None, copy: bool | None = None
+    ) -> NDArray[Any]:
+        """
+        Protocolo de conversão do NumPy 2: `copy=True` sempre copia, `None`
+        copia apenas se `dtype` exigir e `False` lança `ValueError` nesse
+        caso.
+        """
+        return np.array(self.data, dtype=dtype, copy=copy)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Vector2Array):
+            return NotImplemented
+        return bool(np.array_equal(self.data, other.data))
 
-        return cls.parse((other + vec) / 2)
+    def tolist(self) -> list[Vector2]:
+        return list(self)
+
+    def __add__(self, other: Vector2Like | Vector2ArrayLike) -> Self:
+        """Soma um vetor a todos os nós ou soma dois arrays nó a nó."""
+        return self.__class__(self.data + coordinates(other))
+
+    def __sub__(self, other: Vector2Like | Vector2ArrayLike) -> Self:
+        return self.__class__(self.data - coordinates(other))
+
+    def __neg__(self) -> Self:
+        return self.__class__(-self.data)
+
+    def __mul__(self, other: float) -> Self:
+        return self.__class__(self.data * other)
+
+    def __truediv__(self, other: float) -> Self:
+        return self.__class__(self.data / other)
+
+    def magnitude(self) -> NDArray[np.float64]:
+        """Retorna a magnitude de cada vetor."""
+        return np.hypot(self.x, self.y)
+
+    def direction(self) -> Self:
+        """Retorna os versores de cada vetor."""
+        return self.__class__(self.data / self.magnitude()[:, None])
+
+    def perpendicular(
+        self,
+        direction: Literal['clockwise', 'counterclockwise'] = 'clockwise',
+    ) -> Self:
+        """Retorna os vetores girados na perpendicular, como em `Vector2`."""
+        match direction:
+            case 'clockwise':
+                return self.__class__(np.column_stack((-self.y, self.x)))
+            case 'counterclockwise':
+                return self.__class__(np.column_stack((self.y, -self.x)))
+
+    def translate(self, offset: Vector2Like) -> Self:
+        """Retorna os nós deslocados por `offset`."""
+        return self + offset
+
+    def rotate(self, angle: float, center: Vector2Like = (0, 0)) -> Self:
+        """Retorna os nós girados `angle` graus em torno de `center`."""
+        origin = coordinates(center)
+        theta = math.radians(angle)
+        cos, sin = math.cos(theta), math.sin(theta)
+        rotation = np.array([[cos, sin], [-sin, cos]])
+
+        return self.__class__((self.data - origin) @ rotation + origin)
+
+    def segments(self, closed: bool = False) -> tuple[Self, Self]:
+        """
+        Retorna o início e o fim de cada segmento que liga os nós em ordem.
+        Se `closed`, inclui o segmento do último ao primeiro nó.
+        """
+        end = np.roll(self.data, -1, axis=0) if closed else self.data[1:]
+        start = self.data if closed else self.data[:-1]
+
+        return self.__class__(start), self.__class__(end)
+
+    def midpoints(self, closed: bool = False) -> Self:
+        """Retorna o ponto médio de cada segmento, como em `segments()`."""
+        start, end = self.segments(closed)
+        return self.__class__((start.data + end.data) / 2)
+
+    @classmethod
+    def dot(
+        cls, vec: Vector2ArrayLike, other: Vector2Like | Vector2ArrayLike
+    ) -> NDArray[np.float64]:
+        """Retorna o produto escalar nó a nó."""
+        return (cls.parse(vec).data * coordinates(other)).sum(axis=-1)
+
+    @classmethod
+    def distance(
+        cls, vec: Vector2ArrayLike, other: Vector2Like | Vector2ArrayLike
+    ) -> NDArray[np.float64]:
+        """Retorna a distância nó a nó."""
+        return (cls.parse(vec) - other).magnitude()
+
+    @classmethod
+    def midpoint(
+        cls, vec: Vector2ArrayLike, other: Vector2Like | Vector2ArrayLike
+    ) -> Self:
+        """Retorna o ponto médio nó a nó."""
+        return cls((cls.parse(vec).data + coordinates(other)) / 2)
 
 
 UP = Vector2(0, 1)
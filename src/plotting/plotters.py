@@ -1,25 +1,229 @@
-from dataclasses import dataclass
+from __future__ import annotations
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
+from itertools import batched, repeat
+from typing import TYPE_CHECKING, Self
 
 import matplotlib.pyplot as plt
-import scienceplots as _
-from matplotlib.axes import Axes
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
 from matplotlib.figure import Figure
 
-from helpers import PathLike
+from helpers.path import PathLike, parse_path
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator, Sequence
+    from pathlib import Path
+
+    from matplotlib.axes import Axes
+    from matplotlib.lines import Line2D
+    from numpy.typing import ArrayLike
+
+    from femmlib.store import ResultStore
+
+STYLE = ['science', 'notebook', 'grid']
+
+
+def use_style(style: Sequence[str]) -> None:
+    """
+    Aplica os estilos do Matplotlib. O SciencePlots, que registra estilos
+    como `science` e `notebook`, só é importado quando um estilo que não é
+    do Matplotlib é pedido.
+    """
+    if any(
+        name != 'default' and name not in plt.style.available for name in style
+    ):
+        import scienceplots  # noqa: F401  # pyright: ignore[reportMissingImports, reportUnusedImport]
+
+    plt.style.use(style)
+
+
+@dataclass
+class Chart:
+    """
+    Dados de um gráfico experimental contra teórico.
+
+    - `base_value`: Valores do eixo x;
+    - `file`: Caminho da imagem;
+    - `xlabel` e `ylabel`: Rótulos dos eixos. Por padrão, os do `Plotter`.
+    """
+
+    base_value: ArrayLike
+    experimental: ArrayLike
+    theoretical: ArrayLike
+    file: PathLike
+    xlabel: str | None = None
+    ylabel: str | None = None
 
 
 class PlotterBuilder:
-    def __init__(self):
-        self.base_value: list[float] = []
-        self.experimental: list[float] = []
-        self.theoretical: list[float] = []
+    def __init__(self) -> None:
+        self.style: list[str] = list(STYLE)
+        self.xlabel = ''
+        self.ylabel = ''
+        self.size: tuple[float, float] | None = None
+        self.dpi = 200
+        self.processes = 1
+
+    def with_style(self, *style: str) -> Self:
+        """Estilos do Matplotlib. Valor padrão: `STYLE`."""
+        self.style = list(style)
+        return self
+
+    def with_labels(self, xlabel: str, ylabel: str) -> Self:
+        """Rótulos dos eixos de todos os gráficos."""
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        return self
+
+    def with_size(self, width: float, height: float) -> Self:
+        """Tamanho das imagens em polegadas. Por padrão, o do estilo."""
+        self.size = (width, height)
+        return self
+
+    def with_dpi(self, dpi: int) -> Self:
+        """Resolução das imagens. Valor padrão: 200."""
+        self.dpi = dpi
+        return self
+
+    def with_processes(self, processes: int) -> Self:
+        """Quantidade de processos de `Plotter.plot_all()`. Valor padrão: 1."""
+        self.processes = processes
+        return self
+
+    def build(self) -> Plotter:
+        return Plotter(
+            self.style,
+            self.xlabel,
+            self.ylabel,
+            self.size,
+            self.dpi,
+            self.processes,
+        )
 
 
 @dataclass
 class Plotter:
-    base_value: list[float]
-    experimental: list[float]
-    theoretical: list[float]
+    """
+    Salva muitos gráficos experimental contra teórico com uma única figura.
+
+    O estilo é aplicado e a figura é criada no primeiro gráfico. Os
+    seguintes apenas trocam os dados das linhas e reajustam os eixos.
+    """
+
+    style: list[str]
+    xlabel: str
+    ylabel: str
+    size: tuple[float, float] | None
+    dpi: int
+    processes: int
+    figure: Figure | None = field(default=None, init=False, repr=False)
+    lines: tuple[Line2D, Line2D] | None = field(
+        default=None, init=False, repr=False
+    )
+
+    @staticmethod
+    def builder() -> PlotterBuilder:
+        return PlotterBuilder()
+
+    def axes(self) -> tuple[Figure, Axes, tuple[Line2D, Line2D]]:
+        if self.figure is None or self.lines is None:
+            # O estilo vale para o processo inteiro.
+            use_style(self.style)
+
+            self.figure = Figure(figsize=self.size)
+            FigureCanvasAgg(self.figure)
+            ax = self.figure.add_subplot()
+            (experimental,) = ax.plot([], [], '--o', label='Experimental')
+            (theoretical,) = ax.plot([], [], ':o', label='Teórico')
+            ax.legend()
+            self.lines = (experimental, theoretical)
+
+        return self.figure, self.figure.axes[0], self.lines
+
+    def plot(self, chart: Chart) -> Path:
+        """Salva um gráfico reaproveitando a figura."""
+        figure, ax, (experimental, theoretical) = self.axes()
+        file = parse_path(chart.file, ensure_parent=True)
+
+        experimental.set_data(chart.base_value, chart.experimental)
+        theoretical.set_data(chart.base_value, chart.theoretical)
+        ax.relim()
+        ax.autoscale_view()
+        ax.set_xlabel(
+            chart.xlabel if chart.xlabel is not None else self.xlabel
+        )
+        ax.set_ylabel(
+            chart.ylabel if chart.ylabel is not None else self.ylabel
+        )
+        figure.savefig(file, dpi=self.dpi)
+
+        return file
+
+    def plot_all(self, charts: Iterable[Chart], batch: int = 64) -> list[Path]:
+        """
+        Salva vários gráficos. Com mais de um processo, os gráficos são
+        divididos em lotes de `batch` e cada processo usa a sua própria
+        figura.
+        """
+        if self.processes == 1:
+            return [self.plot(chart) for chart in charts]
+
+        # Cópia sem a figura, que não é enviada aos processos.
+        plotter = replace(self)
+        with ProcessPoolExecutor(
+            self.processes, mp_context=multiprocessing.get_context('spawn')
+        ) as executor:
+            files = executor.map(
+                plot_batch, repeat(plotter), batched(charts, batch)
+            )
+            return [file for chunk in files for file in chunk]
+
+
+def plot_batch(plotter: Plotter, charts: Sequence[Chart]) -> list[Path]:
+    return [plotter.plot(chart) for chart in charts]
+
+
+def store_charts(
+    store: ResultStore,
+    base_value: str,
+    experimental: str,
+    theoretical: str,
+    folder: PathLike,
+    by: str | None = None,
+) -> Iterator[Chart]:
+    """
+    Gráficos das colunas `experimental` e `theoretical` em função de
+    `base_value` de um `ResultStore`, lendo apenas essas colunas.
+
+    - `by`: Coluna que separa os pontos em um gráfico por valor, como a
+    corrente de uma varredura. Por padrão, um único gráfico;
+    - `folder`: Pasta das imagens, nomeadas pelo valor exato de `by`.
+    """
+    folder = parse_path(folder)
+    names = [base_value, experimental, theoretical]
+    rows = store.load([*names, by] if by is not None else names)
+    rows = rows[np.argsort(rows[base_value], kind='stable')]
+
+    if by is None:
+        yield Chart(
+            rows[base_value],
+            rows[experimental],
+            rows[theoretical],
+            folder / f'{experimental}.png',
+        )
+        return
+
+    for value in np.unique(rows[by]):
+        selected = rows[rows[by] == value]
+        yield Chart(
+            selected[base_value],
+            selected[experimental],
+            selected[theoretical],
+            folder / f'{by}_{float(value)!r}.png',
+        )
 
 
 def plot(
@@ -30,7 +234,7 @@ def plot(
     ylabel: str,
     fig_path: PathLike,
 ) -> None:
-    plt.style.use(["science", "notebook", "grid"])
+    use_style(["science", "notebook", "grid"])
 
     subplots: tuple[Figure, Axes] = plt.subplots()
     fig, ax = subplots
@@ -0,0 +1,82 @@
+import numpy as np
+from src.femmlib.solution import Solution
+from src.mathlib.electromagnetics import VACUUM_PERMEABILITY
+
+ANS = """\
+[Format]      =  4.0
+[Frequency]   =  0
+[Depth]       =  2
+[LengthUnits] =  centimeters
+[ProblemType] =  planar
+[BlockProps]  = 2
+  <BeginBlock>
+    <BlockName> = "Air"
+    <Mu_x> = 1
+    <Mu_y> = 1
+    <Sigma> = 0
+    <BHPoints> = 0
+  <EndBlock>
+  <BeginBlock>
+    <BlockName> = "Pure Iron"
+    <Mu_x> = 1
+    <Mu_y> = 1
+    <Sigma> = 10.44
+    <BHPoints> = 2
+      0 0
+      1 100
+  <EndBlock>
+[CircuitProps]  = 1
+  <BeginCircuit>
+    <CircuitName> = "coil"
+    <TotalAmps_re> = 2
+    <TotalAmps_im> = 0
+    <CircuitType> = 1
+  <EndCircuit>
+[NumBlockLabels] = 2
+0.25 0.25 1 -1 0 0 0 1 0
+0.75 0.75 2 -1 1 0 1 10 0
+[Solution]
+4
+0 0 0
+1 0 0
+1 1 0.5
+0 1 0.5
+2
+0 1 2 0
+0 2 3 1
+"""
+
+
+def grid_solution(n: int, a: float, b0: float, j: float) -> Solution:
+    """
+    Malha quadrada de lado 2, em metros, com o potencial de uma densidade de
+    corrente `j` uniforme somada a um campo `b0` uniforme na direção x. O
+    quadrado central de lado `a` pertence ao grupo 1.
+    """
+    axis = np.linspace(-1, 1, n + 1)
+    x, y = np.meshgrid(axis, axis)
+    nodes = np.stack((x.ravel(), y.ravel()), axis=1)
+    index = np.arange((n + 1) ** 2).reshape(n + 1, n + 1)
+    lower = np.stack(
+        (index[:-1, :-1], index[:-1, 1:], index[1:, 1:]), axis=-1
+    ).reshape(-1, 3)
+    upper = np.stack(
+        (index[:-1, :-1], index[1:, 1:], index[1:, :-1]), axis=-1
+    ).reshape(-1, 3)
+    elements = np.concatenate((lower, upper))
+    centroids = nodes[elements].mean(axis=1)
+    labels = (np.abs(centroids) < a / 2).all(axis=1).astype(np.int64)
+    potential = (
+        b0 * nodes[:, 1]
+        - VACUUM_PERMEABILITY * j * (nodes[:, 0] ** 2 + nodes[:, 1] ** 2) / 4
+    )
+
+    solution = Solution.read_text(ANS)
+    solution.unit = 'meters'
+    solution.depth = 1
+    solution.nodes = nodes
+    solution.potential = potential
+    solution.elements = elements
+    solution.element_labels = labels
+
+    return solution
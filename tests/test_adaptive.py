@@ -0,0 +1,118 @@
+import numpy as np
+from numpy.typing import NDArray
+from src.femmlib.adaptive import AdaptiveAxis, AdaptiveGrid, AdaptiveSweep
+from src.femmlib.circuit import CircuitProps, CircuitPropsExtended
+
+
+def inductance(current: float, gap: float = 0) -> float:
+    """Indutância de um núcleo que satura em torno de 5 A."""
+    return 1e-3 / ((1 + 4 * gap) * (1 + (current / 5) ** 6)) + 1e-4
+
+
+def solve(current: float, gap: float = 0) -> CircuitPropsExtended:
+    flux_linkage = inductance(current, gap) * current
+    return CircuitProps(current, 0, flux_linkage).with_extension(10, 1e-4)
+
+
+def max_error(points: NDArray[np.float64]) -> float:
+    dense = np.linspace(0.1, 60, 5000)
+    interpolated = np.interp(dense, points, [inductance(i) for i in points])
+    exact = np.array([inductance(i) for i in dense])
+    return float(np.abs(interpolated - exact).max() / 1e-3)
+
+
+def test_sweep_needs_fewer_points_than_uniform() -> None:
+    sweep = AdaptiveSweep(
+        AdaptiveAxis('current', 0.1, 60), tolerance=1e-3, max_points=500
+    )
+    x, values = sweep.run(solve)
+
+    assert np.allclose(values[:, 0], [inductance(i) for i in x])
+    error = max_error(x)
+    assert error < 2e-3
+
+    uniform = np.linspace(0.1, 60, 3 * len(x))
+    assert max_error(uniform) > error
+
+
+def test_sweep_batches_and_budget() -> None:
+    sweep = AdaptiveSweep(
+        AdaptiveAxis('freq', 1, 1e6, log=True),
+        tolerance=0,
+        max_points=12,
+        batch=4,
+    )
+
+    first = sweep.ask()
+    assert len(first) == 5
+    assert np.allclose(np.log10(first), np.linspace(0, 6, 5))
+    for value in first:
+        sweep.tell(value, solve(value))
+
+    second = sweep.ask()
+    assert len(second) == 4
+    for value in second:
+        sweep.tell(value, solve(value))
+
+    assert len(sweep.run(solve)[0]) == 12
+
+
+def test_ask_before_all_answers() -> None:
+    sweep = AdaptiveSweep(AdaptiveAxis('current', 0.1, 60), batch=2)
+    first = sweep.ask()
+    sweep.tell(first[0], solve(first[0]))
+
+    # Com pontos pendentes, um pedido vazio não encerra a varredura.
+    assert sweep.ask() == []
+    assert not sweep.done()
+
+    for value in first[1:]:
+        sweep.tell(value, solve(value))
+        assert not sweep.done()
+
+    second = sweep.ask()
+    assert len(second) == 2
+    for value in second:
+        sweep.tell(value, solve(value))
+
+    while not sweep.done():
+        for value in sweep.ask():
+            sweep.tell(value, solve(value))
+
+    assert sweep.ask() == []
+    assert not sweep.pending
+
+
+def test_grid_ask_before_all_answers() -> None:
+    grid = AdaptiveGrid(
+        AdaptiveAxis('current', 0.1, 60, initial=3),
+        AdaptiveAxis('gap', 0, 2, initial=3),
+        tolerance=1e-2,
+    )
+    first = grid.ask()
+    grid.tell(first[0], solve(*first[0]))
+
+    assert grid.ask() == []
+    assert not grid.done()
+
+    for point in first[1:]:
+        grid.tell(point, solve(*point))
+
+    while not grid.done():
+        for point in grid.ask():
+            grid.tell(point, solve(*point))
+
+    assert len(grid.values) == len(grid.x) * len(grid.y) > 9
+
+
+def test_grid_refines_saturated_axis() -> None:
+    grid = AdaptiveGrid(
+        AdaptiveAxis('current', 0.1, 60),
+        AdaptiveAxis('gap', 0, 2),
+        tolerance=1e-2,
+    )
+    x, y, values = grid.run(solve)
+
+    assert values.shape == (len(y), len(x), 1)
+    assert np.isclose(values[-1, 0, 0], inductance(x[0], y[-1]))
+    assert len(x) > len(y)
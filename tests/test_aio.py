@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+from functools import partial
+from pathlib import Path
+
+import pytest
+from src.femmlib import aio
+
+
+def slow_double(value: float, delay: float) -> float:
+    time.sleep(delay)
+    return 2 * value
+
+
+def fail() -> None:
+    raise ValueError('mesh failed')
+
+
+@contextmanager
+def document(file: Path) -> Generator[None]:
+    """Simula `FEMM.new()`: o arquivo só é salvo ao sair do contexto."""
+    lines: list[str] = []
+    state['lines'] = lines
+    yield
+    file.write_text('\n'.join(lines))
+
+
+state: dict[str, list[str]] = {}
+
+
+def draw(name: str) -> int:
+    state['lines'].append(name)
+    return len(state['lines'])
+
+
+@pytest.fixture(autouse=True)
+def concurrency() -> Iterator[None]:
+    previous = aio.concurrency
+    aio.set_concurrency(2)
+    yield
+    aio.set_concurrency(previous)
+
+
+def test_as_completed_streams_results() -> None:
+    async def main() -> list[float]:
+        return [
+            result
+            async for result in aio.as_completed(
+                [
+                    aio.run(slow_double, 1, 1.0),
+                    aio.run(slow_double, 2, 0.0),
+                ]
+            )
+        ]
+
+    assert asyncio.run(main()) == [4, 2]
+
+
+def test_errors_and_cancellation() -> None:
+    async def main() -> float:
+        with pytest.raises(RuntimeError, match='mesh failed'):
+            await aio.run(fail)
+
+        task = asyncio.create_task(aio.run(slow_double, 1, 60))
+        await asyncio.sleep(0.5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        start = time.monotonic()
+        await asyncio.wait_for(aio.run(slow_double, 1, 0), timeout=30)
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) < 30
+
+
+def test_concurrency_limit() -> None:
+    aio.set_concurrency(1)
+
+    async def main() -> float:
+        start = time.monotonic()
+        await asyncio.gather(*(aio.run(slow_double, i, 0.5) for i in range(2)))
+        return time.monotonic() - start
+
+    assert asyncio.run(main()) >= 1
+
+
+def test_session_keeps_document_open(tmp_path: Path) -> None:
+    file = tmp_path / 'model.txt'
+
+    async def main() -> list[int]:
+        async with aio.session(partial(document, file)) as session:
+            return [
+                await session.call(draw, 'core'),
+                await session.call(draw, 'coil'),
+            ]
+
+    assert asyncio.run(main()) == [1, 2]
+    assert file.read_text() == 'core\ncoil'
@@ -0,0 +1,63 @@
+import pytest
+from src.femmlib import block, circuit
+from src.femmlib.block import Block, update_blocks
+from src.femmlib.circuit import Circuit, update_circuits
+from src.mathlib.vector2 import Vector2
+
+
+def slots() -> list[Block]:
+    return [
+        Block('18 AWG', Vector2(i, 0), True, 0, 'A', 0, i % 2 + 1, 10)
+        for i in range(8)
+    ]
+
+
+@pytest.fixture
+def scripts(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    scripts: list[str] = []
+
+    def run(code: str, name: str) -> None:
+        scripts.append(code)
+
+    monkeypatch.setattr(block.lua, 'run', run)
+    monkeypatch.setattr(circuit.lua, 'run', run)
+    return scripts
+
+
+def test_update_group(scripts: list[str]) -> None:
+    blocks = slots()
+    changed = update_blocks(blocks, group=1, turns=20, circuit_name='B')
+
+    assert len(changed) == 4
+    assert len(scripts) == 1
+    assert scripts[0].count('mi_setblockprop') == 1
+    assert scripts[0].count('mi_selectlabel') == 1
+    assert all(b.turns == 20 and b.circuit_name == 'B' for b in changed)
+    assert all(b.turns == 10 for b in blocks if b.group == 2)
+
+
+def test_update_predicate_keeps_distinct_props(scripts: list[str]) -> None:
+    blocks = slots()
+    changed = update_blocks(blocks, lambda b: b.position.x < 4, mesh_size=0.5)
+
+    # Os grupos continuam diferentes, então há duas chamadas.
+    assert len(changed) == 4
+    assert scripts[0].count('mi_setblockprop') == 2
+    assert all(not b.auto_mesh and b.mesh_size == 0.5 for b in changed)
+    assert all(b.auto_mesh for b in blocks[4:])
+
+
+def test_update_without_changes(scripts: list[str]) -> None:
+    assert len(update_blocks(slots(), group=2)) == 4
+    assert update_blocks(slots(), group=3, turns=5) == []
+    assert scripts == []
+
+
+def test_update_circuits(scripts: list[str]) -> None:
+    circuits = [Circuit(name, 0, 1) for name in 'ABC']
+    changed = update_circuits(circuits, lambda c: c.name != 'C', current=2.5)
+
+    assert [c.name for c in changed] == ['A', 'B']
+    assert len(scripts) == 1
+    assert scripts[0].count('mi_modifycircprop') == 2
+    assert [c.current for c in circuits] == [2.5, 2.5, 0]
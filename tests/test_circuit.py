@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from src.femmlib.circuit import CircuitProps, CircuitPropsBatch
+from src.femmlib.store import ResultStore
+
+
+def test_batch_with_extension_matches_props() -> None:
+    props = [CircuitProps(i + 1, 0.5 * i, 2e-3 * (i + 1)) for i in range(5)]
+    batch = CircuitPropsBatch.from_props(props).with_extension(10, 1e-4)
+
+    assert len(batch) == 5
+    for i, prop in enumerate(props):
+        assert tuple(batch[i]) == pytest.approx(
+            tuple(prop.with_extension(10, 1e-4))
+        )
+    assert batch.inductance == pytest.approx(np.full(5, 2e-3))
+
+
+def test_batch_complex_and_broadcast() -> None:
+    batch = CircuitPropsBatch.from_columns(
+        [1, 2], [1j, 2j], [1e-3 + 1e-4j, 2e-3]
+    )
+    assert batch.data.dtype['current'] == np.complex128
+
+    extended = batch.with_extension([5, 10], 1e-4)
+    assert extended.mmf == pytest.approx([5, 20])
+
+
+def test_store_props_batch(tmp_path: Path) -> None:
+    with ResultStore(tmp_path, ['gap'], chunk_size=2) as store:
+        for i in range(3):
+            store.append(
+                {'gap': i}, CircuitProps(i + 1, 0, 1).with_extension(4, 1)
+            )
+
+        batch = store.props_batch()
+
+    assert batch.current.tolist() == [1, 2, 3]
+    assert batch.mmf.tolist() == [4, 8, 12]
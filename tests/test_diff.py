@@ -0,0 +1,180 @@
+from collections.abc import Callable
+
+import pytest
+from src.femmlib import diff as diff_module
+from src.femmlib import lua
+from src.femmlib import structure as structure_module
+from src.femmlib.diff import diff
+from src.femmlib.structure import Structure
+from src.mathlib.vector2 import Vector2
+
+
+def rectangle(x: float, y: float, width: float, height: float) -> Structure:
+    return Structure(
+        [
+            Vector2(x, y),
+            Vector2(x + width, y),
+            Vector2(x + width, y + height),
+            Vector2(x, y + height),
+        ],
+        'closed loop',
+    )
+
+
+def test_unchanged_model_is_empty() -> None:
+    model = {'core': rectangle(0, 0, 4, 4)}
+    assert len(diff(model, model)) == 0
+
+
+def test_moves_are_grouped_by_offset() -> None:
+    previous = {
+        'upper': rectangle(0, 1, 4, 1),
+        'lower': rectangle(0, -2, 4, 1),
+    }
+    target = {
+        'upper': rectangle(0, 1.5, 4, 1),
+        'lower': rectangle(0, -2.5, 4, 1),
+    }
+
+    model_diff = diff(previous, target)
+
+    assert not model_diff.deletions
+    assert not model_diff.additions
+    assert len(model_diff.moves) == 2
+    offsets = sorted(move.offset.y for move in model_diff.moves)
+    assert offsets == [-0.5, 0.5]
+    assert all(len(move.nodes) == 4 for move in model_diff.moves)
+
+
+def test_shared_nodes_are_moved_once() -> None:
+    previous = {'a': rectangle(0, 0, 1, 1), 'b': rectangle(1, 0, 1, 1)}
+    target = {'a': rectangle(1, 0, 1, 1), 'b': rectangle(2, 0, 1, 1)}
+
+    (move,) = diff(previous, target).moves
+
+    assert len(move.nodes) == 6
+
+
+def test_topology_change_redraws() -> None:
+    previous = {'core': rectangle(0, 0, 1, 1), 'old': rectangle(5, 5, 1, 1)}
+    target = {
+        'core': Structure([Vector2(0, 0), Vector2(1, 0)], 'open loop'),
+        'new': rectangle(9, 9, 1, 1),
+    }
+
+    model_diff = diff(previous, target)
+
+    assert len(model_diff.deletions) == 2
+    assert len(model_diff.additions) == 2
+    assert not model_diff.moves
+
+
+def test_shared_nodes_survive_deletion() -> None:
+    previous = {'core': rectangle(0, 0, 2, 1), 'gap': rectangle(0, 1, 2, 1)}
+    target = {'core': rectangle(0, 0, 2, 1)}
+
+    (deletion,) = diff(previous, target).deletions
+
+    # Os cantos compartilhados e o segmento entre eles ficam com o núcleo.
+    assert sorted((node.x, node.y) for node in deletion.nodes) == [
+        (0, 2),
+        (2, 2),
+    ]
+    assert not deletion.segments
+
+
+def test_segment_between_kept_nodes_is_deleted() -> None:
+    previous = {
+        'left': rectangle(0, 0, 1, 1),
+        'right': rectangle(2, 0, 1, 1),
+        'bridge': Structure([Vector2(1, 0), Vector2(2, 0)], 'open loop'),
+    }
+    target = {'left': previous['left'], 'right': previous['right']}
+
+    (deletion,) = diff(previous, target).deletions
+
+    assert not deletion.nodes
+    assert [(point.x, point.y) for point in deletion.segments] == [(1.5, 0)]
+
+
+def test_conflicting_offsets_raise() -> None:
+    previous = {'a': rectangle(0, 0, 1, 1), 'b': rectangle(1, 0, 1, 1)}
+    target = {'a': rectangle(0, 0, 1, 1), 'b': rectangle(1, 1, 1, 1)}
+
+    with pytest.raises(ValueError, match='conflicting offsets'):
+        diff(previous, target)
+
+
+def test_moves_are_selected_before_translating(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[str] = []
+
+    def record(name: str) -> Callable[..., None]:
+        def call(*args: float) -> None:
+            calls.append(
+                f'{name}({", ".join(lua.number(arg) for arg in args)})'
+            )
+
+        return call
+
+    for name in (
+        'mi_selectnode',
+        'mi_setgroup',
+        'mi_selectgroup',
+        'mi_movetranslate',
+        'mi_clearselected',
+    ):
+        monkeypatch.setattr(diff_module.femm, name, record(name))
+    # O primeiro deslocamento leva um nó à posição que o segundo seleciona.
+    previous = {
+        'a': Structure([Vector2(0, 0)], 'open loop', 1),
+        'b': Structure([Vector2(1, 0)], 'open loop', 2),
+    }
+    target = {
+        'a': Structure([Vector2(1, 0)], 'open loop', 1),
+        'b': Structure([Vector2(1, 5)], 'open loop', 2),
+    }
+
+    diff(previous, target).apply()
+
+    first, second = diff_module.MOVE_GROUP, diff_module.MOVE_GROUP + 1
+    selections = [call for call in calls if call != 'mi_clearselected()']
+    assert selections == [
+        'mi_selectnode(0, 0)',
+        f'mi_setgroup({first})',
+        'mi_selectnode(1, 0)',
+        f'mi_setgroup({second})',
+        f'mi_selectgroup({first})',
+        'mi_movetranslate(1, 0)',
+        f'mi_selectgroup({second})',
+        'mi_movetranslate(0, 5)',
+        'mi_selectnode(1, 0)',
+        'mi_setgroup(1)',
+        'mi_selectnode(1, 5)',
+        'mi_setgroup(2)',
+    ]
+
+
+def test_added_structure_keeps_group(monkeypatch: pytest.MonkeyPatch) -> None:
+    programs: list[str] = []
+    drawn: list[tuple[float, ...]] = []
+
+    def run(code: str, name: str) -> None:
+        programs.append(code)
+
+    def draw(*args: float) -> None:
+        drawn.append(args)
+
+    monkeypatch.setattr(structure_module.lua, 'run', run)
+    monkeypatch.setattr(structure_module.femm, 'mi_addnode', draw)
+    monkeypatch.setattr(structure_module.femm, 'mi_addsegment', draw)
+    target = rectangle(0, 0, 1, 1)
+    target.group = 7
+
+    (addition,) = diff({}, {'core': target}).additions
+    addition.apply()
+
+    assert len(drawn) == 8
+    (program,) = programs
+    assert 'mi_setgroup(7)' in program
@@ -0,0 +1,157 @@
+import multiprocessing
+import os
+import queue
+from pathlib import Path
+
+from src.femmlib.circuit import CircuitProps, CircuitPropsExtended
+from src.femmlib.distributed import (
+    Coordinator,
+    Dispatcher,
+    Task,
+    TaskResult,
+    run_worker,
+)
+from src.femmlib.store import ResultStore
+
+
+def fake_solve(task: Task) -> CircuitPropsExtended:
+    """Simula o FEMM: lê o modelo enviado e calcula uma indutância."""
+    model = task.materialize(Path(task.options['folder']) / str(task.id))
+    scale = float(model.read_text())
+    if task.params['i'] == 3:
+        raise RuntimeError('did not converge')
+
+    current = task.params['amps']
+    return CircuitProps(current, 0, scale * current).with_extension(10, 1)
+
+
+def crashing_solve(task: Task) -> CircuitPropsExtended:
+    """Termina o processo na primeira tentativa da variante 2."""
+    marker = Path(task.options['folder']) / 'crashed'
+    if task.params['i'] == 2 and not marker.exists():
+        marker.parent.mkdir(parents=True, exist_ok=True)
+        marker.touch()
+        os._exit(1)
+
+    return fake_solve(task)
+
+
+def test_workers_stream_results_to_store(tmp_path: Path) -> None:
+    model = tmp_path / 'model.FEM'
+    model.write_text('2e-3')
+    context = multiprocessing.get_context('spawn')
+
+    with (
+        ResultStore(tmp_path / 'store', ['i', 'amps']) as store,
+        Coordinator(store) as coordinator,
+    ):
+        assert coordinator.address[0] == '127.0.0.1'
+        for i in range(8):
+            coordinator.submit(
+                {'i': i, 'amps': i + 1.0},
+                model,
+                {'folder': str(tmp_path / 'workers')},
+            )
+
+        workers = [
+            context.Process(
+                target=run_worker,
+                args=(coordinator.address, fake_solve, coordinator.authkey),
+                kwargs={'name': f'worker {i}'},
+            )
+            for i in range(3)
+        ]
+        for worker in workers:
+            worker.start()
+
+        results = list(coordinator.collect(timeout=60))
+
+    for worker in workers:
+        worker.join(timeout=10)
+        assert worker.exitcode == 0
+
+    assert len(results) == 8
+    assert [result.params['i'] for result in coordinator.failed] == [3]
+    assert 'did not converge' in coordinator.failed[0].error
+    assert sorted(store.load(['i'])['i']) == [0, 1, 2, 4, 5, 6, 7]
+    assert (store.load(['inductance'])['inductance'] == 2e-3).all()
+
+
+def test_tasks_of_lost_worker_are_dispatched_again(tmp_path: Path) -> None:
+    model = tmp_path / 'model.FEM'
+    model.write_text('1')
+    context = multiprocessing.get_context('spawn')
+
+    with (
+        ResultStore(tmp_path / 'store', ['i', 'amps']) as store,
+        Coordinator(store, worker_timeout=1) as coordinator,
+    ):
+        for i in range(4):
+            coordinator.submit(
+                {'i': i, 'amps': 1.0},
+                model,
+                {'folder': str(tmp_path / 'workers')},
+            )
+
+        workers = [
+            context.Process(
+                target=run_worker,
+                args=(
+                    coordinator.address,
+                    crashing_solve,
+                    coordinator.authkey,
+                ),
+                kwargs={'heartbeat': 0.1},
+            )
+            for _ in range(2)
+        ]
+        for worker in workers:
+            worker.start()
+
+        results = list(coordinator.collect(timeout=60))
+
+    for worker in workers:
+        worker.join(timeout=10)
+
+    assert sorted(result.id for result in results) == [0, 1, 2, 3]
+    assert {worker.exitcode for worker in workers} == {0, 1}
+    assert len(store) == 3
+
+
+def test_dispatcher_sends_model_once_per_worker() -> None:
+    tasks: queue.Queue[Task] = queue.Queue()
+    results: queue.Queue[TaskResult] = queue.Queue()
+    now = [0.0]
+
+    def clock() -> float:
+        return now[0]
+
+    dispatcher = Dispatcher(tasks, results, clock)
+    dispatcher.add_model('hash', b'model')
+    for i in range(4):
+        tasks.put(Task(i, {}, 'model.FEM', model_hash='hash'))
+
+    claimed = [dispatcher.claim(worker, 0) for worker in 'aaba']
+    models = [task.model if task else None for task in claimed]
+    assert models == [b'model', b'', b'model', b'']
+
+    # Apenas "b" continua dando sinais de vida.
+    now[0] = 10
+    dispatcher.heartbeat('b')
+    dispatcher.complete(TaskResult(0, {}, None, worker='a'))
+    assert dispatcher.expire(5) == [1, 3]
+    assert results.get_nowait().id == 0
+
+    again = [tasks.get_nowait().id, tasks.get_nowait().id]
+    assert again == [1, 3]
+    assert dispatcher.expire(5) == []
+
+
+def test_close_without_start(tmp_path: Path) -> None:
+    coordinator = Coordinator(ResultStore(tmp_path, ['gap']))
+    coordinator.close()
+
+    with coordinator:
+        pass
+    # Encerrar de novo não tem efeito.
+    coordinator.close()
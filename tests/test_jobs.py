@@ -0,0 +1,151 @@
+import threading
+from pathlib import Path
+
+import pytest
+from src.femmlib.jobs import JobQueue
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_submit_deduplicates(tmp_path: Path) -> None:
+    queue = JobQueue(tmp_path / 'jobs.db')
+    first = queue.submit({'gap': 1.0, 'current': 2.0})
+    again = queue.submit({'current': 2.0, 'gap': 1.0})
+    other = queue.submit({'gap': 1.0, 'current': 2.0}, model='changed')
+
+    assert first == again
+    assert other != first
+    assert queue.stats().pending == 2
+
+
+def test_claim_is_atomic(tmp_path: Path) -> None:
+    file = tmp_path / 'jobs.db'
+    JobQueue(file).submit_all({'i': i} for i in range(50))
+    claimed: list[int] = []
+
+    def work() -> None:
+        queue = JobQueue(file)
+        while (job := queue.claim()) is not None:
+            claimed.append(job.id)
+            queue.complete(job.id)
+
+    workers = [threading.Thread(target=work) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert sorted(claimed) == list(range(1, 51))
+    assert JobQueue(file).stats().done == 50
+
+
+def test_retry_with_backoff(tmp_path: Path) -> None:
+    clock = Clock()
+    queue = JobQueue(
+        tmp_path / 'jobs.db', max_attempts=2, backoff=10, clock=clock
+    )
+    job_id = queue.submit({'gap': 1})
+
+    job = queue.claim()
+    assert job is not None
+    queue.fail(job.id, 'diverged')
+    assert queue.claim() is None
+
+    clock.now = 10
+    job = queue.claim()
+    assert job is not None and job.attempts == 2
+    queue.fail(job.id, 'diverged')
+
+    failed = queue.get(job_id)
+    assert failed.status == 'failed'
+    assert failed.error == 'diverged'
+    assert queue.stats().retries == 1
+
+
+def test_resume_skips_done_and_recovers_running(tmp_path: Path) -> None:
+    file = tmp_path / 'jobs.db'
+    clock = Clock()
+    queue = JobQueue(file, backoff=0, clock=clock)
+    queue.submit_all({'i': i} for i in range(3))
+
+    done = queue.claim()
+    assert done is not None
+    queue.complete(done.id, 'store')
+    assert queue.claim() is not None  # Processo interrompido.
+    queue.close()
+
+    resumed = JobQueue(file, backoff=0, lease=60, clock=clock)
+    # O trabalho ainda pode estar em execução por outro processo.
+    assert resumed.recover() == []
+    clock.now = 60
+    assert len(resumed.recover()) == 1
+
+    solved: list[dict[str, float]] = []
+
+    def solve(params: dict[str, float]) -> str:
+        solved.append(params)
+        return 'store'
+
+    assert resumed.run(solve) == 2
+    assert sorted(params['i'] for params in solved) == [1, 2]
+    assert resumed.get(done.id).result == 'store'
+
+
+def test_run_records_exceptions(tmp_path: Path) -> None:
+    queue = JobQueue(tmp_path / 'jobs.db', max_attempts=1)
+    job_id = queue.submit({'gap': 1})
+
+    def solve(params: dict[str, float]) -> str:
+        raise RuntimeError('mesh failed')
+
+    assert queue.run(solve) == 0
+    assert 'mesh failed' in (queue.get(job_id).error or '')
+    with pytest.raises(KeyError):
+        queue.get(job_id + 1)
+
+
+def test_complete_requires_owner(tmp_path: Path) -> None:
+    clock = Clock()
+    queue = JobQueue(tmp_path / 'jobs.db', backoff=0, lease=60, clock=clock)
+    job_id = queue.submit({'gap': 1})
+
+    assert queue.claim('slow') is not None
+    assert not queue.complete(job_id, 'store', 'other')
+
+    # O trabalho é devolvido à fila e reservado por outro processo antes que
+    # o primeiro termine.
+    clock.now = 60
+    assert queue.recover() == [job_id]
+    assert queue.claim('fast') is not None
+    assert not queue.complete(job_id, 'slow store', 'slow')
+    assert not queue.fail(job_id, 'late', 'slow')
+
+    assert queue.complete(job_id, 'fast store', 'fast')
+    assert not queue.complete(job_id, 'again', 'fast')
+    job = queue.get(job_id)
+    assert (job.status, job.result, job.attempts) == ('done', 'fast store', 2)
+
+
+def test_default_workers_are_distinct(tmp_path: Path) -> None:
+    clock = Clock()
+    file = tmp_path / 'jobs.db'
+    stale = JobQueue(file, backoff=0, lease=60, clock=clock)
+    current = JobQueue(file, backoff=0, lease=60, clock=clock)
+    job_id = stale.submit({'gap': 1})
+
+    assert stale.worker != current.worker
+    assert stale.claim() is not None
+    clock.now = 60
+    assert current.recover() == [job_id]
+    assert current.claim() is not None
+
+    # Sem nomes explícitos, o resultado atrasado ainda é descartado.
+    assert not stale.complete(job_id, 'stale store')
+    assert current.complete(job_id, 'store')
+    assert current.get(job_id).result == 'store'
@@ -0,0 +1,63 @@
+import math
+from dataclasses import replace
+
+import numpy as np
+import pytest
+from src.femmlib.losses import SteinmetzCoefficients, core_losses
+
+from tests.solutions import grid_solution
+
+STEINMETZ = SteinmetzCoefficients(k=1.5, alpha=1.3, beta=2.1)
+
+
+def test_sinusoidal_igse_matches_steinmetz() -> None:
+    theta = np.linspace(0, 2 * np.pi, 1000, endpoint=False)
+
+    assert STEINMETZ.waveform_factor(np.sin(theta)) == pytest.approx(
+        STEINMETZ.k, rel=1e-4
+    )
+
+
+def test_core_losses() -> None:
+    b0, freq = 1.2, 60
+    solution = grid_solution(20, 1, b0=b0, j=0)
+
+    losses = core_losses(solution, {'Pure Iron': STEINMETZ}, freq=freq)
+
+    expected = STEINMETZ.density(freq, np.array(b0)) * 1
+    assert losses.total == pytest.approx(expected)
+    assert losses.blocks == pytest.approx([0, expected])
+    assert losses.elements.shape == (len(solution.elements),)
+
+
+def test_freq_defaults_to_solution() -> None:
+    solution = replace(grid_solution(4, 1, b0=1, j=0), freq=60)
+    coefficients = {'Pure Iron': STEINMETZ}
+
+    assert core_losses(solution, coefficients).total == pytest.approx(
+        core_losses(solution, coefficients, freq=60).total
+    )
+    assert core_losses(solution, coefficients, freq=0).total == 0
+
+
+def test_triangular_waveform_losses() -> None:
+    solution = grid_solution(4, 1, b0=1, j=0)
+    tau = np.linspace(0, 1, 1000, endpoint=False)
+    triangle = 1 - 4 * np.abs(tau - 0.5)
+    sine = np.sin(2 * np.pi * tau)
+
+    coefficients = {'Pure Iron': STEINMETZ}
+    triangular = core_losses(solution, coefficients, triangle, 60).total
+    sinusoidal = core_losses(solution, coefficients, sine, 60).total
+
+    # Com o mesmo pico, |dB/dt| da onda triangular é constante, 4f, e o da
+    # senoide é 2πf|cos(θ)|, cuja média da potência α é dada pela função
+    # gama. Para α < 2, a onda triangular tem menos perdas.
+    alpha = STEINMETZ.alpha
+    mean_cos = math.gamma((alpha + 1) / 2) / (
+        math.sqrt(math.pi) * math.gamma(alpha / 2 + 1)
+    )
+    ratio = 4**alpha / ((2 * math.pi) ** alpha * mean_cos)
+    # Os vértices amostrados da onda triangular têm derivada nula.
+    assert triangular / sinusoidal == pytest.approx(ratio, rel=5e-3)
+    assert triangular < sinusoidal
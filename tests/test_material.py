@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from src.femmlib import material
+from src.femmlib.material import (
+    Material,
+    MaterialRegistry,
+    read_library,
+    write_library,
+)
+
+LIBRARY = [
+    Material('Ferrite', mu_x=2000, mu_y=2000, conductivity=0.5),
+    Material(
+        'Steel',
+        lam_fill=0.95,
+        lam_type=0,
+        bh_points=np.array([[0, 0], [1, 300], [1.5, 2000], [1.8, 20000]]),
+    ),
+]
+
+
+@pytest.mark.parametrize('suffix', ['.csv', '.npz'])
+def test_library_round_trip(tmp_path: Path, suffix: str) -> None:
+    file = tmp_path / f'library{suffix}'
+    write_library(file, LIBRARY)
+    materials = read_library(file)
+
+    assert list(materials) == ['Ferrite', 'Steel']
+    assert materials['Ferrite'].props() == LIBRARY[0].props()
+    assert len(materials['Ferrite'].bh_points) == 0
+    assert np.array_equal(materials['Steel'].bh_points, LIBRARY[1].bh_points)
+    assert isinstance(materials['Steel'].lam_type, int)
+
+
+def test_registry_loads_each_material_once(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    scripts: list[str] = []
+    builtins: list[str] = []
+
+    def run(code: str, name: str) -> None:
+        scripts.append(code)
+
+    monkeypatch.setattr(material.lua, 'run', run)
+    monkeypatch.setattr(material.femm, 'mi_getmaterial', builtins.append)
+
+    registry = MaterialRegistry()
+    registry.register(LIBRARY)
+    registry.ensure('Air')
+    registry.ensure('Air', 'Steel', 'Ferrite', 'Pure Iron')
+    registry.ensure('Steel')
+
+    assert builtins == ['Air']
+    assert len(scripts) == 1
+    assert scripts[0].count('mi_addmaterial(') == 2
+    assert 'mi_getmaterial("Pure Iron")' in scripts[0]
+    assert 'mi_addbhpoint("Steel", b[i], h[i])' in scripts[0]
+
+    document = tmp_path / 'model.FEM'
+    document.write_text('<BeginBlock>\n  <BlockName> = "Steel"\n<EndBlock>\n')
+    registry.reset(document)
+    registry.ensure('Steel')
+    assert len(scripts) == 1
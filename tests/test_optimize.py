@@ -0,0 +1,99 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from src.femmlib.circuit import CircuitProps, CircuitPropsExtended
+from src.femmlib.optimize import (
+    Evaluator,
+    Parameter,
+    k_section,
+    minimize,
+    nelder_mead,
+    target,
+)
+from src.femmlib.store import ResultStore
+
+
+def gapped_inductor(params: dict[str, float]) -> CircuitPropsExtended:
+    """Indutância inversamente proporcional ao entreferro, em mm."""
+    inductance = 1e-3 / (0.1 + params['gap'])
+    return CircuitProps(1, 0, inductance).with_extension(10, 1e-4)
+
+
+def bowl(params: dict[str, float]) -> CircuitPropsExtended:
+    inductance = 1e-3 * (
+        1 + (params['gap'] - 0.3) ** 2 + 2 * (params['width'] - 0.7) ** 2
+    )
+    return CircuitProps(1, 0, inductance).with_extension(10, 1e-4)
+
+
+def test_k_section_finds_gap_for_target_inductance() -> None:
+    with ThreadPoolExecutor(4) as executor:
+        evaluate = Evaluator(gapped_inductor, executor)
+        result = k_section(
+            evaluate,
+            Parameter('gap', 0.01, 2),
+            target('inductance', 2e-3),
+            batch=4,
+            tolerance=1e-6,
+        )
+
+    assert result.params['gap'] == pytest.approx(0.4, rel=1e-5)
+    assert result.props.inductance == pytest.approx(2e-3, rel=1e-5)
+    assert result.history == sorted(result.history, reverse=True)
+    assert evaluate.solves <= 4 * result.iterations + 2
+
+
+def test_nelder_mead_respects_bounds() -> None:
+    evaluate = Evaluator(bowl)
+    result = nelder_mead(
+        evaluate,
+        [Parameter('gap', 0, 1), Parameter('width', 0, 0.5)],
+        minimize('inductance'),
+        tolerance=1e-8,
+    )
+
+    assert result.params['gap'] == pytest.approx(0.3, abs=1e-3)
+    assert result.params['width'] == pytest.approx(0.5, abs=1e-3)
+    assert evaluate.hits > 0
+
+
+def test_evaluator_reuses_store(tmp_path: Path) -> None:
+    points = [{'gap': 0.1 * i} for i in range(1, 4)]
+
+    with ResultStore(tmp_path, ['gap']) as store:
+        first = Evaluator(gapped_inductor, store=store)
+        first(points)
+        assert (first.solves, first.hits) == (3, 0)
+
+    second = Evaluator(gapped_inductor, store=ResultStore(tmp_path))
+    results = second([*points, {'gap': 0.5}])
+
+    assert (second.solves, second.hits) == (1, 3)
+    assert results[0].inductance == pytest.approx(5e-3)
+
+
+def harmonic_inductor(params: dict[str, float]) -> CircuitPropsExtended:
+    """Bobina com resistência: a tensão e o fluxo concatenado são complexos."""
+    inductance = 1e-3 / (0.1 + params['gap'])
+    return CircuitProps(
+        1, complex(0.5, 377 * inductance), inductance - 1e-5j
+    ).with_extension(10, 1e-4)
+
+
+def test_evaluator_stores_harmonic_props(tmp_path: Path) -> None:
+    with ResultStore(tmp_path, ['gap'], chunk_size=2) as store:
+        result = k_section(
+            Evaluator(harmonic_inductor, store=store),
+            Parameter('gap', 0.01, 2),
+            target('inductance', 2e-3),
+            tolerance=1e-3,
+        )
+
+    assert result.params['gap'] == pytest.approx(0.4, rel=1e-3)
+
+    evaluate = Evaluator(harmonic_inductor, store=ResultStore(tmp_path))
+    (props,) = evaluate([result.params])
+    assert (evaluate.solves, evaluate.hits) == (0, 1)
+    assert tuple(props) == pytest.approx(tuple(result.props))
+    assert complex(props.flux_linkage).imag == pytest.approx(-1e-5)
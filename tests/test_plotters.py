@@ -0,0 +1,109 @@
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+import matplotlib.pyplot as plt
+import numpy as np
+from src.femmlib.circuit import CircuitPropsExtended
+from src.femmlib.store import ResultStore
+from src.plotting.plotters import Chart, Plotter, PlotterBuilder, store_charts
+
+PNG = b'\x89PNG'
+
+
+def builder() -> PlotterBuilder:
+    # O estilo padrão do Matplotlib não depende do SciencePlots.
+    return Plotter.builder().with_style('default')
+
+
+def charts(folder: Path, n: int) -> list[Chart]:
+    x = np.linspace(0, 1, 10)
+    return [
+        Chart(x, x**2 + i, x**2, folder / f'chart_{i}.png') for i in range(n)
+    ]
+
+
+def test_plot_all(tmp_path: Path) -> None:
+    plotter = builder().with_labels('x', 'y').with_dpi(50).build()
+    files = plotter.plot_all(charts(tmp_path, 3))
+
+    assert [file.name for file in files] == [
+        f'chart_{i}.png' for i in range(3)
+    ]
+    assert all(file.read_bytes().startswith(PNG) for file in files)
+    assert plotter.figure is not None
+    assert len(plotter.figure.axes[0].lines) == 2
+
+
+def test_plot_all_processes(tmp_path: Path) -> None:
+    plotter = builder().with_dpi(50).with_processes(2).build()
+    files = plotter.plot_all(charts(tmp_path, 5), batch=2)
+
+    assert len(files) == 5
+    assert all(file.exists() for file in files)
+    assert plotter.figure is None
+
+
+def test_store_charts(tmp_path: Path) -> None:
+    with ResultStore(tmp_path / 'store', ['gap', 'amps']) as store:
+        for amps in (1, 2):
+            for gap in (3, 1, 2):
+                props = CircuitPropsExtended(
+                    amps, 0, gap, gap, 1, 1, 1, gap * 2
+                )
+                store.append({'gap': gap, 'amps': amps}, props)
+
+    result = list(
+        store_charts(store, 'gap', 'inductance', 'flux', tmp_path, by='amps')
+    )
+
+    assert [Path(chart.file).name for chart in result] == [
+        'amps_1.0.png',
+        'amps_2.0.png',
+    ]
+    assert np.array_equal(result[0].base_value, [1, 2, 3])
+    assert np.array_equal(result[1].experimental, [2, 4, 6])
+
+
+def test_batch_benchmark(
+    tmp_path: Path, record_property: Callable[[str, object], None]
+) -> None:
+    data = charts(tmp_path, 10)
+    plotter = builder().with_labels('x', 'y').build()
+
+    # Carrega as fontes e o estilo antes das medições.
+    plotter.plot(data[0])
+
+    def measure(save: Callable[[Chart], object]) -> float:
+        """Mediana do tempo por gráfico, em segundos."""
+        times: list[float] = []
+        for chart in data:
+            start = time.perf_counter()
+            save(chart)
+            times.append(time.perf_counter() - start)
+
+        return float(np.median(times))
+
+    def single(chart: Chart) -> None:
+        """Uma figura nova por gráfico, como em `plot()`."""
+        figure, ax = plt.subplots()
+        ax.plot(chart.base_value, chart.experimental, '--o')
+        ax.plot(chart.base_value, chart.theoretical, ':o')
+        ax.set_xlabel('x')
+        ax.set_ylabel('y')
+        figure.savefig(chart.file, dpi=200)
+        plt.close(figure)
+
+    single_time = measure(single)
+    figure = plotter.figure
+    opened = len(plt.get_fignums())
+    batch = measure(plotter.plot)
+
+    record_property('single_ms_per_chart', round(single_time * 1e3, 1))
+    record_property('batch_ms_per_chart', round(batch * 1e3, 1))
+
+    # O tempo depende da máquina e só é registrado. O lote não cria
+    # figuras novas.
+    assert plotter.figure is figure
+    assert len(plt.get_fignums()) == opened
+    plt.close('all')
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from src.femmlib import block
+from src.femmlib.block import BlockBuilder, place_blocks
+from src.femmlib.structure import Structure
+from src.mathlib.polylabel import polylabel, signed_distance
+from src.mathlib.vector2 import Vector2
+
+RECTANGLE = [(0, 0), (4, 0), (4, 1), (0, 1)]
+L_SHAPE = [(0, 0), (3, 0), (3, 1), (1, 1), (1, 3), (0, 3)]
+
+
+def test_signed_distance() -> None:
+    rings = [np.array(RECTANGLE, dtype=np.float64)]
+    points = np.array([[2, 0.5], [2, 0.9], [5, 0.5]])
+
+    assert np.allclose(signed_distance(points, rings), [0.5, 0.1, -1])
+
+
+def test_rectangle() -> None:
+    point, distance = polylabel(RECTANGLE)
+
+    assert distance == pytest.approx(0.5, abs=1e-5)
+    assert point[1] == pytest.approx(0.5, abs=1e-5)
+    assert 0.5 <= point[0] <= 3.5
+
+
+def test_concave_polygon() -> None:
+    # O centroide do L fica fora da região.
+    point, distance = polylabel(L_SHAPE)
+    radius = np.sqrt(2) / (1 + np.sqrt(2))
+
+    assert distance == pytest.approx(radius, abs=1e-5)
+    assert np.allclose(point, radius, atol=1e-4)
+
+
+def test_polygon_with_hole() -> None:
+    outer = [(0, 0), (6, 0), (6, 6), (0, 6)]
+    hole = [(2, 2), (4, 2), (4, 4), (2, 4)]
+    point, distance = polylabel(outer, [hole])
+
+    assert distance > 1
+    assert signed_distance(
+        point[None, :],
+        [np.array(outer, dtype=np.float64), np.array(hole, dtype=np.float64)],
+    )[0] == pytest.approx(distance)
+
+
+def test_place_blocks(monkeypatch: pytest.MonkeyPatch) -> None:
+    scripts: list[str] = []
+
+    def run(code: str, name: str) -> None:
+        scripts.append(code)
+
+    def ensure(*names: str) -> None:
+        pass
+
+    monkeypatch.setattr(block.lua, 'run', run)
+    monkeypatch.setattr(block.material.registry, 'ensure', ensure)
+
+    regions = [
+        (
+            Structure([Vector2(*node) for node in L_SHAPE], 'closed loop'),
+            BlockBuilder('Pure Iron').with_group(1),
+        ),
+        (
+            Structure([Vector2(5, 0), Vector2(7, 0)], 'circle'),
+            BlockBuilder('18 AWG').with_circuit_name('coil').with_turns(10),
+        ),
+    ]
+    blocks = place_blocks(regions)
+
+    assert len(scripts) == 1
+    assert scripts[0].count('mi_setblockprop') == 2
+    assert tuple(blocks[1].position) == (6, 0)
+    assert blocks[0].position.x == pytest.approx(0.586, abs=1e-3)
+    assert '"coil", 0, 0, 10)' in scripts[0]
+
+
+def test_open_loop_has_no_interior() -> None:
+    structure = Structure([Vector2(0, 0), Vector2(1, 0)], 'open loop')
+
+    with pytest.raises(ValueError):
+        place_blocks([(structure, BlockBuilder('Air'))])
@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from src.femmlib.figure import FigureBuilder
+from src.femmlib.render import density, render, render_sweep, vectors
+from src.femmlib.solution import Solution
+
+from tests.solutions import ANS, grid_solution
+
+PNG = b'\x89PNG'
+
+
+def test_density() -> None:
+    solution = Solution.read_text(ANS)
+
+    assert density(solution, 'bmag') == pytest.approx([50, 50])
+    assert density(solution, 'logb') == pytest.approx(np.log10([50, 50]))
+    assert density(solution, 'bimag') == pytest.approx([0, 0])
+    # Dez voltas de 2 A em 0.5 cm².
+    assert density(solution, 'jmag') == pytest.approx([0, 0.4])
+    # O segundo bloco é de um material não linear.
+    assert np.isnan(density(solution, 'hmag')[1])
+
+
+def test_vectors() -> None:
+    solution = Solution.read_text(ANS)
+
+    assert vectors(solution, 0) == []
+    assert len(vectors(solution, 5)) == 2
+    assert vectors(solution, 1)[0] == pytest.approx(np.array([[50, 0]] * 2))
+
+
+def test_render(tmp_path: Path) -> None:
+    figure = (
+        FigureBuilder()
+        .with_density_plot_type('bmag')
+        .with_density_display_bounds(0, 2)
+        .with_vector_plot_type(1)
+        .with_legend()
+        .build()
+    )
+    file = render(
+        grid_solution(20, 1, b0=1, j=1e6), figure, tmp_path / 'b.png'
+    )
+
+    assert file.read_bytes().startswith(PNG)
+
+
+def test_render_sweep(tmp_path: Path) -> None:
+    for i in range(3):
+        (tmp_path / f'variant_{i}.ans').write_text(ANS)
+
+    figure = FigureBuilder().with_density_plot_type('jmag').build()
+    frames = render_sweep(tmp_path, figure, tmp_path / 'frames', processes=2)
+
+    assert [frame.name for frame in frames] == [
+        f'variant_{i}.png' for i in range(3)
+    ]
+    assert all(frame.read_bytes().startswith(PNG) for frame in frames)
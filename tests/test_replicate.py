@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+from src.femmlib import structure
+from src.femmlib.air_gap import AirGap
+from src.femmlib.core import FEMM
+from src.femmlib.structure import Structure, StructureBuilder
+from src.mathlib.vector2 import Vector2
+
+SLOT = [Vector2(1, -0.1), Vector2(2, -0.1), Vector2(2, 0.1), Vector2(1, 0.1)]
+
+
+@pytest.fixture
+def scripts(monkeypatch: pytest.MonkeyPatch) -> list[str]:
+    scripts: list[str] = []
+
+    def run(code: str, name: str) -> None:
+        scripts.append(code)
+
+    monkeypatch.setattr(structure.lua, 'run', run)
+    return scripts
+
+
+def test_replicate_polar(scripts: list[str]) -> None:
+    groups = iter(range(2, 13))
+    slot = Structure(SLOT, 'closed loop', 1)
+    slots = slot.replicate_polar(12, groups.__next__)
+
+    assert len(slots) == 12
+    assert [s.group for s in slots] == list(range(1, 13))
+    assert len(scripts) == 1
+    assert scripts[0].count('mi_copyrotate2') == 1
+    assert scripts[0].count('mi_setgroup') == 11
+    assert 'mi_copyrotate2(0, 0, 30, 11, 4)' in scripts[0]
+
+    # (1, -0.1) girado 90 graus.
+    assert tuple(slots[3].nodes[0]) == pytest.approx((0.1, 1))
+
+
+def test_replicate_linear(scripts: list[str]) -> None:
+    groups = iter([10, 20])
+    layer = Structure([Vector2(0, 0), Vector2(1, 0)], 'circle', 5)
+    layers = layer.replicate_linear(3, (0, 2), new_group=groups.__next__)
+
+    assert [s.group for s in layers] == [5, 10, 20]
+    assert tuple(layers[2].nodes[1]) == (1, 4)
+    assert scripts[0].count('mi_copytranslate2(0, 2, 2, 4)') == 1
+    assert scripts[0].count('mi_selectarcsegment') == 4
+
+
+def test_replicate_uses_document_groups(scripts: list[str]) -> None:
+    document = FEMM('magnetics')
+    slot = Structure(SLOT, 'closed loop', document.new_group())
+    # Grupo seguinte, já usado por outra estrutura do documento.
+    yoke = document.new_group()
+
+    slots = slot.replicate_polar(4, document.new_group)
+
+    assert [s.group for s in slots] == [1, 3, 4, 5]
+    assert yoke not in {s.group for s in slots}
+    assert document.groups == {1, 2, 3, 4, 5}
+    assert document.new_group() == 6
+
+
+def test_replicate_requires_group(scripts: list[str]) -> None:
+    document = FEMM('magnetics')
+    with pytest.raises(AssertionError):
+        Structure(SLOT, 'closed loop').replicate_polar(4, document.new_group)
+
+    slot = Structure(SLOT, 'closed loop', 1)
+    with pytest.raises(AssertionError, match='new group'):
+        slot.replicate_linear(3, (0, 1), lambda: 1)
+    assert scripts == []
+
+
+def test_build_array(scripts: list[str]) -> None:
+    # A mesma classe importada por `structure`, pelo caminho `mathlib`.
+    nodes = structure.Vector2Array(
+        np.column_stack((np.arange(1000.0), np.zeros(1000)))
+    )
+    polyline = (
+        StructureBuilder(nodes).with_connect_method('closed loop').build()
+    )
+
+    assert polyline.nodes is nodes
+    assert len(scripts) == 1
+    assert 'mi_addsegment(x[1000], y[1000], x[1], y[1])' in scripts[0]
+    assert Structure(nodes, 'closed loop').selection()[-1] == (
+        'mi_selectsegment(499.5, 0)'
+    )
+
+
+def test_builders_copy_vectors() -> None:
+    corner = Vector2(0, 0)
+    builder = StructureBuilder([corner, Vector2(1, 0)])
+    gap = AirGap.builder(
+        upper_left=corner,
+        upper_right=(1, 0),
+        lower_left=(0, -1),
+        lower_right=(1, -1),
+    ).build()
+
+    # O `Vector2` é mutável e continua com quem o criou.
+    corner.x = 5
+    assert tuple(builder.nodes[0]) == (0, 0)
+    assert tuple(gap.upper_left) == (0, 0)
@@ -0,0 +1,92 @@
+import math
+
+import numpy as np
+import pytest
+from src.femmlib import rotor
+from src.femmlib.boundary import Boundary, BoundaryProps
+from src.femmlib.circuit import Circuit
+from src.femmlib.rotor import RotorSweep
+
+COIL = Circuit('A', 1, 1)
+
+
+@pytest.fixture
+def calls(monkeypatch: pytest.MonkeyPatch) -> list[tuple[str, int, float]]:
+    """
+    Substitui o FEMM por um rotor cujo fluxo concatenado acompanha o
+    ângulo interno da fronteira.
+    """
+    calls: list[tuple[str, int, float]] = []
+
+    def modify(name: str, prop: int, value: float) -> None:
+        calls.append((name, prop, value))
+
+    def angle() -> float:
+        return math.radians(
+            next(value for _, prop, value in reversed(calls) if prop == 10)
+        )
+
+    def torque(name: str, kind: int) -> float:
+        return math.sin(angle())
+
+    def props(name: str) -> tuple[float, float, complex]:
+        return (1, 0, complex(math.cos(angle()), math.sin(angle())))
+
+    femm = rotor.femm
+    monkeypatch.setattr(femm, 'mi_modifyboundprop', modify)
+    monkeypatch.setattr(femm, 'mi_analyze', lambda: None)
+    monkeypatch.setattr(femm, 'mi_loadsolution', lambda: None)
+    monkeypatch.setattr(femm, 'mo_close', lambda: None)
+    monkeypatch.setattr(femm, 'mo_gapintegral', torque)
+    monkeypatch.setattr(femm, 'mo_getcircuitproperties', props)
+    return calls
+
+
+def gap() -> Boundary:
+    return Boundary('gap', BoundaryProps((0, 0, 0), 0, 0, 0, 0, 0, 6, 5, 0))
+
+
+def test_sweep_sets_boundary_angles(
+    calls: list[tuple[str, int, float]],
+) -> None:
+    boundary = gap()
+    result = (
+        RotorSweep.builder(boundary)
+        .with_steps(4, stop=90)
+        .with_output(COIL)
+        .with_freq(60)
+        .build()
+        .run()
+    )
+
+    np.testing.assert_allclose(result.angles, [0, 22.5, 45, 67.5])
+    # Ângulo interno (10) e externo (11) de cada posição e a restauração.
+    assert calls == [
+        ('gap', prop, value)
+        for inner in (5, 27.5, 50, 72.5, 5)
+        for prop, value in ((10, inner), (11, 0))
+    ]
+    assert boundary.props.inner_angle == 5
+    np.testing.assert_allclose(
+        result.torque, np.sin(np.radians(result.angles + 5))
+    )
+
+
+def test_harmonic_flux_linkage_is_complex(
+    calls: list[tuple[str, int, float]],
+) -> None:
+    result = (
+        RotorSweep.builder(gap())
+        .with_steps(8)
+        .with_output(COIL)
+        .with_freq(60)
+        .build()
+        .run()
+    )
+
+    flux_linkage = result.flux_linkage['A']
+    assert flux_linkage.dtype == np.complex128
+    np.testing.assert_allclose(
+        flux_linkage, np.exp(1j * np.radians(result.angles + 5))
+    )
+    assert result.back_emf('A', 60).dtype == np.complex128
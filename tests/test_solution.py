@@ -0,0 +1,191 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from src.femmlib.force import MaxwellStress
+from src.femmlib.integral import BlockIntegral, Integrals, LineIntegral
+from src.femmlib.solution import Solution, sweep_circuit_props
+from src.femmlib.structure import Structure
+from src.mathlib.electromagnetics import VACUUM_PERMEABILITY
+from src.mathlib.vector2 import Vector2
+
+from tests.solutions import ANS, grid_solution
+
+
+def test_read() -> None:
+    solution = Solution.read_text(ANS)
+
+    assert solution.freq == 0
+    assert solution.depth == 2
+    assert solution.unit == 'centimeters'
+    assert [m.name for m in solution.materials] == ['Air', 'Pure Iron']
+    assert not solution.materials[1].is_linear()
+    assert solution.circuits[0].name == 'coil'
+    assert solution.circuits[0].current == 2
+    assert [label.group for label in solution.labels] == [0, 1]
+    assert solution.labels[1].circuit == 0
+    assert solution.nodes.shape == (4, 2)
+    assert solution.elements.tolist() == [[0, 1, 2], [0, 2, 3]]
+    assert solution.element_groups().tolist() == [0, 1]
+    assert solution.areas() == pytest.approx([0.5e-4, 0.5e-4])
+
+
+def test_potential_type_follows_frequency() -> None:
+    # Colunas extras nos nós não tornam o potencial complexo.
+    static = Solution.read_text(
+        ANS.replace('0 0 0\n', '0 0 0 7\n')
+        .replace('1 0 0\n', '1 0 0 7\n')
+        .replace('1 1 0.5\n', '1 1 0.5 7\n')
+        .replace('0 1 0.5\n', '0 1 0.5 7\n')
+    )
+    assert static.potential.dtype == np.float64
+    assert static.potential.tolist() == [0, 0, 0.5, 0.5]
+
+    harmonic = Solution.read_text(
+        ANS.replace('[Frequency]   =  0', '[Frequency]   =  60')
+        .replace('0 0 0\n', '0 0 0 0\n')
+        .replace('1 0 0\n', '1 0 0 0\n')
+        .replace('1 1 0.5\n', '1 1 0.5 -1\n')
+        .replace('0 1 0.5\n', '0 1 0.5 -1\n')
+    )
+    assert harmonic.potential.tolist() == [0, 0, 0.5 - 1j, 0.5 - 1j]
+
+
+def test_flux_density() -> None:
+    solution = Solution.read_text(ANS)
+
+    # A = 0.5 * y em Wb/m, com y em centímetros.
+    assert solution.flux_density == pytest.approx(np.array([[50, 0]] * 2))
+
+
+def test_maxwell_stress_without_current_is_null() -> None:
+    solution = grid_solution(20, 1, b0=1, j=0)
+    fx, fy, torque = MaxwellStress([1]).measure_from(solution)[0]
+
+    assert abs(fx) < 1e-6
+    assert abs(fy) < 1e-6
+    assert abs(torque) < 1e-6
+
+
+def test_maxwell_stress_lorentz_force() -> None:
+    b0, j, a = 0.5, 1e4, 1
+    # A corrente também existe na camada de ponderação, que fica mais fina
+    # conforme a malha é refinada.
+    solution = grid_solution(200, a, b0=b0, j=j)
+    stress = MaxwellStress([1])
+    stress.measure_from(solution)
+    result = stress.sweep([solution])
+
+    # Força de Lorentz J x B sobre o quadrado central.
+    assert result.fx.shape == (1, 1)
+    assert len(stress.result().fx) == 1
+    assert result.fx[0, 0] == pytest.approx(0, abs=1e-3 * j * b0)
+    assert result.fy[0, 0] == pytest.approx(j * b0 * a**2, rel=0.03)
+
+
+def test_sample() -> None:
+    solution = grid_solution(10, 1, b0=2, j=0)
+
+    line = solution.sample_line((-0.95, -0.5), (0.95, 0.5), 7)
+    assert line.shape == (7, 2)
+    assert line == pytest.approx(np.array([[2, 0]] * 7))
+
+    grid = solution.sample_grid(((-1, -1), (1, 1)), 4, 3)
+    assert grid.shape == (3, 4, 2)
+    assert grid == pytest.approx(np.full((3, 4, 2), [2, 0]))
+
+    outside = solution.sample(np.array([[5.0, 5.0], [0.1, 0.1]]))
+    assert np.isnan(outside[0]).all()
+    assert outside[1] == pytest.approx([2, 0])
+
+
+def test_locate() -> None:
+    solution = grid_solution(10, 1, b0=1, j=0)
+    points = np.random.default_rng(0).uniform(-1, 1, (500, 2))
+
+    elements = solution.locate(points)
+    weights = solution.barycentric(points, elements)
+
+    assert (elements >= 0).all()
+    assert (weights > -1e-9).all()
+    assert weights.sum(axis=1) == pytest.approx(np.ones(len(points)))
+
+
+def test_integrals() -> None:
+    b0 = 2
+    solution = grid_solution(10, 1, b0=b0, j=0)
+    contour = Structure([Vector2(-0.5, -0.5), Vector2(-0.5, 0.5)], 'open loop')
+    integrals = Integrals(
+        [
+            BlockIntegral('core area', [1], 'area'),
+            BlockIntegral('air energy', [0], 'energy'),
+            BlockIntegral('by', [0, 1], 'by'),
+            LineIntegral('flux', contour, 'flux'),
+            LineIntegral('length', contour, 'length'),
+        ]
+    )
+
+    result = integrals.sweep([solution, solution])
+
+    assert result.values.shape == (2, 5)
+    assert result['core area'] == pytest.approx([1, 1])
+    assert result['air energy'][0] == pytest.approx(
+        b0**2 / (2 * VACUUM_PERMEABILITY) * 3
+    )
+    assert result['by'][0] == pytest.approx(0)
+    assert result['flux'][0] == pytest.approx(b0)
+    assert result['length'][0] == pytest.approx(1)
+    # Cada varredura é independente dos pontos já avaliados.
+    assert integrals.sweep([solution]).values.shape == (1, 5)
+    assert len(integrals.result().values) == 0
+
+    with pytest.raises(NotImplementedError):
+        Integrals([BlockIntegral('iron', [1], 'energy')]).measure_from(
+            solution
+        )
+
+
+def test_circuit_props() -> None:
+    solution = grid_solution(10, 1, b0=0, j=0)
+    solution.potential = np.full(len(solution.nodes), 0.01)
+
+    props = solution.circuit_props()['coil']
+    assert props.current == 2
+    assert props.voltage == 0
+    assert props.flux_linkage == pytest.approx(10 * 0.01)
+
+    extended = solution.circuit_props_extended(area=1)['coil']
+    assert extended.flux == pytest.approx(0.01)
+    assert extended.inductance == pytest.approx(0.05)
+
+
+def test_parallel_circuit_props() -> None:
+    solution = grid_solution(10, 1, b0=0, j=0)
+    solution.potential = solution.nodes[:, 0] ** 2
+    # Os dois blocos pertencem à bobina: o externo com uma volta e o
+    # interno com dez.
+    solution.labels[0].circuit = 0
+    element_potential = solution.potential[solution.elements].mean(axis=1)
+    inner = solution.element_labels == 1
+
+    series = solution.circuit_props()['coil']
+    assert series.flux_linkage == pytest.approx(
+        element_potential[~inner].mean() + 10 * element_potential[inner].mean()
+    )
+
+    # Em paralelo, as voltas são ignoradas e os blocos formam um único
+    # condutor.
+    solution.circuits[0].type = 0
+    parallel = solution.circuit_props()['coil']
+    assert parallel.flux_linkage == pytest.approx(element_potential.mean())
+
+
+def test_sweep_circuit_props(tmp_path: Path) -> None:
+    for i in range(3):
+        (tmp_path / f'variant_{i}.ans').write_text(ANS)
+
+    props = sweep_circuit_props(tmp_path, area=1e-4)
+
+    assert len(props['coil']) == 3
+    # Dez voltas, 2 cm de profundidade e potencial médio de 0.5 / 3 Wb/m.
+    assert props['coil'][0].flux_linkage == pytest.approx(10 * 0.02 / 3)
@@ -0,0 +1,87 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from src.femmlib.circuit import CircuitProps, CircuitPropsExtended
+from src.femmlib.store import ResultStore
+
+
+def props(current: float) -> CircuitPropsExtended:
+    return CircuitProps(current, 0, 2 * current).with_extension(10, 1e-4)
+
+
+def ac_props(current: float) -> CircuitPropsExtended:
+    return CircuitProps(
+        complex(current, 0), complex(0, 377 * current), complex(current, -1)
+    ).with_extension(10, 1e-4)
+
+
+def test_append_and_read(tmp_path: Path) -> None:
+    with ResultStore(tmp_path, ['gap'], chunk_size=4) as store:
+        for i in range(10):
+            store.append({'gap': i / 10}, props(i + 1))
+
+        assert len(store) == 10
+        assert len(store.chunk_files()) == 2
+
+    assert len(store.chunk_files()) == 3
+    assert (store.load(['gap'])['gap'] == np.arange(10) / 10).all()
+    assert all((column == 2).all() for column in store.column('inductance'))
+
+    rows = store.load(['gap', 'current'])
+    assert rows.dtype.names == ('gap', 'current')
+    assert rows['current'].tolist() == list(range(1, 11))
+
+
+def test_read_is_memory_mapped(tmp_path: Path) -> None:
+    with ResultStore(tmp_path, ['gap'], chunk_size=4) as store:
+        for i in range(10):
+            store.append({'gap': i}, props(i + 1))
+
+    chunks = list(store.read(['gap', 'mmf']))
+
+    assert [len(chunk) for chunk in chunks] == [4, 4, 2]
+    assert all(isinstance(chunk, np.memmap) for chunk in chunks)
+    assert chunks[1]['mmf'].tolist() == [50, 60, 70, 80]
+    # Os blocos são escritos em um arquivo temporário e renomeados.
+    assert not list(tmp_path.glob('*.tmp'))
+
+
+def test_reopen_appends(tmp_path: Path) -> None:
+    with ResultStore(tmp_path, ['gap']) as store:
+        store.append({'gap': 1}, props(1))
+
+    with ResultStore(tmp_path) as store:
+        assert store.params == ['gap']
+        store.append({'gap': 2}, props(2))
+
+    assert ResultStore(tmp_path, ['gap']).load(['gap'])['gap'].tolist() == [
+        1,
+        2,
+    ]
+
+
+def test_reopen_with_other_params_raises(tmp_path: Path) -> None:
+    ResultStore(tmp_path, ['gap'])
+
+    with pytest.raises(ValueError, match='parameters'):
+        ResultStore(tmp_path, ['amps'])
+
+
+def test_ac_props_are_complex(tmp_path: Path) -> None:
+    with ResultStore(tmp_path, ['freq'], chunk_size=2) as store:
+        # Os pontos reais já salvos passam a ser complexos.
+        store.append({'freq': 0}, props(1))
+        store.append({'freq': 0}, props(2))
+        for i in range(3):
+            store.append({'freq': 60}, ac_props(i + 1))
+
+    reopened = ResultStore(tmp_path)
+    assert reopened.complex
+    voltage = reopened.load(['voltage'])['voltage']
+    assert voltage.dtype == np.complex128
+    assert voltage.tolist() == [0, 0, 377j, 754j, 1131j]
+
+    batch = reopened.props_batch()
+    assert tuple(batch[2]) == pytest.approx(tuple(ac_props(1)))
+    assert batch.flux_linkage[4] == complex(3, -1)
@@ -0,0 +1,134 @@
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any
+
+import psutil
+from src.femmlib.jobs import JobQueue
+from src.femmlib.supervisor import Supervisor
+
+
+def fake_solve(params: dict[str, Any]) -> float:
+    """Simula o FEMM: dorme, trava, gasta CPU, falha ou termina o processo."""
+    match params.get('mode'):
+        case 'hang':
+            time.sleep(60)
+        case 'spin':
+            while True:
+                pass
+        case 'raise':
+            raise RuntimeError('did not converge')
+        case 'exit':
+            os._exit(3)
+        case 'child':
+            # Como o `femm.exe`: o processo filho gasta a CPU e o trabalhador
+            # apenas espera.
+            child = subprocess.Popen(
+                [sys.executable, '-c', 'while True: pass']
+            )
+            Path(params['pid_file']).write_text(str(child.pid))
+            child.wait()
+        case _:
+            pass
+
+    time.sleep(params.get('delay', 0))
+    return 2 * params['x']
+
+
+def test_map_returns_all_results() -> None:
+    with Supervisor(fake_solve, workers=2) as supervisor:
+        outcomes = list(
+            supervisor.map({'x': i, 'delay': 0.01} for i in range(6))
+        )
+
+    assert sorted(outcome.id for outcome in outcomes) == list(range(6))
+    assert all(outcome.result == 2 * outcome.id for outcome in outcomes)
+
+
+def test_timeouts_kill_and_respawn() -> None:
+    tasks = [
+        {'x': 0, 'mode': 'hang'},
+        {'x': 1, 'mode': 'spin'},
+        {'x': 2, 'mode': 'raise'},
+        {'x': 3, 'mode': 'exit'},
+        *({'x': i} for i in range(4, 8)),
+    ]
+
+    with Supervisor(
+        fake_solve, workers=2, wall_timeout=1, cpu_timeout=0.3
+    ) as supervisor:
+        pids = {worker.process.pid for worker in supervisor.pool}
+        outcomes = {outcome.id: outcome for outcome in supervisor.map(tasks)}
+
+        assert len(supervisor.pool) == 2
+        assert all(worker.process.is_alive() for worker in supervisor.pool)
+        assert pids.isdisjoint(
+            worker.process.pid for worker in supervisor.pool
+        )
+
+    reasons = {
+        i: outcome.diagnostics.reason
+        for i, outcome in outcomes.items()
+        if outcome.diagnostics is not None
+    }
+    assert reasons == {
+        0: 'wall timeout',
+        1: 'cpu timeout',
+        2: 'error',
+        3: 'crash',
+    }
+    assert 'did not converge' in outcomes[2].diagnostics.message  # type: ignore
+    assert outcomes[3].diagnostics.exitcode == 3  # type: ignore
+    assert [outcomes[i].result for i in range(4, 8)] == [8, 10, 12, 14]
+
+
+def test_drain_job_queue(tmp_path: Path) -> None:
+    jobs = JobQueue(tmp_path / 'jobs.db', max_attempts=1)
+    jobs.submit_all([{'x': 1}, {'x': 2, 'delay': 60}, {'x': 3}])
+
+    with Supervisor(fake_solve, workers=2, wall_timeout=0.5) as supervisor:
+        assert supervisor.drain(jobs) == 2
+
+    stats = jobs.stats()
+    assert (stats.done, stats.failed) == (2, 1)
+    assert 'wall timeout' in (jobs.get(2).error or '')
+    assert jobs.get(3).result == '6'
+
+
+def test_drain_retries_after_backoff(tmp_path: Path) -> None:
+    jobs = JobQueue(tmp_path / 'jobs.db', max_attempts=2, backoff=0.2)
+    jobs.submit_all([{'x': 1, 'delay': 60}, {'x': 2}])
+
+    with Supervisor(fake_solve, workers=1, wall_timeout=0.5) as supervisor:
+        assert supervisor.drain(jobs) == 1
+
+    # A segunda tentativa acontece depois da espera, na mesma chamada.
+    job = jobs.get(1)
+    assert (job.status, job.attempts) == ('failed', 2)
+    assert jobs.next_available() is None
+
+
+def test_cpu_timeout_covers_child_processes(tmp_path: Path) -> None:
+    pid_file = tmp_path / 'child.pid'
+    tasks = [{'x': 0, 'mode': 'child', 'pid_file': str(pid_file)}]
+
+    with Supervisor(
+        fake_solve, workers=1, wall_timeout=10, cpu_timeout=0.5
+    ) as supervisor:
+        (outcome,) = supervisor.map(tasks)
+        (result,) = supervisor.map([{'x': 1}])
+
+    assert outcome.diagnostics is not None
+    assert outcome.diagnostics.reason == 'cpu timeout'
+    assert outcome.diagnostics.wall_time < 10
+    assert result.result == 2
+
+    # O processo filho é encerrado junto do trabalhador.
+    pid = int(pid_file.read_text())
+    try:
+        status = psutil.Process(pid).status()
+    except psutil.NoSuchProcess:
+        status = psutil.STATUS_DEAD
+    assert status in (psutil.STATUS_DEAD, psutil.STATUS_ZOMBIE)
@@ -0,0 +1,94 @@
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pytest
+from src.femmlib.circuit import CircuitProps, CircuitPropsExtended
+from src.femmlib.store import ResultStore
+from src.femmlib.surrogate import RBFSurrogate, Solver, Surrogate
+
+
+def inductance(gap: float, amps: float) -> float:
+    return 1e-3 / ((1 + 4 * gap) * (1 + (amps / 5) ** 2))
+
+
+def solve(params: dict[str, float]) -> CircuitPropsExtended:
+    amps = params['amps']
+    flux_linkage = inductance(params['gap'], amps) * amps
+    return CircuitProps(amps, 0, flux_linkage).with_extension(10, 1e-4)
+
+
+def solve_ac(params: dict[str, float]) -> CircuitPropsExtended:
+    """Mesmo núcleo em 60 Hz, com tensão induzida e perdas."""
+    amps = params['amps']
+    flux_linkage = inductance(params['gap'], amps) * complex(amps, -amps / 10)
+    voltage = complex(amps / 100, 377 * flux_linkage.real)
+    return CircuitProps(complex(amps), voltage, flux_linkage).with_extension(
+        10, 1e-4
+    )
+
+
+def sweep(folder: Path, solver: Solver = solve) -> ResultStore:
+    store = ResultStore(folder, ['gap', 'amps'])
+    for gap in np.linspace(0.1, 1, 8):
+        for amps in np.linspace(1, 10, 8):
+            params = {'gap': float(gap), 'amps': float(amps)}
+            store.append(params, solver(params))
+
+    return store
+
+
+def test_interpolates_with_error_estimate(tmp_path: Path) -> None:
+    model = RBFSurrogate.from_store(
+        sweep(tmp_path), quantities=['inductance', 'mmf']
+    )
+    result = model.query({'gap': 0.37, 'amps': 2.1})
+
+    assert result.trusted
+    assert result.props.inductance == pytest.approx(
+        inductance(0.37, 2.1), rel=1e-2
+    )
+    assert result.props.mmf == pytest.approx(21, rel=1e-6)
+    assert 0 < result.error['inductance'] < 1e-5
+
+    outside = model.query({'gap': 3, 'amps': 2})
+    assert not outside.trusted
+
+
+def test_complex_store_keeps_imaginary_part(tmp_path: Path) -> None:
+    store = sweep(tmp_path, solve_ac)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        model = RBFSurrogate.from_store(
+            store, quantities=['flux_linkage', 'voltage']
+        )
+
+    result = model.query({'gap': 0.37, 'amps': 2.1})
+    expected = solve_ac({'gap': 0.37, 'amps': 2.1})
+
+    assert isinstance(result.props.flux_linkage, complex)
+    assert result.props.flux_linkage == pytest.approx(
+        expected.flux_linkage, rel=1e-2
+    )
+    assert result.props.voltage == pytest.approx(expected.voltage, rel=1e-2)
+    assert result.error['flux_linkage'] > 0
+
+
+def test_falls_back_to_solve(tmp_path: Path) -> None:
+    store = sweep(tmp_path)
+    surrogate = Surrogate(
+        store,
+        solve,
+        quantities=['inductance'],
+        max_error={'inductance': 1e-5},
+    )
+
+    inside = surrogate({'gap': 0.5, 'amps': 5})
+    assert surrogate.solves == 0
+    assert inside.error['inductance'] > 0
+
+    outside = surrogate({'gap': 2, 'amps': 5})
+    assert surrogate.solves == 1
+    assert outside.props.inductance == inductance(2, 5)
+    assert len(store) == 65
+    assert surrogate.model.query({'gap': 2, 'amps': 5}).trusted
@@ -0,0 +1,135 @@
+import threading
+from pathlib import Path
+
+import pytest
+from src.femmlib import sweep
+from src.femmlib.air_gap import AirGap, Direction
+from src.femmlib.circuit import Circuit
+from src.femmlib.core import FEMM
+from src.femmlib.sweep import LuaSweep, SweepPoint
+
+COIL = Circuit('A', 1, 1)
+
+
+def test_compile_grid() -> None:
+    code = (
+        LuaSweep.builder(FEMM('magnetics', unit='millimeters'), 'model.FEM')
+        .with_current(COIL, [1, 2, 3])
+        .with_freq([0, 60])
+        .with_output(COIL)
+        .build()
+        .compile()
+    )
+    lines = code.splitlines()
+
+    assert 'values_0 = {1, 2, 3}' in lines
+    assert 'values_1 = {0, 60}' in lines
+    assert 'mi_setcurrent("A", value)' in lines
+    assert 'mi_probdef(value, "millimeters", "planar", 1e-08, 1, 30, 0)' in (
+        lines
+    )
+    assert lines.index('for i_0 = 1, 3 do') < lines.index('for i_1 = 1, 2 do')
+    assert code.count('mi_analyze()') == 1
+    assert 'i, v, fl = mo_getcircuitproperties("A")' in lines
+    assert lines[-1] == 'closefile(results)'
+    # As duas funções e os dois laços.
+    assert lines.count('end') == 4
+
+
+@pytest.mark.parametrize('direction', ['vertical', 'horizontal'])
+def test_air_gap_setter_moves_corners(direction: Direction) -> None:
+    gap = (
+        AirGap.builder(
+            upper_left=(0, 1.5),
+            upper_right=(2, 1.5),
+            lower_left=(0, 0.5),
+            lower_right=(2, 0.5),
+        )
+        if direction == 'vertical'
+        else AirGap.builder(
+            upper_left=(0.5, 2),
+            upper_right=(1.5, 2),
+            lower_left=(0.5, 0),
+            lower_right=(1.5, 0),
+        )
+    )
+    gap = gap.with_direction(direction).build()
+    (axis,) = (
+        LuaSweep.builder(FEMM('magnetics'), 'model.FEM')
+        .with_air_gap(gap, [3, 0.25, 1])
+        .with_output(COIL)
+        .build()
+        .axes
+    )
+
+    # Nós do documento e o subconjunto da linguagem usado pelo programa,
+    # que também é Python válido.
+    nodes = [list(corner) for corner in gap.nodes()]
+    selected: list[list[float]] = []
+
+    def select(x: float, y: float) -> None:
+        selected.append(
+            min(
+                nodes, key=lambda node: (node[0] - x) ** 2 + (node[1] - y) ** 2
+            )
+        )
+
+    def translate(dx: float, dy: float) -> None:
+        for node in selected:
+            node[0] += dx
+            node[1] += dy
+
+    namespace: dict[str, object] = {
+        'mi_selectnode': select,
+        'mi_movetranslate': translate,
+        'mi_clearselected': selected.clear,
+    }
+    exec(axis.setup, namespace)
+    for value in axis.values:
+        namespace['value'] = value
+        exec(axis.setter, namespace)
+
+        upper_left, upper_right, lower_left, _ = nodes
+        if direction == 'vertical':
+            length = upper_left[1] - lower_left[1]
+            assert upper_left[1] + lower_left[1] == pytest.approx(2)
+        else:
+            length = upper_right[0] - upper_left[0]
+            assert upper_left[0] + upper_right[0] == pytest.approx(2)
+        assert length == pytest.approx(value)
+
+
+def test_run_calls_femm_from_calling_thread(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    lua_sweep = (
+        LuaSweep.builder(FEMM('magnetics'), 'model.FEM')
+        .with_current(COIL, [1, 2])
+        .with_output(COIL)
+        .build()
+    )
+    threads: list[threading.Thread] = []
+
+    def run(code: str, name: str) -> Path:
+        threads.append(threading.current_thread())
+        results = tmp_path / 'model.csv'
+        with results.open('w') as file:
+            file.write(','.join(lua_sweep.columns()) + '\n')
+            file.write('1,1,0,2,0,0.5,-0.25\n')
+            file.write('2,2,0,4,0,1,-0.5\n')
+
+        return tmp_path / name
+
+    monkeypatch.setattr(sweep, 'FEMM_FOLDER', tmp_path)
+    monkeypatch.setattr(sweep.lua, 'run', run)
+    streamed: list[SweepPoint] = []
+
+    points = lua_sweep.run(streamed.append)
+
+    assert threads == [threading.current_thread()]
+    assert streamed == points
+    assert [point.params for point in points] == [
+        {'A_current': 1},
+        {'A_current': 2},
+    ]
+    assert points[1].props['A'].flux_linkage == complex(1, -0.5)
@@ -1,5 +1,14 @@
+import numpy as np
 import pytest
-from src.mathlib.vector2 import DOWN, LEFT, RIGHT, UP, ZERO, Vector2
+from src.mathlib.vector2 import (
+    DOWN,
+    LEFT,
+    RIGHT,
+    UP,
+    ZERO,
+    Vector2,
+    Vector2Array,
+)
 
 
 @pytest.fixture
@@ -67,3 +76,66 @@ def test_dot_product(v: Vector2) -> None:
     assert Vector2.dot(v, RIGHT) == v.x
     assert Vector2.dot(v, v.perpendicular()) == 0
     assert Vector2.dot(v, v.perpendicular('counterclockwise')) == 0
+
+
+def test_rotate(v: Vector2) -> None:
+    assert Vector2.distance(v.rotate(90), v.perpendicular()) < 1e-12
+    assert Vector2.distance(v.rotate(360), v) < 1e-12
+    assert Vector2.distance(v.rotate(180, v), v) < 1e-12
+    assert Vector2.distance(RIGHT.rotate(90, (1, 1)), (2, 1)) < 1e-12
+
+
+@pytest.fixture
+def nodes() -> Vector2Array:
+    return Vector2Array(np.array([[3, 4], [1, -2], [0.5, 7], [-6, 0]]))
+
+
+def test_array_matches_vector2(nodes: Vector2Array) -> None:
+    vectors = nodes.tolist()
+    assert len(nodes) == 4
+    assert nodes[1] == Vector2(1, -2)
+    assert list(nodes) == vectors
+    assert Vector2Array.parse(vectors) == nodes
+
+    pairs = list(zip(vectors, vectors[1:], strict=False))
+    assert np.allclose(
+        nodes.midpoints().data,
+        [tuple(Vector2.midpoint(a, b)) for a, b in pairs],
+    )
+    assert np.allclose(
+        Vector2Array.distance(nodes[:-1], nodes[1:]),
+        [Vector2.distance(a, b) for a, b in pairs],
+    )
+    assert np.allclose(
+        nodes.perpendicular().data,
+        [tuple(vector.perpendicular()) for vector in vectors],
+    )
+    assert np.allclose(
+        nodes.rotate(30, (1, 1)).data,
+        [tuple(vector.rotate(30, (1, 1))) for vector in vectors],
+    )
+    assert np.allclose(
+        Vector2Array.dot(nodes, UP), [vector.y for vector in vectors]
+    )
+
+
+def test_array_segments(nodes: Vector2Array) -> None:
+    assert len(nodes.midpoints()) == 3
+    assert len(nodes.midpoints(closed=True)) == 4
+    assert nodes.midpoints(closed=True)[-1] == Vector2(-1.5, 2)
+    assert (nodes.translate((1, 1)) - nodes).data.tolist() == [[1, 1]] * 4
+    assert np.allclose(nodes.direction().magnitude(), 1)
+
+
+def test_array_protocol_copy(nodes: Vector2Array) -> None:
+    assert np.asarray(nodes) is nodes.data
+    assert np.array(nodes, copy=True) is not nodes.data
+    assert np.asarray(nodes, dtype=np.float32).dtype == np.float32
+    with pytest.raises(ValueError):
+        np.asarray(nodes, dtype=np.float32, copy=False)
+
+
+def test_mixed_vector_sequences(nodes: Vector2Array) -> None:
+    mixed = [Vector2(1, 1), (2, 3), [0, -1], Vector2(4, 0)]
+    assert (nodes + mixed).data.tolist() == [[4, 5], [3, 1], [0.5, 6], [-2, 0]]
+    assert nodes.rotate(90, Vector2(1, 1)) == nodes.rotate(90, (1, 1))
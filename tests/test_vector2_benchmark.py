@@ -0,0 +1,87 @@
+import timeit
+import tracemalloc
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
+import pytest
+from src.mathlib.vector2 import Vector2, Vector2Array
+
+A = Vector2(1.5, 2.5)
+B = Vector2(-3.25, 4.75)
+NODES = Vector2Array(np.random.default_rng(0).normal(size=(10_000, 2)))
+
+OPERATIONS: dict[str, Callable[[], Any]] = {
+    'add': lambda: A + B,
+    'sub': lambda: A - B,
+    'dot': lambda: Vector2.dot(A, B),
+    'distance': lambda: Vector2.distance(A, B),
+    'midpoint': lambda: Vector2.midpoint(A, B),
+    'parse': lambda: Vector2.parse(A),
+    'unpack': lambda: (*A,),
+}
+
+
+def ns_per_op(op: Callable[[], Any], number: int = 20_000) -> float:
+    """Melhor tempo de 5 repetições, em nanossegundos por operação."""
+    return min(timeit.repeat(op, number=number, repeat=5)) / number * 1e9
+
+
+def peak_bytes(op: Callable[[], Any]) -> int:
+    """Pico de memória alocada por uma única chamada, em bytes."""
+    peaks: list[int] = []
+    for _ in range(5):
+        tracemalloc.start()
+        tracemalloc.reset_peak()
+        base, _ = tracemalloc.get_traced_memory()
+        op()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        peaks.append(peak - base)
+
+    return min(peaks)
+
+
+@pytest.mark.parametrize('name', list(OPERATIONS))
+def test_vector2_fast_paths(
+    name: str, record_property: Callable[[str, object], None]
+) -> None:
+    op = OPERATIONS[name]
+    # Uma alocação de `Vector2` como referência.
+    budget = peak_bytes(lambda: Vector2(0.5, 0.25))
+    allocated = peak_bytes(op)
+
+    record_property('ns_per_op', round(ns_per_op(op), 1))
+    record_property('bytes_per_op', allocated)
+
+    # Vetores já convertidos não passam por `parse()` nem criam vetores
+    # intermediários: no máximo o resultado e um número.
+    assert allocated <= 2 * budget
+
+
+def test_parse_returns_same_vector() -> None:
+    assert Vector2.parse(A) is A
+
+    copy = Vector2.parse(A, copy=True)
+    assert copy == A
+    assert copy is not A
+
+
+def test_vector2_array_throughput(
+    record_property: Callable[[str, object], None],
+) -> None:
+    vectors = NODES.tolist()
+
+    array = ns_per_op(lambda: NODES.midpoints(), number=20) / len(NODES)
+    scalar = ns_per_op(
+        lambda: [
+            Vector2.midpoint(a, b)
+            for a, b in zip(vectors, vectors[1:], strict=False)
+        ],
+        number=5,
+    ) / len(NODES)
+
+    record_property('array_ns_per_node', round(array, 2))
+    record_property('scalar_ns_per_node', round(scalar, 2))
+
+    assert array < scalar